@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+============================================
+BENCHMARK FORECASTING
+Benchmark reproducible untuk hot path di src/ (preprocess, tuning, fit, forecast, backtest)
+============================================
+
+Setiap case dijalankan di proses terpisah supaya peak RSS tidak tercampur. Seperti
+timeit, satu sampel mengulang case sampai minimal MIN_SAMPLE_S detik (case ~20 ms
+tidak terukur stabil sekali jalan), lalu diambil --repeats sampel per case. wall_s
+adalah min waktu per panggilan dari semua sampel (gangguan dari proses lain hanya
+bisa memperlambat); median juga disimpan untuk melihat sebarannya. Case yang melewati
+toleransi diukur ulang sekali di proses baru sebelum dilaporkan sebagai regresi.
+Grid terdiri dari dua sweep:
+    - panjang series (1 komoditas)
+    - jumlah komoditas (panjang series tetap)
+
+Cara pakai:
+    python benchmarks/bench_forecasting.py                    # grid quick, bandingkan dengan baseline
+    python benchmarks/bench_forecasting.py --grid full
+    python benchmarks/bench_forecasting.py --functions forecast_future backtest_model
+    python benchmarks/bench_forecasting.py --repeats 9        # lebih banyak ulangan per case
+    python benchmarks/bench_forecasting.py --save-baseline    # simpan hasil sebagai baseline baru
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, '..'))
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+DEFAULT_REPEATS = 5
+
+# Durasi minimum satu sampel (detik); case cepat diulang dalam satu sampel
+MIN_SAMPLE_S = 0.2
+
+FUNCTIONS = [
+    'preprocess_dataset',
+    'auto_tune_per_commodity',
+    'train_and_evaluate',
+    'forecast_future',
+    'backtest_model'
+]
+
+GRIDS = {
+    'quick': {
+        'lengths': [100, 260],
+        'commodities': [1, 8],
+        'sweep_length': 156,
+        'max_tune_length': 260,
+        'max_tune_commodities': 1
+    },
+    'full': {
+        'lengths': [100, 500, 1000, 2000, 5000],
+        'commodities': [1, 10, 50, 100, 500],
+        'sweep_length': 260,
+        'max_tune_length': 1000,
+        'max_tune_commodities': 10
+    }
+}
+
+# Spesifikasi model untuk fit/forecast/backtest
+MODEL_SPECS = {
+    'arima': {'order': (1, 1, 1), 'seasonal_order': (0, 0, 0, 0), 'model_type': 'ARIMA'},
+    'sarima': {'order': (1, 1, 1), 'seasonal_order': (1, 0, 0, 52), 'model_type': 'SARIMA'}
+}
+
+
+def _peak_rss_mb():
+    # ru_maxrss dalam KB di Linux, byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return rss / (1024 * 1024)
+    return rss / 1024
+
+
+def build_cases(grid, functions):
+    """
+    Buat daftar case benchmark dari definisi grid
+
+    Args:
+        grid: Dictionary grid (lihat GRIDS)
+        functions: List nama fungsi yang di-benchmark
+
+    Returns:
+        list: List dict case {'name', 'function', 'length', 'commodities'}
+    """
+    cases = []
+    for func in functions:
+        points = [(length, 1) for length in grid['lengths']]
+        points += [(grid['sweep_length'], k) for k in grid['commodities'] if k > 1]
+
+        for length, k in points:
+            if func == 'auto_tune_per_commodity' and (
+                    length > grid['max_tune_length'] or k > grid['max_tune_commodities']):
+                continue
+            cases.append({
+                'name': f"{func}[n={length},k={k}]",
+                'function': func,
+                'length': length,
+                'commodities': k
+            })
+    return cases
+
+
+def _run_case(case, spec_name, m, seed, repeats, queue):
+    """
+    Jalankan satu case (repeats sampel) di child process dan kirim hasil lewat queue
+    """
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+
+    from benchmarks.synthetic import commodity_names, make_synthetic_dataset, to_raw_upload
+    from src.utils import preprocess_dataset
+    from src import forecasting
+    from src.seasonality import detect_seasonality
+    from src.instrumentation import get_events, clear_events
+
+    names = commodity_names(case['commodities'])
+    df = make_synthetic_dataset(names, length=case['length'], seed=seed)
+    spec = MODEL_SPECS[spec_name]
+    func = case['function']
+
+    tmp_dir = None
+    rss_before = _peak_rss_mb()
+
+    def run_once():
+        failures = 0
+        if func == 'preprocess_dataset':
+            raw = to_raw_upload(df)
+            start = time.perf_counter()
+            result = preprocess_dataset(raw)
+            wall = time.perf_counter() - start
+            failures += int(result is None)
+
+        elif func == 'auto_tune_per_commodity':
+            params_file = os.path.join(tmp_dir, 'best_params.json')
+            with open(params_file, 'w', encoding='utf-8') as f:
+                json.dump({name: {'order': [0, 0, 0], 'seasonal_order': [0, 0, 0, 0]} for name in names}, f)
+            # Deteksi musiman di-cache per data: setiap ulangan harus menghitung ulang
+            detect_seasonality.cache_clear()
+
+            start = time.perf_counter()
+            for name in names:
+                result = forecasting.auto_tune_per_commodity(df[name], name, params_file=params_file, m=m)
+                failures += int(not result.get('success'))
+            wall = time.perf_counter() - start
+
+        else:
+            fn = getattr(forecasting, func)
+            start = time.perf_counter()
+            for name in names:
+                if func == 'backtest_model':
+                    result = fn(df[name], spec['order'], spec['seasonal_order'])
+                else:
+                    result = fn(df[name], spec['order'], spec['seasonal_order'], model_type=spec['model_type'])
+                failures += int(not result.get('success'))
+            wall = time.perf_counter() - start
+        return wall, failures
+
+    try:
+        tmp_dir = tempfile.mkdtemp(prefix='bench_params_')
+        # Run pertama: warm-up sekaligus menentukan jumlah panggilan per sampel
+        clear_events()
+        first, failures = run_once()
+        number = max(1, int(MIN_SAMPLE_S / first)) if first > 0 else 1
+        iterations = [ev['iterations'] for ev in get_events('fit') if ev.get('iterations') is not None]
+
+        samples = []
+        for _ in range(max(1, repeats)):
+            total = 0.0
+            for _ in range(number):
+                wall, run_failures = run_once()
+                total += wall
+                failures = max(failures, run_failures)
+            samples.append(total / number)
+
+        wall = min(samples)
+        queue.put({
+            'wall_s': wall,
+            'wall_median_s': statistics.median(samples),
+            'samples_s': samples,
+            'number': number,
+            'per_commodity_ms': wall / case['commodities'] * 1000,
+            'peak_rss_mb': _peak_rss_mb(),
+            'rss_growth_mb': _peak_rss_mb() - rss_before,
+            'optimizer_iterations': sum(iterations) if iterations else None,
+            'failures': failures
+        })
+    except Exception as e:
+        queue.put({'error': str(e)})
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def run_case(case, spec_name='arima', m=52, seed=42, timeout=None, repeats=DEFAULT_REPEATS):
+    """
+    Jalankan case di proses baru (spawn) agar pengukuran RSS terisolasi
+
+    Returns:
+        dict: Hasil pengukuran (wall_s = min waktu per panggilan dari repeats sampel) atau {'error': ...}
+    """
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(case, spec_name, m, seed, repeats, queue))
+    proc.start()
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.terminate()
+        proc.join()
+        return {'error': f'timeout setelah {timeout} s'}
+    if queue.empty():
+        return {'error': f'proses berhenti dengan exit code {proc.exitcode}'}
+    return queue.get()
+
+
+def compare_with_baseline(results, baseline, tolerance=0.25):
+    """
+    Bandingkan hasil dengan baseline (wall_s: min waktu per panggilan di kedua sisi)
+
+    Args:
+        results: Dictionary {case_name: hasil}
+        baseline: Dictionary baseline (format file baseline.json)
+        tolerance: Batas kenaikan relatif wall time sebelum dianggap regresi
+
+    Returns:
+        list: List dict perbandingan per case
+    """
+    base_results = baseline.get('results', {})
+    rows = []
+    for name, res in results.items():
+        base = base_results.get(name)
+        if base is None or 'wall_s' not in res or 'wall_s' not in base:
+            rows.append({'name': name, 'status': 'no baseline'})
+            continue
+        ratio = res['wall_s'] / base['wall_s'] if base['wall_s'] > 0 else float('inf')
+        if ratio > 1 + tolerance:
+            status = 'REGRESI'
+        elif ratio < 1 - tolerance:
+            status = 'lebih cepat'
+        else:
+            status = 'ok'
+        rows.append({
+            'name': name,
+            'status': status,
+            'ratio': ratio,
+            'baseline_wall_s': base['wall_s'],
+            'rss_delta_mb': res['peak_rss_mb'] - base.get('peak_rss_mb', res['peak_rss_mb'])
+        })
+    return rows
+
+
+def _format_iterations(value):
+    return '-' if value is None else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hot path forecasting')
+    parser.add_argument('--grid', choices=sorted(GRIDS), default='quick')
+    parser.add_argument('--functions', nargs='*', choices=FUNCTIONS, default=FUNCTIONS)
+    parser.add_argument('--spec', choices=sorted(MODEL_SPECS), default='arima',
+                        help='Spesifikasi model untuk fit/forecast/backtest')
+    parser.add_argument('--m', type=int, default=52, help='Seasonal period untuk tuning')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=None, help='Timeout per case (detik)')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help='Jumlah sampel per case; min waktu per panggilan yang dilaporkan')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--output', help='Simpan hasil lengkap ke file JSON')
+    args = parser.parse_args()
+
+    cases = build_cases(GRIDS[args.grid], args.functions)
+    results = {}
+
+    print(f"{'case':<48} {'wall (s)':>10} {'median (s)':>10} {'ms/kom':>10} {'peak RSS':>10} {'iter':>8}")
+    for case in cases:
+        res = run_case(case, spec_name=args.spec, m=args.m, seed=args.seed, timeout=args.timeout,
+                       repeats=args.repeats)
+        results[case['name']] = res
+        if 'error' in res:
+            print(f"{case['name']:<48} ERROR: {res['error']}")
+        else:
+            print(f"{case['name']:<48} {res['wall_s']:>10.3f} {res['wall_median_s']:>10.3f} "
+                  f"{res['per_commodity_ms']:>10.1f} "
+                  f"{res['peak_rss_mb']:>8.1f}MB {_format_iterations(res['optimizer_iterations']):>8}")
+
+    report = {
+        'meta': {
+            'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'grid': args.grid,
+            'spec': args.spec,
+            'm': args.m,
+            'seed': args.seed,
+            'repeats': args.repeats,
+            'python': platform.python_version(),
+            'machine': platform.machine()
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nBaseline '{args.baseline}' belum ada. Jalankan dengan --save-baseline.")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    print(f"\nPerbandingan dengan baseline ({baseline.get('meta', {}).get('date')}):")
+    rows = compare_with_baseline(results, baseline, tolerance=args.tolerance)
+
+    # Case yang tampak lebih lambat diukur sekali lagi (proses baru); yang tercepat dipakai,
+    # supaya satu jendela waktu yang kebetulan lambat di mesin bersama tidak dianggap regresi
+    suspects = {row['name'] for row in rows if row['status'] == 'REGRESI'}
+    if suspects:
+        for case in cases:
+            if case['name'] not in suspects:
+                continue
+            res = run_case(case, spec_name=args.spec, m=args.m, seed=args.seed, timeout=args.timeout,
+                           repeats=args.repeats)
+            if 'wall_s' in res and res['wall_s'] < results[case['name']]['wall_s']:
+                results[case['name']] = res
+        rows = compare_with_baseline(results, baseline, tolerance=args.tolerance)
+    for row in rows:
+        if 'ratio' in row:
+            print(f"  {row['name']:<48} {row['ratio']:>6.2f}x  RSS {row['rss_delta_mb']:+.1f}MB  {row['status']}")
+        else:
+            print(f"  {row['name']:<48} {row['status']}")
+
+    if any(row['status'] == 'REGRESI' for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+============================================
+LOAD TEST FORECAST SERVICE
+Mengukur latency (p50/p95/p99) dan throughput src.service
+============================================
+
+Cara pakai:
+    python benchmarks/service_load.py --clients 16 --requests 200
+    python benchmarks/service_load.py --data data_pangan.csv --commodities "Beras Premium" Gula
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.service import ModelPool, create_server, load_dataset_from_path
+from src.load_model import SARIMAParamsLoader
+from benchmarks.synthetic import make_synthetic_dataset
+
+
+def run_load(base_url, commodities, n_clients, n_requests, max_periods, seed=0):
+    """
+    Jalankan load test dengan n_clients thread
+
+    Returns:
+        tuple: (latencies dalam detik, jumlah error, total wall time)
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client(client_id):
+        rng = np.random.default_rng(seed + client_id)
+        local = []
+        for _ in range(n_requests):
+            body = json.dumps({
+                'komoditas': commodities[rng.integers(len(commodities))],
+                'periods': int(rng.integers(1, max_periods + 1)),
+                'alpha': 0.05
+            }).encode('utf-8')
+            req = urllib.request.Request(
+                f"{base_url}/forecast", data=body,
+                headers={'Content-Type': 'application/json'}
+            )
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req) as resp:
+                    resp.read()
+                local.append(time.perf_counter() - start)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    return np.array(latencies), errors[0], wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test untuk src.service')
+    parser.add_argument('--data', help='Path dataset CSV/Excel (default: data sintetis)')
+    parser.add_argument('--params', default='models/best_params.json')
+    parser.add_argument('--commodities', nargs='*', help='Subset komoditas (default: semua)')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='Request per client')
+    parser.add_argument('--max-periods', type=int, default=20)
+    parser.add_argument('--horizon', type=int, default=52)
+    args = parser.parse_args()
+
+    commodities = args.commodities or SARIMAParamsLoader(args.params).get_komoditas_list()
+    if args.data:
+        df = load_dataset_from_path(args.data)
+    else:
+        df = make_synthetic_dataset(commodities)
+
+    pool = ModelPool(df, params_file=args.params, horizon=args.horizon)
+    start = time.perf_counter()
+    pool.warm_up(commodities)
+    print(f"Warm up {len(commodities)} komoditas: {time.perf_counter() - start:.2f} s")
+
+    server = create_server(pool, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    latencies, n_errors, wall = run_load(
+        base_url, commodities, args.clients, args.requests, args.max_periods
+    )
+    server.shutdown()
+    server.server_close()
+
+    ms = latencies * 1000
+    print(f"Requests : {len(latencies)} ok, {n_errors} error")
+    print(f"Throughput: {len(latencies) / wall:.1f} req/s")
+    if len(ms):
+        print(f"Latency  : p50={np.percentile(ms, 50):.2f} ms  "
+              f"p95={np.percentile(ms, 95):.2f} ms  "
+              f"p99={np.percentile(ms, 99):.2f} ms  max={ms.max():.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+============================================
+SYNTHETIC DATA
+Data mingguan sintetis untuk benchmark (nama komoditas sama dengan aplikasi)
+============================================
+"""
+
+import numpy as np
+import pandas as pd
+
+KOMODITAS = [
+    'Beras Premium',
+    'Bawang Merah',
+    'Bawang Putih',
+    'Cabai Merah kriting',
+    'Telur Ayam Ras',
+    'Gula',
+    'Minyak Goreng Kemasan',
+    'Garam'
+]
+
+# Kisaran harga (Rp) yang realistis per komoditas
+_BASE_PRICE = {
+    'Beras Premium': 14000,
+    'Bawang Merah': 35000,
+    'Bawang Putih': 30000,
+    'Cabai Merah kriting': 45000,
+    'Telur Ayam Ras': 28000,
+    'Gula': 16000,
+    'Minyak Goreng Kemasan': 18000,
+    'Garam': 10000
+}
+
+
+def commodity_names(n):
+    """
+    Buat n nama komoditas; di atas 8 ditambah suffix wilayah (#1, #2, ...)
+
+    Args:
+        n: Jumlah komoditas
+
+    Returns:
+        list: List nama komoditas
+    """
+    if n <= len(KOMODITAS):
+        return KOMODITAS[:n]
+    return [f"{KOMODITAS[i % len(KOMODITAS)]} #{i // len(KOMODITAS) + 1}" for i in range(n)]
+
+
+def make_synthetic_dataset(commodities, length=260, seed=42, start='2015-01-04'):
+    """
+    Buat dataset mingguan sintetis (random walk + musiman tahunan + noise)
+
+    Args:
+        commodities: List nama komoditas
+        length: Jumlah minggu
+        seed: Random seed
+        start: Tanggal awal
+
+    Returns:
+        pd.DataFrame: Dataset dengan index datetime mingguan
+    """
+    rng = np.random.default_rng(seed)
+    n = len(commodities)
+    index = pd.date_range(start, periods=length, freq='W')
+    t = np.arange(length)[:, None]
+
+    base = np.array([
+        _BASE_PRICE.get(name.split(' #')[0], 20000) for name in commodities
+    ], dtype=float)[None, :]
+    phase = rng.uniform(0, 2 * np.pi, size=(1, n))
+    seasonal = 0.05 * base * np.sin(2 * np.pi * t / 52 + phase)
+    walk = np.cumsum(rng.normal(0, 0.01, size=(length, n)), axis=0) * base
+    noise = rng.normal(0, 0.005, size=(length, n)) * base
+
+    values = np.round(base + seasonal + walk + noise, 0)
+    return pd.DataFrame(values, index=index, columns=commodities)
+
+
+def to_raw_upload(df):
+    """
+    Convert dataset ke bentuk mentah seperti file upload (kolom Periode DD/MM/YYYY)
+
+    Args:
+        df: DataFrame dengan index datetime
+
+    Returns:
+        pd.DataFrame: DataFrame mentah untuk preprocess_dataset
+    """
+    raw = df.reset_index(drop=True)
+    raw.insert(0, 'Periode', df.index.strftime('%d/%m/%Y'))
+    return raw
@@ -13,6 +13,12 @@ Cara pakai:
 import pandas as pd
 import json
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.params_import import tuning_results_to_params, import_tuning_results
+from src.params_schema import validate_params as schema_validate_params, diff_params
 
 def generate_params_from_dataframe(hasil_tuning_df):
     """
@@ -26,31 +32,14 @@ def generate_params_from_dataframe(hasil_tuning_df):
                         - MAE
                         - RMSE
                         - MAPE
-    """
-    params_dict = {}
     
-    for idx, row in hasil_tuning_df.iterrows():
-        komoditas = row['Komoditas']
-        
-        # Extract order
-        order = row['Order(p,d,q)']
-        if isinstance(order, str):
-            # Jika string, parse
-            order = eval(order)
-        order_list = list(order)
-        
-        # Extract seasonal_order
-        seasonal = row['Seasonal(P,D,Q,m)']
-        if isinstance(seasonal, str):
-            # Jika string, parse
-            seasonal = eval(seasonal)
-        seasonal_list = list(seasonal)
-        
-        # Tambahkan ke dictionary
-        params_dict[komoditas] = {
-            "order": order_list,
-            "seasonal_order": seasonal_list
-        }
+    Returns:
+        dict: Parameter per komoditas (order, seasonal_order, model_type, MAE, RMSE, MAPE, ...)
+    """
+    # Parsing vektor tanpa eval (lihat src/params_import.py)
+    params_dict, errors = tuning_results_to_params(hasil_tuning_df)
+    for _, row in errors.iterrows():
+        print(f" Dilewati: {row.get('Komoditas')} ({row['error']})")
     
     return params_dict
 
@@ -77,6 +66,19 @@ def save_params_to_json(params_dict, filename='models/best_params.json'):
 
 if __name__ == "__main__":
     
+    # Dari file hasil tuning (CSV), digabung langsung ke models/best_params.json
+    # python generate_params.py hasil_tuning.csv
+    
+    if len(sys.argv) > 1:
+        result = import_tuning_results(pd.read_csv(sys.argv[1]))
+        if result['success']:
+            print(f" Diperbarui: {len(result['updated'])}, ditambahkan: {len(result['added'])}, "
+                  f"dilewati: {len(result['errors'])}")
+        else:
+            print(f" Import gagal: {result['error']}")
+        sys.exit(0 if result['success'] else 1)
+    
+    
     # OPSI 1: Manual Input
     # Jika Anda punya data hasil tuning, masukkan manual
     
@@ -163,27 +165,13 @@ def validate_params(params_dict):
     Returns:
         bool: True jika valid
     """
-    for komoditas, params in params_dict.items():
-        # Cek order
-        if 'order' not in params:
-            print(f" Error: {komoditas} tidak punya 'order'")
-            return False
-        
-        if len(params['order']) != 3:
-            print(f" Error: {komoditas} order harus 3 elemen (p,d,q)")
-            return False
-        
-        # Cek seasonal_order
-        if 'seasonal_order' not in params:
-            print(f" Error: {komoditas} tidak punya 'seasonal_order'")
-            return False
-        
-        if len(params['seasonal_order']) != 4:
-            print(f" Error: {komoditas} seasonal_order harus 4 elemen (P,D,Q,m)")
-            return False
+    errors = schema_validate_params(params_dict)
+    for komoditas, messages in errors.items():
+        print(f" Error: {komoditas} {'; '.join(messages)}")
     
-    print(" Semua parameter valid!")
-    return True
+    if not errors:
+        print(" Semua parameter valid!")
+    return not errors
 
 
 def load_params_from_json(filename='models/best_params.json'):
@@ -219,6 +207,9 @@ def compare_params(old_file='models/best_params_old.json',
     Args:
         old_file: File parameter lama
         new_file: File parameter baru
+    
+    Returns:
+        pd.DataFrame: Laporan perubahan (lihat src.params_schema.diff_params) atau None
     """
     old_params = load_params_from_json(old_file)
     new_params = load_params_from_json(new_file)
@@ -228,15 +219,16 @@ def compare_params(old_file='models/best_params_old.json',
     
     print("\n📊 Perbandingan Parameter:\n")
     
-    for komoditas in new_params.keys():
-        if komoditas in old_params:
-            old = old_params[komoditas]
-            new = new_params[komoditas]
-            
-            if old != new:
-                print(f" {komoditas}:")
-                print(f"   Lama: {old}")
-                print(f"   Baru: {new}")
+    report = diff_params(old_params, new_params)
+    for komoditas, row in report[report['change'] != 'unchanged'].iterrows():
+        if row['change'] == 'added':
+            print(f"➕ {komoditas}: (baru) {row['order_new']} {row['seasonal_order_new']}")
+        elif row['change'] == 'removed':
+            print(f"➖ {komoditas}: (dihapus)")
         else:
-            print(f"➕ {komoditas}: (baru)")
-            print(f"   {new_params[komoditas]}")
\ No newline at end of file
+            refit = " [perlu fit ulang]" if row['refit'] else ""
+            print(f" {komoditas}: {row['changed_fields']}{refit}")
+            print(f"   Lama: {row['order_old']} {row['seasonal_order_old']}")
+            print(f"   Baru: {row['order_new']} {row['seasonal_order_new']}")
+    
+    return report
@@ -12,7 +12,7 @@ import plotly.graph_objects as go
 import plotly.express as px
 import sys
 import os
-import json
+import uuid
 
 # Tambahkan path src ke system path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -25,8 +25,26 @@ from src.utils import (
 )
 from src.load_model import SARIMAParamsLoader, create_default_params_file
 from src.forecasting import (
-    train_and_evaluate, forecast_future, auto_tune_sarima, auto_tune_per_commodity
+    train_and_evaluate, forecast_future, auto_tune_sarima, auto_tune_per_commodity, prepare_endog
 )
+from src.instrumentation import (
+    timed_stage, set_session, get_events, clear_events, summarize_events, export_json, export_prometheus
+)
+from src.tuning_profiler import load_tuning_profile
+from src.batch_forecast import batch_forecast, pivot_batch_forecast
+from src.scenario import simulate_scenarios, SHOCK_TYPES
+from src.seasonality import detect_seasonality
+from src.cleaning import clean_dataset
+from src.charting import timeseries_figure, validation_figure, forecast_figure
+from src.export import export_forecasts, model_summary_table, EXPORT_FORMATS, EXPORT_MIME_TYPES
+from src.bundle import build_forecast_bundle, tuned_commodities
+from src.params_import import import_tuning_results
+from src.retune import plan_retuning, apply_retuning_plan
+from src.global_model import global_forecast
+from src.multivariate import multivariate_forecast, MULTIVARIATE_MODELS
+from src.calendar_features import CALENDAR_FEATURES, make_exog
+from src.eda import profile_dataset
+from src.cross_correlation import lead_lag_table, rolling_correlation
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -172,6 +190,10 @@ with col_header2:
 st.markdown("---")
 
 # Initialize session state
+# Buffer diagnostik dipakai bersama semua sesi di server: event ditandai id sesi ini
+if 'diagnostics_session' not in st.session_state:
+    st.session_state.diagnostics_session = uuid.uuid4().hex
+set_session(st.session_state.diagnostics_session)
 if 'df' not in st.session_state:
     st.session_state.df = None
 if 'params_loader' not in st.session_state:
@@ -184,6 +206,12 @@ if 'forecast_result' not in st.session_state:
     st.session_state.forecast_result = None
 if 'validation_commodity' not in st.session_state:
     st.session_state.validation_commodity = None
+if 'batch_result' not in st.session_state:
+    st.session_state.batch_result = None
+if 'scenario_result' not in st.session_state:
+    st.session_state.scenario_result = None
+if 'bundle_result' not in st.session_state:
+    st.session_state.bundle_result = None
 
 # ===== SIDEBAR =====
 with st.sidebar:
@@ -196,31 +224,68 @@ with st.sidebar:
         type=['csv', 'xlsx', 'xls']
     )
     
+    # Frekuensi analisis: ikuti data, atau agregasi (mis. data harian pasar -> mingguan)
+    freq_options = {
+        'Otomatis (sesuai data)': None,
+        'Harian': 'D',
+        'Mingguan (Minggu)': 'W-SUN',
+        'Mingguan (Senin)': 'W-MON',
+        'Bulanan': 'MS'
+    }
+    freq_label = st.selectbox("Frekuensi Analisis:", list(freq_options), index=0)
+    resample_agg = st.selectbox("Agregasi Resample:", ['mean', 'median', 'last'], index=0,
+                                disabled=freq_options[freq_label] is None)
+    
+    # Pembersihan sebelum fit: index teratur, isi gap pendek, winsorize outlier
+    clean_enabled = st.checkbox(
+        "🧹 Bersihkan Data Sebelum Model", value=True,
+        help="Reindex ke frekuensi teratur, interpolasi gap pendek, winsorize outlier (rolling median + MAD)"
+    )
+    clean_max_gap = st.number_input("Maks. Gap Interpolasi (periode):", min_value=0, max_value=52,
+                                    value=4, disabled=not clean_enabled)
+    clean_threshold = st.slider("Ambang Outlier (x MAD):", min_value=3.0, max_value=10.0, value=5.0,
+                                step=0.5, disabled=not clean_enabled)
+    
+    # Data kosong saat fit: diteruskan ke Kalman filter (tanggal tetap teratur) atau dibuang
+    missing_options = {
+        'Kalman filter (NaN dipertahankan)': 'kalman',
+        'Buang (dropna)': 'drop'
+    }
+    missing_label = st.selectbox(
+        "Data Kosong Saat Fit:", list(missing_options), index=0,
+        help="Kalman filter melewati minggu kosong tanpa imputasi sehingga tanggal forecast tetap tepat"
+    )
+    missing_mode = missing_options[missing_label]
+    
     if uploaded_file:
         if validate_file_type(uploaded_file):
             with st.spinner("⏳ Memuat dataset..."):
                 df_raw = load_dataset(uploaded_file)
                 
                 if df_raw is not None:
-                    df_processed = preprocess_dataset(df_raw)
+                    df_processed = preprocess_dataset(
+                        df_raw, target_freq=freq_options[freq_label], agg=resample_agg
+                    )
                     st.session_state.df = df_processed
                     st.session_state.current_dataset_file = uploaded_file.name
                     
-                    # RESET TUNING STATUS ketika dataset baru diupload
-                    params = st.session_state.params_loader.load_params()
-                    for commodity in params.keys():
-                        params[commodity]['is_tuned'] = False
-                        params[commodity]['aic'] = None
-                        params[commodity]['bic'] = None
-                        params[commodity]['tuning_date'] = None
-                    
-                    # Save reset params
-                    os.makedirs('models', exist_ok=True)
-                    with open('models/best_params.json', 'w', encoding='utf-8') as f:
-                        json.dump(params, f, indent=4, ensure_ascii=False)
+                    # Reset status tuning hanya untuk komoditas yang datanya berubah signifikan
+                    # (fingerprint saat tuning vs data baru: revisi, structural break, drift residual)
+                    params = st.session_state.params_loader.load_params() or {}
+                    check_df = clean_dataset(
+                        df_processed, max_gap=int(clean_max_gap), outlier_threshold=float(clean_threshold)
+                    ) if clean_enabled else df_processed
+                    retune_plan = plan_retuning(check_df, params)
+                    retune_result = apply_retuning_plan(retune_plan, params=params)
+                    if not retune_result.get('success'):
+                        st.error(f"❌ Gagal menyimpan status tuning: {retune_result.get('error')}")
                     st.session_state.params_loader = SARIMAParamsLoader()
                     
-                    st.success("✅ Dataset berhasil dimuat! Status tuning di-reset.")
+                    st.success(f"✅ Dataset berhasil dimuat! {len(retune_result['retune'])} komoditas perlu "
+                               f"tuning ulang, {len(retune_result['keep'])} parameter dipertahankan.")
+                    with st.expander("🔁 Jadwal Tuning Ulang"):
+                        st.dataframe(retune_plan[['action', 'reason', 'new_obs', 'break_p']],
+                                     use_container_width=True)
                     
                     # Tampilkan info dataset
                     with st.expander("📊 Info Dataset", expanded=True):
@@ -238,6 +303,9 @@ with st.sidebar:
                             st.write(f"📈 Total Data: **{len(st.session_state.df)} periode**")
 
                         st.write(f"🌾 Komoditas: **{len(st.session_state.df.columns)}** komoditas")
+                        source_freq = st.session_state.df.attrs.get('source_freq')
+                        st.write(f"⏱️ Frekuensi: **{st.session_state.df.attrs.get('freq')}**"
+                                 + (f" (data asli: {source_freq})" if source_freq != st.session_state.df.attrs.get('freq') else ""))
         else:
             st.error("❌ Format file tidak valid! Gunakan CSV atau Excel.")
     
@@ -251,6 +319,42 @@ with st.sidebar:
         st.session_state.params_loader = SARIMAParamsLoader()
         st.success("✅ File parameter default dibuat!")
 
+    # Import hasil tuning (mis. export Colab): kolom Komoditas, Order(p,d,q), Seasonal(P,D,Q,m), MAE, RMSE, MAPE
+    with st.expander("📥 Import Hasil Tuning"):
+        tuning_file = st.file_uploader("Tabel hasil tuning (CSV/Excel)", type=['csv', 'xlsx'],
+                                       key="tuning_results_file")
+        if tuning_file is not None and st.button("Gabungkan ke Parameter", use_container_width=True):
+            try:
+                if tuning_file.name.endswith('.csv'):
+                    tuning_df = pd.read_csv(tuning_file)
+                else:
+                    tuning_df = pd.read_excel(tuning_file)
+                import_result = import_tuning_results(tuning_df)
+                if import_result['success']:
+                    st.session_state.params_loader = SARIMAParamsLoader()
+                    st.success(f"✅ {len(import_result['updated'])} diperbarui, "
+                               f"{len(import_result['added'])} ditambahkan, "
+                               f"{int(import_result['changes']['refit'].sum())} perlu fit ulang")
+                else:
+                    st.error(f"❌ Import gagal: {import_result['error']}")
+                if len(import_result.get('errors', [])):
+                    st.warning(f"⚠️ {len(import_result['errors'])} baris tidak valid dilewati")
+                    st.dataframe(import_result['errors'], hide_index=True)
+            except Exception as e:
+                st.error(f"❌ Gagal membaca file: {str(e)}")
+
+    show_diagnostics = st.checkbox(
+        "🩺 Tampilkan Panel Diagnostik",
+        value=False,
+        help="Durasi parsing, fit SARIMAX, forecast, conf_int dan pembuatan grafik"
+    )
+    
+    profile_tuning = st.checkbox(
+        "🧪 Mode Profiling Tuning",
+        value=False,
+        help="Catat setiap kandidat order (waktu fit, konvergensi) ke models/tuning_profile.csv. Tuning sedikit lebih lambat."
+    )
+
 # ===== MAIN CONTENT =====
 if st.session_state.df is None:
     # Tampilan ketika belum ada dataset
@@ -283,6 +387,10 @@ if st.session_state.df is None:
     
 else:
     df = st.session_state.df
+    # Input model: dataset bersih (di-cache per hash dataset, tidak diproses ulang tiap rerun)
+    model_df = clean_dataset(
+        df, max_gap=int(clean_max_gap), outlier_threshold=float(clean_threshold)
+    ) if clean_enabled else df
     
     # Tab navigasi
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -300,24 +408,39 @@ else:
         if df is None or len(df) == 0 or len(df.columns) == 0:
             st.error("❌ Dataset kosong!")
         else:
+            # Profil semua komoditas dalam satu pass vektor (di-cache per hash dataset)
+            profile = profile_dataset(df)
+            
             # Row 1: Statistik Deskriptif
             st.subheader("Statistik Deskriptif Dataset")
             col_stat1, col_stat2 = st.columns([2, 1])
             
             with col_stat1:
                 # Tabel statistik
-                st.dataframe(df.describe().T, use_container_width=True)
+                st.dataframe(
+                    profile[['n_obs', 'mean', 'std', 'cv', 'min', 'q25', 'q50', 'q75', 'max', 'volatility']],
+                    use_container_width=True
+                )
             
             with col_stat2:
                 # Missing values
                 st.markdown("**Missing Values:**")
-                missing = check_missing_values(df)
-                if missing and any(missing.values()):
-                    for col, count in missing.items():
-                        if count > 0:
-                            st.warning(f"{col}: {count} ({count/len(df)*100:.1f}%)")
+                missing = profile[profile['missing'] > 0]
+                if len(missing):
+                    for col, row in missing.iterrows():
+                        st.warning(f"{col}: {row['missing']} ({row['missing_pct']:.1f}%), "
+                                   f"gap terpanjang {row['longest_gap']} periode")
                 else:
                     st.success("✅ Tidak ada missing values")
+            
+            with st.expander("🧪 Stasioneritas & Autokorelasi"):
+                st.caption("ADF: H0 unit root · KPSS: H0 stasioner · Stasioner = ADF menolak dan KPSS tidak "
+                           "menolak (α = 0.05) · Ljung-Box: H0 tanpa autokorelasi")
+                st.dataframe(
+                    profile[['adf_stat', 'adf_p', 'kpss_stat', 'kpss_p', 'stationary',
+                             'acf_1', 'seasonal_lag', 'acf_seasonal', 'ljung_box_p']],
+                    use_container_width=True
+                )
         
         # Row 2: Visualisasi
         st.subheader("📈 Visualisasi Time Series")
@@ -332,49 +455,53 @@ else:
             )
         
         # Plot time series
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df.index,
-            y=df[selected_commodity],
-            mode='lines',
-            name=selected_commodity,
-            line=dict(color='#667eea', width=2)
-        ))
-        
-        fig.update_layout(
-            title=f"Time Series Harga {selected_commodity}",
-            xaxis_title="Tanggal",
-            yaxis_title="Harga",
-            hovermode='x unified',
-            height=500,
-            template="plotly_white"
-        )
+        with timed_stage('plotly_figure', chart='explore'):
+            fig = timeseries_figure(
+                df, columns=[selected_commodity], title=f"Time Series Harga {selected_commodity}",
+                height=500, colors=['#667eea']
+            )
         
         st.plotly_chart(fig, use_container_width=True)
         
         # Plot semua komoditas
         with st.expander("📊 Lihat Semua Komoditas"):
-            fig_all = go.Figure()
-            
-            for col in commodities:
-                fig_all.add_trace(go.Scatter(
-                    x=df.index,
-                    y=df[col],
-                    mode='lines',
-                    name=col
-                ))
-            
-            fig_all.update_layout(
-                title="Time Series Semua Komoditas",
-                xaxis_title="Tanggal",
-                yaxis_title="Harga",
-                hovermode='x unified',
-                height=600,
-                template="plotly_white"
-            )
+            with timed_stage('plotly_figure', chart='all_commodities'):
+                fig_all = timeseries_figure(df, title="Time Series Semua Komoditas", height=600)
             
             st.plotly_chart(fig_all, use_container_width=True)
-    
+
+        # Korelasi antar komoditas (log return)
+        if len(commodities) > 1:
+            with st.expander("🔗 Korelasi & Lead-Lag"):
+                col_lag, col_window = st.columns(2)
+                with col_lag:
+                    max_lag = st.number_input("Lag maksimum (periode):", min_value=1, max_value=26,
+                                              value=8, key="xcorr_max_lag")
+                with col_window:
+                    corr_window = st.number_input("Jendela korelasi bergulir (periode):", min_value=8,
+                                                  max_value=104, value=26, key="xcorr_window")
+
+                lead_lag = lead_lag_table(df, max_lag=int(max_lag))
+                significant = lead_lag[lead_lag['significant']]
+                st.caption("Korelasi log return · lag = periode leader bergerak lebih dulu dari follower · "
+                           "signifikan jika |corr| melewati batas white noise (Bonferroni per lag)")
+                if len(significant) > 0:
+                    st.dataframe(significant.head(20).drop(columns='significant'), use_container_width=True,
+                                 hide_index=True)
+                else:
+                    st.info("Tidak ada pasangan komoditas dengan korelasi signifikan")
+
+                rolling = rolling_correlation(df, selected_commodity, window=int(corr_window))
+                # Tampilkan 5 komoditas dengan korelasi rata-rata terkuat
+                partners = rolling.abs().mean().sort_values(ascending=False).index[:5].tolist()
+                with timed_stage('plotly_figure', chart='rolling_correlation'):
+                    fig_corr = timeseries_figure(
+                        rolling, columns=partners, height=400,
+                        title=f"Korelasi Bergulir {selected_commodity} ({int(corr_window)} periode)",
+                        yaxis_title="Korelasi", yaxis_range=(-1, 1)
+                    )
+                st.plotly_chart(fig_corr, use_container_width=True)
+
     # ===== TAB 2: PREDIKSI =====
     with tab2:
         st.header("🔮 Prediksi Harga Pangan - Per Komoditas")
@@ -406,10 +533,16 @@ else:
             key="pred_commodity"
         )
         
-        # Ambil data
-        series = df[selected_pred_commodity].dropna()
+        # Ambil data: index teratur dengan NaN (mode Kalman) atau NaN dibuang
+        series = prepare_endog(model_df[selected_pred_commodity], missing_mode)
+        
+        if clean_enabled:
+            cleaning = model_df.attrs.get('cleaning', {}).get(selected_pred_commodity, {})
+            st.caption(f"🧹 Pembersihan: {cleaning.get('filled', 0)} nilai diinterpolasi, "
+                       f"{cleaning.get('outliers', 0)} outlier di-winsorize, "
+                       f"{cleaning.get('remaining_missing', 0)} nilai masih kosong (gap > {int(clean_max_gap)} periode)")
         
-        if len(series) < 30:
+        if series.count() < 30:
             st.error("❌ Data terlalu sedikit untuk prediksi (minimal 30 data points)")
             st.stop()
         
@@ -423,6 +556,27 @@ else:
         model_type = commodity_params.get('model_type', 'SARIMA')
         tuning_date = commodity_params.get('tuning_date')
         
+        # Regresor eksogen untuk tuning: kalender Indonesia (Ramadan/Lebaran bergeser tiap tahun)
+        # dan kolom dataset lain (mis. harga BBM). Validasi & prediksi memakai regresor hasil tuning.
+        col_exog1, col_exog2 = st.columns(2)
+        with col_exog1:
+            exog_calendar = st.multiselect(
+                "Regresor Kalender:", list(CALENDAR_FEATURES), key="exog_calendar",
+                help="Proporsi hari per periode yang jatuh di Ramadan, pra-Lebaran, Lebaran, Idul Adha, Natal-Tahun Baru, Imlek"
+            )
+        with col_exog2:
+            exog_columns = st.multiselect(
+                "Regresor dari Dataset:", [c for c in model_df.columns if c != selected_pred_commodity],
+                key="exog_columns", help="Mis. kolom harga BBM; saat prediksi nilai terakhir ditahan"
+            )
+        
+        model_exog = None
+        if commodity_params.get('exog'):
+            try:
+                model_exog = make_exog(model_df.index, commodity_params['exog'], data=model_df)
+            except ValueError as e:
+                st.error(f"❌ Regresor hasil tuning tidak tersedia: {e}. Jalankan tuning ulang.")
+        
         col_tune1, col_tune2 = st.columns([3, 1])
         
         with col_tune1:
@@ -430,12 +584,28 @@ else:
                 st.write(f"✅ **Status:** Sudah di-tune")
                 st.write(f"**Model:** {model_type}")
                 st.write(f"**Tanggal:** {tuning_date}")
+                st.write(f"**Profil Fit:** {commodity_params.get('fit_profile', 'default')}")
+                st.write(f"**Regresor:** {', '.join(commodity_params.get('exog') or []) or '-'}")
             else:
                 st.write(f"⏳ **Status:** Belum di-tune")
+            
+            # Deteksi musiman sebelum tuning (menentukan m / lewati pencarian SARIMA)
+            detected = detect_seasonality(model_df[[selected_pred_commodity]]).iloc[0]
+            if detected['seasonal']:
+                st.write(f"**Musiman Terdeteksi:** m = {detected['m']} "
+                         f"(ACF {detected['strength']:.2f}, periode spektral {detected['spectral_period']})")
+            else:
+                st.write("**Musiman Terdeteksi:** tidak signifikan → tuning hanya mencari ARIMA")
         
         with col_tune2:
             if st.button("🔄 Jalankan Tuning", key="tune_btn", type="primary"):
-                tuning_result = auto_tune_per_commodity(series, selected_pred_commodity)
+                try:
+                    tuning_exog = make_exog(model_df.index, exog_calendar + exog_columns, data=model_df)
+                    tuning_result = auto_tune_per_commodity(
+                        series.dropna(), selected_pred_commodity, profile=profile_tuning, exog=tuning_exog
+                    )
+                except ValueError as e:
+                    tuning_result = {'success': False, 'error': str(e)}
                 
                 if tuning_result and tuning_result.get('success'):
                     st.success(f"✅ Tuning selesai! Model: {tuning_result['model_type']}")
@@ -452,11 +622,17 @@ else:
                     
                     if tuning_result['model_type'] == 'SARIMA':
                         st.write(f"**Seasonal Order (P,D,Q,m):** {tuning_result['seasonal_order']}")
+                    if tuning_result.get('exog'):
+                        st.write(f"**Regresor:** {', '.join(tuning_result['exog'])}")
                     
-                    st.write(f"**Perbandingan AIC:**")
-                    st.write(f"- SARIMA AIC: {tuning_result['aic_sarima']:.2f}")
-                    st.write(f"- ARIMA AIC: {tuning_result['aic_arima']:.2f}")
-                    st.write(f"→ Model terpilih: **{tuning_result['model_type']}** (AIC lebih kecil)")
+                    if tuning_result.get('seasonal_search_skipped'):
+                        st.write(f"**ARIMA AIC:** {tuning_result['aic_arima']:.2f}")
+                        st.write("→ Pencarian SARIMA dilewati (tidak ada musiman signifikan)")
+                    else:
+                        st.write(f"**Perbandingan AIC:**")
+                        st.write(f"- SARIMA AIC: {tuning_result['aic_sarima']:.2f}")
+                        st.write(f"- ARIMA AIC: {tuning_result['aic_arima']:.2f}")
+                        st.write(f"→ Model terpilih: **{tuning_result['model_type']}** (AIC lebih kecil)")
                     
                     st.balloons()
                     
@@ -491,7 +667,9 @@ else:
                 with st.spinner(f"⏳ Validasi {model_type} model untuk {selected_pred_commodity}..."):
                     eval_result = train_and_evaluate(
                         series, order, seasonal_order, 
-                        model_type=model_type, test_size=0.2
+                        model_type=model_type, test_size=0.2,
+                        fit_profile=commodity_params.get('fit_profile'), missing=missing_mode,
+                        exog=model_exog
                     )
                     
                     if eval_result and eval_result.get('success'):
@@ -516,7 +694,18 @@ else:
             with col3:
                 if eval_result['model_type'] == 'SARIMA':
                     st.metric("Seasonal (P,D,Q,m)", str(eval_result['seasonal_order']))
-            
+
+            fit_info = eval_result.get('fit_info')
+            if fit_info:
+                if fit_info.get('fallback_used'):
+                    st.warning(
+                        f"⚠️ Fit {fit_info['requested_order']}{fit_info['requested_seasonal_order']} gagal / timeout, "
+                        f"menggunakan model lebih sederhana {fit_info['order']}{fit_info['seasonal_order']}"
+                    )
+                if fit_info.get('converged') is False:
+                    st.caption(f"⚠️ Optimizer belum konvergen setelah {fit_info.get('iterations')} iterasi "
+                               f"(maxiter={fit_info.get('maxiter')}, method={fit_info.get('method')})")
+
             # Tampilkan metrik akurasi
             st.markdown("#### 📈 Akurasi Prediksi pada Test Set (20%)")
             metrics = eval_result['metrics']
@@ -588,64 +777,11 @@ else:
             # Plot: Data Train, Test, dan Prediksi dengan CI
             st.markdown("#### 📉 Visualisasi Validasi Model")
             
-            fig = go.Figure()
-            
-            # Data Training (80%)
-            train_data = eval_result.get('train_data', pd.Series())
-            if len(train_data) > 0:
-                fig.add_trace(go.Scatter(
-                    x=train_data.index,
-                    y=train_data.values,
-                    mode='lines',
-                    name='Data Training (80%)',
-                    line=dict(color='#95a5a6', width=2),
-                    opacity=0.7
-                ))
-            
-            # Data Test Aktual (20%)
-            if len(test_data) > 0:
-                fig.add_trace(go.Scatter(
-                    x=test_data.index,
-                    y=test_data.values,
-                    mode='lines+markers',
-                    name='Data Test Aktual (20%)',
-                    line=dict(color='#3498db', width=2.5),
-                    marker=dict(size=7, symbol='circle')
-                ))
-            
-            # Prediksi pada Test Set
-            if len(forecast_df) > 0:
-                fig.add_trace(go.Scatter(
-                    x=forecast_df.index,
-                    y=forecast_df['forecast'].values,
-                    mode='lines+markers',
-                    name='Prediksi Model',
-                    line=dict(color='#e74c3c', width=2.5, dash='dash'),
-                    marker=dict(size=7, symbol='diamond')
-                ))
-                
-                # Confidence interval
-                if 'upper' in forecast_df.columns and 'lower' in forecast_df.columns:
-                    fig.add_trace(go.Scatter(
-                        x=list(forecast_df.index) + list(reversed(forecast_df.index)),
-                        y=list(forecast_df['upper'].values) + list(reversed(forecast_df['lower'].values)),
-                        fill='toself',
-                        fillcolor='rgba(231, 76, 60, 0.15)',
-                        line=dict(color='rgba(231,76,60,0)'),
-                        showlegend=True,
-                        name='Confidence Interval (95%)',
-                        hoverinfo='skip'
-                    ))
-            
-            fig.update_layout(
-                title=f"Validasi Model {eval_result['model_type']} - {selected_pred_commodity}",
-                xaxis_title="Tanggal",
-                yaxis_title="Harga (Rp)",
-                hovermode='x unified',
-                height=550,
-                template="plotly_white",
-                legend=dict(x=0.01, y=0.99)
-            )
+            with timed_stage('plotly_figure', chart='validation'):
+                fig = validation_figure(
+                    eval_result.get('train_data', pd.Series(dtype=float)), test_data, forecast_df,
+                    title=f"Validasi Model {eval_result['model_type']} - {selected_pred_commodity}"
+                )
             
             st.plotly_chart(fig, use_container_width=True)
         
@@ -683,7 +819,9 @@ else:
                 with st.spinner(f"⏳ Prediksi masa depan untuk {selected_pred_commodity} ({n_forecast} periode)..."):
                     future_result = forecast_future(
                         series, order, seasonal_order,
-                        model_type=model_type, periods=n_forecast, full_data=True
+                        model_type=model_type, periods=n_forecast, full_data=True,
+                        fit_profile=commodity_params.get('fit_profile'), levels=[0.5, 0.8],
+                        missing=missing_mode, exog=model_exog
                     )
                     
                     if future_result and future_result.get('success'):
@@ -724,48 +862,11 @@ else:
             # Visualisasi prediksi
             st.markdown("#### 📉 Visualisasi Prediksi Masa Depan")
             
-            fig_future = go.Figure()
-            
-            # Data historis
-            fig_future.add_trace(go.Scatter(
-                x=original_series.index,
-                y=original_series.values,
-                mode='lines',
-                name='Data Historis',
-                line=dict(color='#3498db', width=2)
-            ))
-            
-            # Prediksi masa depan
-            fig_future.add_trace(go.Scatter(
-                x=forecast_df.index,
-                y=forecast_df['forecast'].values,
-                mode='lines+markers',
-                name='Prediksi Masa Depan',
-                line=dict(color='#e74c3c', width=2.5, dash='dash'),
-                marker=dict(size=7, symbol='diamond')
-            ))
-            
-            # Confidence interval
-            fig_future.add_trace(go.Scatter(
-                x=list(forecast_df.index) + list(reversed(forecast_df.index)),
-                y=list(forecast_df['upper'].values) + list(reversed(forecast_df['lower'].values)),
-                fill='toself',
-                fillcolor='rgba(231, 76, 60, 0.15)',
-                line=dict(color='rgba(231,76,60,0)'),
-                showlegend=True,
-                name='Confidence Interval (95%)',
-                hoverinfo='skip'
-            ))
-            
-            fig_future.update_layout(
-                title=f"Prediksi Harga {selected_pred_commodity} ({future_result['periods']} Periode Ke Depan)",
-                xaxis_title="Tanggal",
-                yaxis_title="Harga (Rp)",
-                hovermode='x unified',
-                height=550,
-                template="plotly_white",
-                legend=dict(x=0.01, y=0.99)
-            )
+            with timed_stage('plotly_figure', chart='forecast'):
+                fig_future = forecast_figure(
+                    original_series, forecast_df,
+                    title=f"Prediksi Harga {selected_pred_commodity} ({future_result['periods']} Periode Ke Depan)"
+                )
             
             st.plotly_chart(fig_future, use_container_width=True)
             
@@ -777,6 +878,247 @@ else:
                 file_name=f"prediksi_{selected_pred_commodity}_{future_result['periods']}_periode.csv",
                 mime="text/csv"
             )
+            
+            # Simulasi skenario dari model yang sama (tanpa fit ulang)
+            with st.expander("🎲 Simulasi Skenario & Probabilitas Harga"):
+                col_sc1, col_sc2, col_sc3 = st.columns(3)
+                with col_sc1:
+                    n_paths = st.select_slider("Jumlah Simulasi:", [1000, 2000, 5000, 10000, 20000], value=5000)
+                    threshold = st.number_input(
+                        "Ambang Harga (Rp):", min_value=0.0,
+                        value=float(round(forecast_df['forecast'].max() * 1.1, -2)), step=100.0
+                    )
+                with col_sc2:
+                    shock_type = st.selectbox("Jenis Shock:", ['tanpa shock'] + list(SHOCK_TYPES))
+                    shock_start = st.number_input("Mulai Minggu ke-", min_value=1,
+                                                  max_value=int(future_result['periods']), value=1)
+                with col_sc3:
+                    shock_size = st.number_input(
+                        "Besar Shock (Rp, atau fraksi untuk pct_shift):", value=0.0, step=100.0
+                    )
+                    shock_end = st.number_input("Sampai Minggu ke- (ramp)", min_value=1,
+                                                max_value=int(future_result['periods']),
+                                                value=int(future_result['periods']))
+                
+                if st.button("🎲 Jalankan Simulasi", key="scenario_btn"):
+                    shocks = []
+                    if shock_type != 'tanpa shock':
+                        shocks.append({'type': shock_type, 'start': int(shock_start),
+                                       'end': int(max(shock_end, shock_start)), 'size': shock_size})
+                    with st.spinner(f"⏳ Simulasi {n_paths} jalur harga..."):
+                        st.session_state.scenario_result = simulate_scenarios(
+                            future_result['model'], steps=int(future_result['periods']),
+                            n_paths=int(n_paths), shocks=shocks, thresholds=[threshold],
+                            index=forecast_df.index, exog=future_result.get('future_exog')
+                        )
+                
+                scenario = st.session_state.scenario_result
+                if scenario and not scenario.get('success'):
+                    st.error(f"❌ Simulasi gagal: {scenario.get('error')}")
+                elif scenario and len(scenario['summary']) == len(forecast_df):
+                    scenario_threshold = list(scenario['exceedance_any'])[0]
+                    st.metric(
+                        f"Peluang harga > Rp {format_number(scenario_threshold)} (minimal sekali)",
+                        f"{scenario['exceedance_any'][scenario_threshold] * 100:.1f}%"
+                    )
+                    
+                    summary = scenario['summary']
+                    with timed_stage('plotly_figure', chart='scenario'):
+                        fig_sc = go.Figure()
+                        fig_sc.add_trace(go.Scatter(
+                            x=list(summary.index) + list(reversed(summary.index)),
+                            y=list(summary['q95'].values) + list(reversed(summary['q5'].values)),
+                            fill='toself', fillcolor='rgba(155, 89, 182, 0.2)',
+                            line=dict(color='rgba(155,89,182,0)'), name='Simulasi 5%-95%', hoverinfo='skip'
+                        ))
+                        fig_sc.add_trace(go.Scatter(
+                            x=summary.index, y=summary['q50'].values, mode='lines',
+                            name='Median Simulasi', line=dict(color='#8e44ad', width=2)
+                        ))
+                        fig_sc.add_trace(go.Scatter(
+                            x=forecast_df.index, y=forecast_df['forecast'].values, mode='lines',
+                            name='Prediksi Tanpa Shock', line=dict(color='#e74c3c', dash='dash')
+                        ))
+                        fig_sc.add_hline(y=scenario_threshold, line_dash='dot', line_color='#7f8c8d')
+                        fig_sc.update_layout(
+                            title=f"Simulasi {scenario['n_paths']} Jalur Harga {selected_pred_commodity}",
+                            xaxis_title="Tanggal", yaxis_title="Harga (Rp)",
+                            hovermode='x unified', height=450, template="plotly_white"
+                        )
+                    st.plotly_chart(fig_sc, use_container_width=True)
+                    
+                    exceed_table = pd.DataFrame({
+                        'Periode': summary.index,
+                        'Median (Rp)': summary['q50'].values.round(0),
+                        'P(harga > ambang)': (scenario['exceedance'][scenario_threshold].values * 100).round(1)
+                    })
+                    st.dataframe(exceed_table, use_container_width=True, hide_index=True)
+        
+        # ===== PREDIKSI BATCH =====
+        st.markdown("---")
+        st.subheader("📦 Prediksi Batch Semua Komoditas")
+        
+        params_batch = st.session_state.params_loader.load_params() or {}
+        
+        # Model global: satu model pooled untuk semua series (tanpa parameter per komoditas,
+        # series pendek < 30 titik tetap bisa di-forecast)
+        # VAR/VECM: satu model gabungan untuk kelompok komoditas yang bergerak bersama
+        batch_method = st.radio(
+            "Metode:", ['SARIMA per komoditas', 'Model global (pooled)', 'VAR/VECM (multivariat)'],
+            horizontal=True, key="batch_method",
+            help="Model global: satu model regresi lag (Ridge / gradient boosting) dilatih sekali dari semua series. "
+                 "VAR/VECM: komoditas terpilih di-fit bersama sebagai satu kelompok"
+        )
+        use_global = batch_method == 'Model global (pooled)'
+        use_multivariate = batch_method == 'VAR/VECM (multivariat)'
+        batch_options = list(st.session_state.df.columns) if use_global or use_multivariate else \
+            [c for c in st.session_state.df.columns if c in params_batch]
+        global_estimator = st.selectbox("Estimator Global:", ['ridge', 'gbrt'], index=0,
+                                        key="global_estimator") if use_global else None
+        if use_multivariate:
+            col_var1, col_var2, col_var3 = st.columns(3)
+            with col_var1:
+                var_model = st.selectbox("Model:", list(MULTIVARIATE_MODELS), index=0, key="var_model",
+                                         help="auto: uji Johansen, VECM jika ada kointegrasi")
+            with col_var2:
+                var_ic = st.selectbox("Kriteria Lag:", ['aic', 'bic', 'hqic'], index=0, key="var_ic")
+            with col_var3:
+                var_max_lags = st.number_input("Lag Maksimum:", min_value=1, max_value=26, value=8,
+                                               key="var_max_lags")
+        
+        col_batch1, col_batch2, col_batch3 = st.columns([3, 1, 1])
+        with col_batch1:
+            batch_commodities = st.multiselect(
+                "Komoditas:",
+                batch_options,
+                default=batch_options[:3] if use_multivariate else batch_options if use_global else
+                [c for c in batch_options if params_batch[c].get('is_tuned', False)]
+            )
+        with col_batch2:
+            batch_periods = st.number_input("Periode:", min_value=1, max_value=52, value=12, key="batch_periods")
+        with col_batch3:
+            batch_levels = st.multiselect("Confidence Level (%):", [80, 90, 95, 99], default=[95])
+        
+        if st.button("📦 Jalankan Prediksi Batch", key="batch_btn", type="primary"):
+            if not batch_commodities or not batch_levels:
+                st.warning("⚠️ Pilih minimal satu komoditas dan satu confidence level!")
+            else:
+                with st.spinner(f"⏳ Prediksi {len(batch_commodities)} komoditas..."):
+                    if use_global:
+                        st.session_state.batch_result = global_forecast(
+                            model_df, batch_commodities, periods=int(batch_periods),
+                            levels=[level / 100 for level in sorted(batch_levels)], estimator=global_estimator
+                        )
+                    elif use_multivariate:
+                        st.session_state.batch_result = multivariate_forecast(
+                            model_df, batch_commodities, periods=int(batch_periods),
+                            levels=[level / 100 for level in sorted(batch_levels)], model=var_model,
+                            max_lags=int(var_max_lags), ic=var_ic
+                        )
+                    else:
+                        st.session_state.batch_result = batch_forecast(
+                            model_df, batch_commodities, periods=int(batch_periods),
+                            levels=[level / 100 for level in sorted(batch_levels)], params=params_batch,
+                            missing=missing_mode
+                        )
+        
+        batch_result = st.session_state.batch_result
+        if batch_result:
+            if not batch_result.get('success'):
+                st.error(f"❌ Prediksi batch gagal: {batch_result.get('error', 'semua komoditas gagal')}")
+            for komoditas, error in batch_result.get('errors', {}).items():
+                st.warning(f"⚠️ {komoditas}: {error}")
+            
+            if batch_result.get('success'):
+                batch_df = batch_result['forecast']
+                if batch_result.get('method') == 'global':
+                    fit_info = batch_result['fit_info']
+                    st.caption(f"🌐 Model global ({fit_info['estimator']}): {fit_info['n_train_rows']} baris latih "
+                               f"dari semua series, fit {fit_info['fit_time_s']:.2f} detik")
+                elif batch_result.get('method') == 'multivariate':
+                    fit_info = batch_result['fit_info']
+                    rank = f", rank kointegrasi {fit_info['coint_rank']}" if fit_info['coint_rank'] is not None else ''
+                    st.caption(f"🔗 {fit_info['model'].upper()} gabungan {len(fit_info['commodities'])} komoditas: "
+                               f"lag {fit_info['lag_order']} ({fit_info['ic'].upper()}){rank}, "
+                               f"{fit_info['n_obs']} observasi")
+                
+                with timed_stage('plotly_figure', chart='batch_forecast'):
+                    fig_batch = px.line(
+                        pivot_batch_forecast(batch_df),
+                        title=f"Prediksi {batch_result['periods']} Periode Ke Depan",
+                        labels={'value': 'Harga (Rp)', 'date': 'Tanggal', 'komoditas': 'Komoditas'},
+                        template="plotly_white",
+                        height=500
+                    )
+                st.plotly_chart(fig_batch, use_container_width=True)
+                
+                st.dataframe(batch_df, use_container_width=True, hide_index=True)
+                
+                # Export forecast + interval + info model semua komoditas dalam satu file
+                col_exp1, col_exp2 = st.columns([1, 2])
+                with col_exp1:
+                    export_format = st.selectbox("Format Export:", list(EXPORT_FORMATS), index=0,
+                                                 help="xlsx: satu sheet per komoditas + sheet Ringkasan")
+                with col_exp2:
+                    try:
+                        # File dibuat sekali per (hasil batch, format) dan disimpan di hasil batch,
+                        # bukan di setiap rerun (xlsx satu sheet per komoditas mahal)
+                        exports = batch_result.setdefault('exports', {})
+                        if export_format not in exports:
+                            # Model global / multivariat tidak punya parameter per komoditas
+                            export_metrics = None if batch_result.get('method') in ('global', 'multivariate') else \
+                                model_summary_table(params_batch, list(batch_result['models']))
+                            exports[export_format] = export_forecasts(batch_df, export_metrics, fmt=export_format)
+                        export_data = exports[export_format]
+                        st.download_button(
+                            label=f"📥 Download Prediksi Batch ({export_format.upper()})",
+                            data=export_data,
+                            file_name=f"prediksi_batch_{batch_result['periods']}_periode.{export_format}",
+                            mime=EXPORT_MIME_TYPES[export_format]
+                        )
+                    except Exception as e:
+                        st.error(f"❌ Gagal membuat file export: {str(e)}")
+        
+        # ===== BUNDLE ZIP =====
+        st.markdown("#### 🗜️ Bundle Semua Komoditas Ter-tune")
+        bundle_commodities = tuned_commodities(params_batch, model_df.columns)
+        st.caption(f"{len(bundle_commodities)} komoditas dengan is_tuned=True: forecast + parameter + metrik dalam satu zip")
+        
+        col_bundle1, col_bundle2 = st.columns([1, 2])
+        with col_bundle1:
+            bundle_validate = st.checkbox("Hitung metrik validasi", value=True, key="bundle_validate",
+                                          help="MAE/RMSE/MAPE dari validasi 80/20 (satu fit tambahan per komoditas)")
+        with col_bundle2:
+            bundle_format = st.selectbox("Format Prediksi di Bundle:", list(EXPORT_FORMATS), index=0,
+                                         key="bundle_format")
+        
+        if st.button("🗜️ Buat Bundle", key="bundle_btn", disabled=not bundle_commodities):
+            with st.spinner(f"⏳ Membuat bundle {len(bundle_commodities)} komoditas..."):
+                st.session_state.bundle_result = build_forecast_bundle(
+                    model_df, params=params_batch, commodities=bundle_commodities,
+                    periods=int(batch_periods),
+                    levels=[level / 100 for level in sorted(batch_levels)] or [0.95],
+                    fmt=bundle_format, validate=bundle_validate, missing=missing_mode
+                )
+        
+        bundle_result = st.session_state.bundle_result
+        if bundle_result:
+            if not bundle_result.get('success'):
+                st.error(f"❌ Bundle gagal: {bundle_result.get('error')}")
+            else:
+                for komoditas, error in bundle_result.get('errors', {}).items():
+                    st.warning(f"⚠️ {komoditas}: {error}")
+                st.success(
+                    f"✅ Bundle {len(bundle_result['commodities'])} komoditas "
+                    f"({len(bundle_result['cached'])} dari cache model)"
+                )
+                st.download_button(
+                    label="📥 Download Bundle (ZIP)",
+                    data=bundle_result['data'],
+                    file_name=bundle_result['file_name'],
+                    mime="application/zip",
+                    key="bundle_download"
+                )
     
     # ===== TAB 3: EVALUASI MODEL (INFO SAJA) =====
     with tab3:
@@ -852,28 +1194,42 @@ else:
             key="tune_commodity"
         )
         
+        # Saran m dari deteksi musiman untuk semua komoditas sekaligus
+        seasonality_table = detect_seasonality(model_df)
+        with st.expander("📈 Deteksi Musiman Semua Komoditas", expanded=False):
+            st.dataframe(seasonality_table, use_container_width=True)
+        
+        suggested = seasonality_table.loc[tune_commodity] if tune_commodity in seasonality_table.index else None
+        suggested_m = int(suggested['m']) if suggested is not None and suggested['seasonal'] else None
+        
         col1, col2 = st.columns(2)
         
         with col1:
-            use_seasonal = st.checkbox("Gunakan Seasonal", value=True)
+            use_seasonal = st.checkbox(
+                "Gunakan Seasonal", value=suggested_m is not None,
+                help="Default dari deteksi musiman (ACF + spektral)"
+            )
         
         with col2:
             if use_seasonal:
                 seasonal_period = st.number_input(
                     "Periode Seasonal (m):",
                     min_value=2,
-                    max_value=52,
-                    value=52,
-                    help="Biasanya 52 untuk data mingguan (1 tahun)"
+                    max_value=365,
+                    value=suggested_m or 52,
+                    help="Saran dari deteksi musiman; biasanya 52 untuk data mingguan (1 tahun)"
                 )
             else:
                 seasonal_period = 0
         
         if st.button("🔍 Jalankan Auto-Tuning Manual", type="primary"):
             if st.session_state.df is not None:
-                series = st.session_state.df[tune_commodity].dropna()
+                series = model_df[tune_commodity].dropna()
                 
-                tune_result = auto_tune_sarima(series, use_seasonal, seasonal_period)
+                tune_result = auto_tune_sarima(
+                    series, use_seasonal, seasonal_period,
+                    profile=profile_tuning, profile_label=tune_commodity
+                )
                 
                 if tune_result and tune_result.get('success'):
                     st.success("✅ Auto-tuning selesai!")
@@ -890,6 +1246,52 @@ else:
                         st.metric("BIC", f"{tune_result['bic']:.2f}")
                     
                     st.warning("⚠️ Hasil ini untuk referensi saja. Gunakan **Tab Prediksi** untuk tuning otomatis yang tersimpan.")
+                    
+                    if tune_result.get('profile'):
+                        st.info(f"🧪 Profil tuning tersimpan: `{tune_result['profile']['candidates_file']}` "
+                                f"({tune_result['profile']['n_candidates']} kandidat)")
+
+# ===== PANEL DIAGNOSTIK (OPSIONAL) =====
+if show_diagnostics:
+    st.markdown("---")
+    with st.expander("🩺 Diagnostik Performa", expanded=True):
+        events = get_events(session=st.session_state.diagnostics_session)
+        if not events:
+            st.info("Belum ada event yang tercatat. Jalankan tuning, validasi, atau prediksi terlebih dahulu.")
+        else:
+            st.markdown("**Ringkasan per Stage:**")
+            st.dataframe(summarize_events(events), use_container_width=True)
+            
+            st.markdown("**Event Terakhir:**")
+            st.dataframe(pd.DataFrame(events[-50:]).iloc[::-1], use_container_width=True)
+            
+            col_diag1, col_diag2, col_diag3 = st.columns(3)
+            with col_diag1:
+                st.download_button(
+                    label="📥 Export JSON",
+                    data=export_json(events, indent=2),
+                    file_name="diagnostik_events.json",
+                    mime="application/json"
+                )
+            with col_diag2:
+                st.download_button(
+                    label="📥 Export Prometheus",
+                    data=export_prometheus(events),
+                    file_name="diagnostik_metrics.prom",
+                    mime="text/plain"
+                )
+            with col_diag3:
+                if st.button("🗑️ Kosongkan Buffer"):
+                    clear_events(session=st.session_state.diagnostics_session)
+                    st.rerun()
+        
+        tuning_profile = load_tuning_profile()
+        if tuning_profile is not None and len(tuning_profile) > 0:
+            st.markdown("**Profil Tuning (kandidat terlama di atas):**")
+            st.dataframe(
+                tuning_profile.sort_values('fit_time_s', ascending=False),
+                use_container_width=True
+            )
 
 # Footer
 st.markdown("---")
@@ -17,7 +17,12 @@ from .utils import (
     convert_df_to_csv,
     convert_df_to_excel,
     get_date_range_info,
-    create_forecast_dates
+    create_forecast_dates,
+    infer_frequency,
+    get_dataset_frequency,
+    resample_dataset,
+    dataset_hash,
+    dataset_cached
 )
 
 from .load_model import (
@@ -32,9 +37,141 @@ from .forecasting import (
     calculate_metrics,
     train_and_evaluate,
     forecast_future,
+    fit_and_forecast,
+    resolve_seasonal_order,
+    forecast_intervals,
     auto_tune_sarima,
     predict_with_confidence_interval,
-    backtest_model
+    backtest_model,
+    DEFAULT_FIT_BUDGET,
+    FitTimeoutError,
+    resolve_fit_budget,
+    FIT_PROFILES,
+    resolve_fit_profile,
+    MISSING_MODES,
+    prepare_endog
+)
+
+from .compact_model import (
+    CompactForecastModel,
+    CompactForecast,
+    prediction_intervals
+)
+
+from .batch_forecast import (
+    batch_forecast,
+    pivot_batch_forecast,
+    clear_fit_cache
+)
+
+from .global_model import (
+    GlobalForecastModel,
+    global_forecast,
+    GLOBAL_ESTIMATORS
+)
+
+from .multivariate import (
+    multivariate_forecast,
+    fit_multivariate,
+    MULTIVARIATE_MODELS
+)
+
+from .scenario import (
+    simulate_scenarios,
+    SHOCK_TYPES
+)
+
+from .cleaning import (
+    clean_dataset,
+    cleaning_summary,
+    regularize_index,
+    winsorize_outliers
+)
+
+from .charting import (
+    downsample,
+    line_trace,
+    timeseries_figure,
+    validation_figure,
+    forecast_figure
+)
+
+from .export import (
+    export_forecasts,
+    forecast_export_table,
+    model_summary_table,
+    iter_csv_chunks,
+    write_export,
+    EXPORT_FORMATS
+)
+
+from .bundle import (
+    build_forecast_bundle,
+    tuned_commodities,
+    clear_validation_cache
+)
+
+from .params_schema import (
+    params_to_frame,
+    validate_params,
+    diff_params,
+    diff_summary,
+    SCHEMA_COLUMNS
+)
+
+from .retune import (
+    plan_retuning,
+    apply_retuning_plan,
+    series_fingerprint,
+    detect_breaks,
+    residual_drift
+)
+
+from .params_import import (
+    tuning_results_to_params,
+    parse_order_column,
+    merge_params,
+    import_tuning_results
+)
+
+from .eda import (
+    profile_dataset,
+    batch_adf,
+    batch_kpss,
+    PROFILE_QUANTILES
+)
+
+from .cross_correlation import (
+    cross_correlation_matrix,
+    cross_correlation,
+    lead_lag_table,
+    rolling_correlation,
+    LEAD_LAG_COLUMNS
+)
+
+from .calendar_features import (
+    calendar_features,
+    make_exog,
+    extend_exog,
+    CALENDAR_FEATURES
+)
+
+from .seasonality import (
+    detect_seasonality,
+    suggest_seasonal_period,
+    seasonal_candidates
+)
+
+from .instrumentation import (
+    timed_stage,
+    instrumented,
+    set_session,
+    bind_session,
+    get_events,
+    clear_events,
+    summarize_events,
+    export_json,
+    export_prometheus
 )
 
 __all__ = [
@@ -51,6 +188,11 @@ __all__ = [
     'convert_df_to_excel',
     'get_date_range_info',
     'create_forecast_dates',
+    'infer_frequency',
+    'get_dataset_frequency',
+    'resample_dataset',
+    'dataset_hash',
+    'dataset_cached',
     
     # Load Model
     'SARIMAParamsLoader',
@@ -63,9 +205,124 @@ __all__ = [
     'calculate_metrics',
     'train_and_evaluate',
     'forecast_future',
+    'fit_and_forecast',
+    'resolve_seasonal_order',
+    'forecast_intervals',
     'auto_tune_sarima',
     'predict_with_confidence_interval',
-    'backtest_model'
+    'backtest_model',
+    'DEFAULT_FIT_BUDGET',
+    'FitTimeoutError',
+    'resolve_fit_budget',
+    'FIT_PROFILES',
+    'resolve_fit_profile',
+    'MISSING_MODES',
+    'prepare_endog',
+    
+    # Compact Model
+    'CompactForecastModel',
+    'CompactForecast',
+    'prediction_intervals',
+    
+    # Batch Forecast
+    'batch_forecast',
+    'pivot_batch_forecast',
+    'clear_fit_cache',
+    
+    # Global Model
+    'GlobalForecastModel',
+    'global_forecast',
+    'GLOBAL_ESTIMATORS',
+    
+    # Multivariate (VAR / VECM)
+    'multivariate_forecast',
+    'fit_multivariate',
+    'MULTIVARIATE_MODELS',
+    
+    # Scenario
+    'simulate_scenarios',
+    'SHOCK_TYPES',
+    
+    # Cleaning
+    'clean_dataset',
+    'cleaning_summary',
+    'regularize_index',
+    'winsorize_outliers',
+    
+    # Charting
+    'downsample',
+    'line_trace',
+    'timeseries_figure',
+    'validation_figure',
+    'forecast_figure',
+    
+    # Export
+    'export_forecasts',
+    'forecast_export_table',
+    'model_summary_table',
+    'iter_csv_chunks',
+    'write_export',
+    'EXPORT_FORMATS',
+    
+    # Bundle
+    'build_forecast_bundle',
+    'tuned_commodities',
+    'clear_validation_cache',
+    
+    # Params Schema
+    'params_to_frame',
+    'validate_params',
+    'diff_params',
+    'diff_summary',
+    'SCHEMA_COLUMNS',
+    
+    # Retune Scheduler
+    'plan_retuning',
+    'apply_retuning_plan',
+    'series_fingerprint',
+    'detect_breaks',
+    'residual_drift',
+    
+    # Params Import
+    'tuning_results_to_params',
+    'parse_order_column',
+    'merge_params',
+    'import_tuning_results',
+    
+    # EDA Profile
+    'profile_dataset',
+    'batch_adf',
+    'batch_kpss',
+    'PROFILE_QUANTILES',
+    
+    # Cross Correlation
+    'cross_correlation_matrix',
+    'cross_correlation',
+    'lead_lag_table',
+    'rolling_correlation',
+    'LEAD_LAG_COLUMNS',
+    
+    # Calendar Features
+    'calendar_features',
+    'make_exog',
+    'extend_exog',
+    'CALENDAR_FEATURES',
+    
+    # Seasonality
+    'detect_seasonality',
+    'suggest_seasonal_period',
+    'seasonal_candidates',
+    
+    # Instrumentation
+    'timed_stage',
+    'instrumented',
+    'set_session',
+    'bind_session',
+    'get_events',
+    'clear_events',
+    'summarize_events',
+    'export_json',
+    'export_prometheus'
 ]
 
 __version__ = '1.0.0'
@@ -0,0 +1,243 @@
+"""
+============================================
+BATCH FORECAST
+Forecast banyak komoditas sekaligus dalam satu tabel long-format
+============================================
+
+Setiap komoditas di-fit secara paralel (thread atau proses) dengan parameter dari
+best_params.json, lalu hasilnya digabung sekali menjadi satu DataFrame:
+
+    komoditas | date | level | forecast | lower | upper
+
+Satu baris per (komoditas, tanggal, confidence level). Tabel ini bisa langsung
+dipakai untuk export maupun plotting (mis. px.line(..., color='komoditas')).
+
+Regresor (key 'exog' hasil tuning, mis. Ramadan/Lebaran) ikut di-fit dan
+diperpanjang ke periode forecast seperti forecast_future.
+
+Model hasil fit (CompactForecastModel) di-cache per (hash series, order, seasonal
+order, profil fit, budget, regresor): batch berikutnya pada data yang sama langsung forecast
+dari state tersimpan tanpa fit ulang.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.utils import dataset_hash, get_dataset_frequency
+from src.load_model import SARIMAParamsLoader
+from src.forecasting import fit_and_forecast, resolve_seasonal_order, prepare_endog
+from src.compact_model import interval_z
+from src.calendar_features import make_exog, exog_names
+from src.instrumentation import timed_stage, bind_session
+
+BATCH_COLUMNS = ['komoditas', 'date', 'level', 'forecast', 'lower', 'upper']
+
+FIT_CACHE_SIZE = 64
+
+_fit_cache = OrderedDict()
+_fit_cache_lock = threading.Lock()
+
+
+def _fit_cache_key(series, order, seasonal_order, params, fit_budget, exog=None):
+    exog_key = None if exog is None else (tuple(exog_names(exog)), dataset_hash(exog))
+    return (dataset_hash(series), order, seasonal_order, params.get('fit_profile'), repr(fit_budget), exog_key)
+
+
+def clear_fit_cache():
+    """
+    Kosongkan cache model hasil fit batch
+    """
+    with _fit_cache_lock:
+        _fit_cache.clear()
+
+
+def _forecast_one(komoditas, series, params, periods, levels, fit_budget=None, use_cache=False, exog=None):
+    """
+    Fit (atau ambil dari cache) dan forecast satu komoditas (dijalankan di worker).
+    exog: regresor selaras dengan series (dari key 'exog' di best_params.json, lihat make_exog)
+
+    Returns:
+        dict: {'komoditas', 'model', 'fit_info', 'cached', 'dates', 'mean', 'std'} atau {'komoditas', 'error'}
+    """
+    try:
+        model_type = params.get('model_type', 'SARIMA')
+        order = tuple(params['order'])
+        seasonal_order = resolve_seasonal_order(tuple(params['seasonal_order']), model_type)
+
+        key = _fit_cache_key(series, order, seasonal_order, params, fit_budget, exog) if use_cache else None
+        with _fit_cache_lock:
+            cached = _fit_cache.get(key) if use_cache else None
+            if cached is not None:
+                _fit_cache.move_to_end(key)
+
+        result = fit_and_forecast(
+            series, order, seasonal_order, model_type, periods, fit_budget,
+            params.get('fit_profile'), exog=exog, fitted=cached
+        )
+        if use_cache and cached is None:
+            with _fit_cache_lock:
+                _fit_cache[key] = (result['model'], result['fit_info'])
+                while len(_fit_cache) > FIT_CACHE_SIZE:
+                    _fit_cache.popitem(last=False)
+
+        return {
+            'komoditas': komoditas,
+            'model': result['model'],
+            'fit_info': result['fit_info'],
+            'cached': cached is not None,
+            'dates': result['forecast'].index,
+            'mean': result['forecast']['forecast'].values,
+            'std': result['forecast']['std'].values
+        }
+    except Exception as e:
+        return {'komoditas': komoditas, 'error': str(e)}
+
+
+def _to_long_frame(outputs, levels):
+    """
+    Gabungkan output per komoditas menjadi satu DataFrame long-format
+    (dibangun dari array sekaligus, tanpa append per baris)
+    """
+    if not outputs:
+        return pd.DataFrame(columns=BATCH_COLUMNS)
+
+    n_levels = len(levels)
+    z = interval_z(levels)
+
+    komoditas, dates, level_col, mean, lower, upper = [], [], [], [], [], []
+    for out in outputs:
+        n = len(out['mean'])
+        # Urutan baris: per komoditas, per level, per tanggal
+        half_width = np.outer(z, out['std']).ravel()
+        tiled_mean = np.tile(out['mean'], n_levels)
+        komoditas.append(np.full(n * n_levels, out['komoditas'], dtype=object))
+        dates.append(np.tile(out['dates'].values, n_levels))
+        level_col.append(np.repeat(levels, n))
+        mean.append(tiled_mean)
+        lower.append(tiled_mean - half_width)
+        upper.append(tiled_mean + half_width)
+
+    return pd.DataFrame({
+        'komoditas': np.concatenate(komoditas),
+        'date': np.concatenate(dates),
+        'level': np.concatenate(level_col),
+        'forecast': np.concatenate(mean),
+        'lower': np.concatenate(lower),
+        'upper': np.concatenate(upper)
+    }, columns=BATCH_COLUMNS)
+
+
+def batch_forecast(df, commodities=None, periods=12, levels=(0.95,),
+                   params=None, params_file='models/best_params.json',
+                   max_workers=None, use_processes=False, fit_budget=None, missing='drop',
+                   use_cache=True):
+    """
+    Forecast banyak komoditas secara paralel
+
+    Args:
+        df: DataFrame hasil preprocess_dataset (index datetime, satu kolom per komoditas)
+        commodities: List komoditas (default: semua kolom df)
+        periods: Jumlah periode forecast
+        levels: Confidence level (0-1), satu nilai atau list, mis. [0.8, 0.95]
+        params: Dictionary parameter per komoditas (default: dibaca dari params_file)
+        params_file: Path best_params.json
+        max_workers: Jumlah worker (default: min(jumlah komoditas, CPU))
+        use_processes: Jika True, pakai proses terpisah (paralel penuh, overhead lebih besar)
+        fit_budget: Override DEFAULT_FIT_BUDGET
+        missing: Penanganan data kosong ('drop' atau 'kalman', lihat MISSING_MODES)
+        use_cache: Pakai / simpan model hasil fit di cache (hanya untuk worker thread)
+
+    Returns:
+        dict: {'forecast': DataFrame long-format, 'models', 'fit_info', 'cached', 'errors', 'success'}
+    """
+    try:
+        levels = [float(level) for level in np.atleast_1d(levels)]
+        interval_z(levels)  # validasi level sebelum fit
+        if params is None:
+            params = SARIMAParamsLoader(params_file).params or {}
+        if commodities is None:
+            commodities = list(df.columns)
+
+        freq = get_dataset_frequency(df)
+        errors = {}
+        jobs = []
+        for komoditas in commodities:
+            if komoditas not in df.columns:
+                errors[komoditas] = 'Komoditas tidak ada di dataset'
+            elif komoditas not in params:
+                errors[komoditas] = 'Parameter tidak ditemukan di best_params.json'
+            else:
+                series = prepare_endog(df[komoditas], missing)
+                # Regresor yang dipakai saat tuning (kalender dihitung, kolom lain dari df)
+                try:
+                    exog = make_exog(series.index, params[komoditas].get('exog'), freq, data=df)
+                except ValueError as e:
+                    errors[komoditas] = str(e)
+                    continue
+                jobs.append((komoditas, series, params[komoditas], exog))
+
+        if max_workers is None:
+            max_workers = min(len(jobs), os.cpu_count() or 1)
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+        outputs = []
+        with timed_stage('batch_forecast', commodities=len(jobs), workers=max_workers,
+                         processes=use_processes):
+            if jobs:
+                with executor_cls(max_workers=max(1, max_workers)) as executor:
+                    futures = [
+                        executor.submit(bind_session(_forecast_one), komoditas, series, commodity_params,
+                                        periods, levels, fit_budget, use_cache and not use_processes, exog)
+                        for komoditas, series, commodity_params, exog in jobs
+                    ]
+                    # Urutan hasil mengikuti urutan komoditas input
+                    for future in futures:
+                        out = future.result()
+                        if 'error' in out:
+                            errors[out['komoditas']] = out['error']
+                        else:
+                            outputs.append(out)
+
+            forecast = _to_long_frame(outputs, levels)
+
+        return {
+            'forecast': forecast,
+            'models': {out['komoditas']: out['model'] for out in outputs},
+            'fit_info': {out['komoditas']: out['fit_info'] for out in outputs},
+            'cached': [out['komoditas'] for out in outputs if out['cached']],
+            'errors': errors,
+            'periods': periods,
+            'levels': levels,
+            'success': len(outputs) > 0
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def pivot_batch_forecast(forecast, value='forecast', level=None):
+    """
+    Ubah tabel long-format menjadi wide (index tanggal, kolom komoditas)
+
+    Args:
+        forecast: DataFrame hasil batch_forecast
+        value: Kolom nilai ('forecast', 'lower', 'upper')
+        level: Confidence level yang dipilih (default: level pertama)
+
+    Returns:
+        pd.DataFrame: Wide DataFrame
+    """
+    if forecast.empty:
+        return pd.DataFrame()
+    if level is None:
+        level = forecast['level'].iloc[0]
+    subset = forecast[np.isclose(forecast['level'], level)]
+    return subset.pivot(index='date', columns='komoditas', values=value)
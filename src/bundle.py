@@ -0,0 +1,246 @@
+"""
+============================================
+FORECAST BUNDLE
+Satu klik: forecast semua komoditas ter-tune + parameter + metrik dalam satu zip
+============================================
+
+Semua komoditas dengan is_tuned=True di best_params.json di-forecast paralel
+(batch_forecast, model di-cache per data sehingga bundle berikutnya tanpa fit
+ulang), opsional divalidasi 80/20 untuk MAE/RMSE/MAPE (metrik juga di-cache per
+data dan parameter), lalu dikemas in-memory:
+
+    prediksi.<fmt>     forecast + interval + info model/metrik (lihat src.export)
+    metrik.csv         info model dan metrik validasi per komoditas
+    best_params.json   parameter komoditas yang ada di bundle
+    fit_info.json      info optimizer / fallback per komoditas
+    manifest.json      waktu pembuatan, periode, level, frekuensi, hash dataset, error
+
+    result = build_forecast_bundle(df, periods=12, levels=[0.8, 0.95])
+    st.download_button("Download", result['data'], "bundle.zip")
+"""
+
+import io
+import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.utils import dataset_hash, get_dataset_frequency
+from src.load_model import SARIMAParamsLoader
+from src.forecasting import train_and_evaluate, prepare_endog
+from src.batch_forecast import batch_forecast
+from src.calendar_features import make_exog, exog_names
+from src.export import forecast_export_table, model_summary_table, write_export
+from src.instrumentation import timed_stage, bind_session
+
+VALIDATION_CACHE_SIZE = 64
+
+# Metrik validasi per (hash series, parameter, profil, budget, regresor, test_size, missing):
+# bundle berikutnya pada data yang sama tidak menjalankan train_and_evaluate lagi
+_validation_cache = OrderedDict()
+_validation_cache_lock = threading.Lock()
+
+
+def tuned_commodities(params, columns=None):
+    """
+    Komoditas yang sudah di-tune (is_tuned=True), opsional hanya yang ada di dataset
+
+    Args:
+        params: Dictionary parameter
+        columns: Kolom dataset (opsional)
+
+    Returns:
+        list: Nama komoditas
+    """
+    return [
+        komoditas for komoditas, commodity_params in params.items()
+        if commodity_params.get('is_tuned', False) and (columns is None or komoditas in columns)
+    ]
+
+
+def _validation_key(series, params, test_size, missing, fit_budget, exog=None):
+    exog_key = None if exog is None else (tuple(exog_names(exog)), dataset_hash(exog))
+    return (dataset_hash(series), tuple(params['order']), tuple(params['seasonal_order']),
+            params.get('model_type', 'SARIMA'), params.get('fit_profile'), repr(fit_budget),
+            exog_key, test_size, missing)
+
+
+def clear_validation_cache():
+    """
+    Kosongkan cache metrik validasi bundle
+    """
+    with _validation_cache_lock:
+        _validation_cache.clear()
+
+
+def _validate_one(komoditas, series, params, test_size, missing, fit_budget, exog=None):
+    key = _validation_key(series, params, test_size, missing, fit_budget, exog)
+    with _validation_cache_lock:
+        cached = _validation_cache.get(key)
+        if cached is not None:
+            _validation_cache.move_to_end(key)
+            return komoditas, dict(cached)
+
+    result = train_and_evaluate(
+        series, tuple(params['order']), tuple(params['seasonal_order']),
+        model_type=params.get('model_type', 'SARIMA'), test_size=test_size,
+        fit_budget=fit_budget, fit_profile=params.get('fit_profile'), missing=missing, exog=exog
+    )
+    if not result.get('success'):
+        return komoditas, {'error': result.get('error')}
+
+    with _validation_cache_lock:
+        _validation_cache[key] = dict(result['metrics'])
+        while len(_validation_cache) > VALIDATION_CACHE_SIZE:
+            _validation_cache.popitem(last=False)
+    return komoditas, result['metrics']
+
+
+def validation_metrics(df, commodities, params, test_size=0.2, missing='drop',
+                       fit_budget=None, max_workers=None):
+    """
+    Metrik validasi (MAE, RMSE, MAPE) untuk banyak komoditas secara paralel
+
+    Args:
+        df: DataFrame dataset
+        commodities: List komoditas
+        params: Dictionary parameter
+        test_size: Proporsi test set
+        missing: Penanganan data kosong (lihat MISSING_MODES)
+        fit_budget: Override DEFAULT_FIT_BUDGET
+        max_workers: Jumlah thread (default: min(jumlah komoditas, CPU))
+
+    Returns:
+        pd.DataFrame: Index komoditas; MAE, RMSE, MAPE (dan 'error' jika gagal)
+    """
+    if not commodities:
+        return pd.DataFrame(columns=['MAE', 'RMSE', 'MAPE'])
+    if max_workers is None:
+        max_workers = min(len(commodities), os.cpu_count() or 1)
+
+    freq = get_dataset_frequency(df)
+    rows, jobs = {}, []
+    for komoditas in commodities:
+        series = prepare_endog(df[komoditas], missing)
+        # Validasi memakai regresor yang sama dengan model hasil tuning
+        try:
+            exog = make_exog(series.index, params[komoditas].get('exog'), freq, data=df)
+        except ValueError as e:
+            rows[komoditas] = {'error': str(e)}
+            continue
+        jobs.append((komoditas, series, exog))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [
+            executor.submit(bind_session(_validate_one), komoditas, series, params[komoditas], test_size, missing,
+                            fit_budget, exog)
+            for komoditas, series, exog in jobs
+        ]
+        rows.update(future.result() for future in futures)
+
+    # Urutan komoditas input; baris error (regresor tidak ada) dicatat lebih dulu di rows
+    metrics = pd.DataFrame.from_dict(rows, orient='index').reindex(commodities)
+    metrics.index.name = 'komoditas'
+    return metrics
+
+
+def _json_bytes(payload):
+    # Tuple, numpy scalar dan Timestamp di fit_info diubah ke bentuk yang bisa di-JSON
+    def _default(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        return str(value)
+    return json.dumps(payload, indent=2, ensure_ascii=False, default=_default).encode('utf-8')
+
+
+def build_forecast_bundle(df, params=None, params_file='models/best_params.json', commodities=None,
+                          periods=12, levels=(0.8, 0.95), fmt='csv', validate=True, test_size=0.2,
+                          missing='drop', fit_budget=None, max_workers=None):
+    """
+    Forecast semua komoditas ter-tune dan kemas hasilnya dalam satu zip (in-memory)
+
+    Args:
+        df: DataFrame dataset (index datetime, satu kolom per komoditas)
+        params: Dictionary parameter (default: dibaca dari params_file)
+        params_file: Path best_params.json
+        commodities: List komoditas (default: semua yang is_tuned dan ada di dataset)
+        periods: Jumlah periode forecast
+        levels: Confidence level (0-1)
+        fmt: Format file forecast di dalam zip (lihat EXPORT_FORMATS)
+        validate: Jika True, hitung MAE/RMSE/MAPE validasi 80/20 (fit tambahan per komoditas)
+        test_size: Proporsi test set untuk validasi
+        missing: Penanganan data kosong (lihat MISSING_MODES)
+        fit_budget: Override DEFAULT_FIT_BUDGET
+        max_workers: Jumlah worker paralel
+
+    Returns:
+        dict: {'data': bytes zip, 'file_name', 'forecast', 'metrics', 'errors', 'commodities', 'success'}
+    """
+    try:
+        if params is None:
+            params = SARIMAParamsLoader(params_file).params or {}
+        if commodities is None:
+            commodities = tuned_commodities(params, df.columns)
+        if not commodities:
+            return {'success': False, 'error': 'Tidak ada komoditas yang sudah di-tune di dataset'}
+
+        with timed_stage('forecast_bundle', commodities=len(commodities), validate=validate, format=fmt):
+            batch = batch_forecast(
+                df, commodities, periods=periods, levels=levels, params=params,
+                max_workers=max_workers, fit_budget=fit_budget, missing=missing
+            )
+            if not batch.get('success'):
+                return {'success': False, 'error': batch.get('error', 'Semua komoditas gagal di-forecast'),
+                        'errors': batch.get('errors', {})}
+
+            included = list(batch['models'])
+            metrics = model_summary_table(params, included)
+            if validate:
+                validated = validation_metrics(df, included, params, test_size, missing, fit_budget, max_workers)
+                # Metrik validasi pada data saat ini menggantikan metrik tersimpan dari tuning
+                metrics = metrics.drop(columns=metrics.columns.intersection(validated.columns)).join(validated)
+
+            table = forecast_export_table(batch['forecast'], metrics)
+            created = datetime.now()
+            manifest = {
+                'created': created.strftime('%Y-%m-%d %H:%M:%S'),
+                'periods': periods,
+                'levels': batch['levels'],
+                'frequency': get_dataset_frequency(df),
+                'dataset_hash': dataset_hash(df),
+                'missing': missing,
+                'commodities': included,
+                'cached_fits': batch.get('cached', []),
+                'errors': batch['errors']
+            }
+
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+                bundle.writestr(f'prediksi.{fmt}', write_export(table, fmt, metrics=metrics))
+                bundle.writestr('metrik.csv', metrics.to_csv().encode('utf-8'))
+                bundle.writestr('best_params.json', _json_bytes({k: params[k] for k in included}))
+                bundle.writestr('fit_info.json', _json_bytes(batch['fit_info']))
+                bundle.writestr('manifest.json', _json_bytes(manifest))
+
+        return {
+            'data': buffer.getvalue(),
+            'file_name': f"bundle_prediksi_{created.strftime('%Y%m%d_%H%M')}.zip",
+            'forecast': table,
+            'metrics': metrics,
+            'errors': batch['errors'],
+            'commodities': included,
+            'cached': batch.get('cached', []),
+            'success': True
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
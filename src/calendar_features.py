@@ -0,0 +1,243 @@
+"""
+============================================
+CALENDAR FEATURES
+Regresor eksogen kalender Indonesia (Ramadan, Lebaran, Idul Adha, Natal, Imlek)
+============================================
+
+Lonjakan harga pangan mengikuti Ramadan dan Lebaran yang bergeser ~11 hari per
+tahun di kalender Masehi, sehingga tidak tertangkap oleh musiman tetap m=52.
+Modul ini membuat regresor kalender untuk SARIMAX:
+
+    ramadan           30 hari sebelum Idul Fitri
+    pra_lebaran       14 hari sebelum Idul Fitri (puncak belanja)
+    lebaran           Idul Fitri s.d. H+6
+    idul_adha         7 hari sebelum s.d. hari Idul Adha
+    natal_tahun_baru  18 Desember s.d. 1 Januari
+    imlek             7 hari sebelum s.d. hari Imlek
+
+Nilai fitur = proporsi hari dalam satu periode data (mis. satu minggu) yang
+jatuh di jendela tersebut (0-1). Tabel indikator harian dihitung sekali
+(tanggal libur 2008-2035, lihat HOLIDAY_DATES) lalu diagregasi ke frekuensi data
+dengan resample yang sama seperti resample_dataset; hasil per (rentang, frekuensi)
+di-cache sehingga rerun Streamlit dan forecast tidak menghitung ulang.
+
+Tanggal setelah tahun berjalan adalah perkiraan kalender hisab; pergeseran
+satu hari hampir tidak mengubah fitur mingguan/bulanan. Di luar rentang tabel
+fitur bernilai 0.
+
+Regresor lain (mis. harga BBM) berupa kolom DataFrame biasa:
+
+    exog = make_exog(series.index, ['ramadan', 'lebaran'])
+    exog = make_exog(series.index, ['lebaran', 'Harga BBM'], data=df)
+    future = extend_exog(exog, forecast_dates)   # kalender dihitung, kolom lain nilai terakhir
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import timed_stage
+
+# Idul Fitri (1 Syawal, penetapan pemerintah)
+IDUL_FITRI = [
+    '2008-10-01', '2009-09-20', '2010-09-10', '2011-08-31', '2012-08-19', '2013-08-08',
+    '2014-07-28', '2015-07-17', '2016-07-06', '2017-06-25', '2018-06-15', '2019-06-05',
+    '2020-05-24', '2021-05-13', '2022-05-02', '2023-04-22', '2024-04-10', '2025-03-31',
+    '2026-03-20', '2027-03-10', '2028-02-27', '2029-02-15', '2030-02-05', '2031-01-25',
+    '2032-01-14', '2033-01-03', '2033-12-23', '2034-12-12', '2035-12-01'
+]
+
+# Idul Adha (10 Zulhijah)
+IDUL_ADHA = [
+    '2008-12-08', '2009-11-27', '2010-11-17', '2011-11-06', '2012-10-26', '2013-10-15',
+    '2014-10-05', '2015-09-24', '2016-09-12', '2017-09-01', '2018-08-22', '2019-08-11',
+    '2020-07-31', '2021-07-20', '2022-07-10', '2023-06-29', '2024-06-17', '2025-06-06',
+    '2026-05-27', '2027-05-16', '2028-05-05', '2029-04-24', '2030-04-13', '2031-04-02',
+    '2032-03-22', '2033-03-11', '2034-03-01', '2035-02-18'
+]
+
+# Tahun Baru Imlek
+IMLEK = [
+    '2008-02-07', '2009-01-26', '2010-02-14', '2011-02-03', '2012-01-23', '2013-02-10',
+    '2014-01-31', '2015-02-19', '2016-02-08', '2017-01-28', '2018-02-16', '2019-02-05',
+    '2020-01-25', '2021-02-12', '2022-02-01', '2023-01-22', '2024-02-10', '2025-01-29',
+    '2026-02-17', '2027-02-06', '2028-01-26', '2029-02-13', '2030-02-03', '2031-01-23',
+    '2032-02-11', '2033-01-31', '2034-02-19', '2035-02-08'
+]
+
+HOLIDAY_DATES = {
+    'idul_fitri': IDUL_FITRI,
+    'idul_adha': IDUL_ADHA,
+    'imlek': IMLEK
+}
+
+# Jendela fitur: (tanggal acuan, hari mulai, hari akhir) relatif terhadap tanggal acuan
+CALENDAR_WINDOWS = {
+    'ramadan': ('idul_fitri', -30, -1),
+    'pra_lebaran': ('idul_fitri', -14, -1),
+    'lebaran': ('idul_fitri', 0, 6),
+    'idul_adha': ('idul_adha', -7, 0),
+    'imlek': ('imlek', -7, 0)
+}
+
+CALENDAR_FEATURES = ('ramadan', 'pra_lebaran', 'lebaran', 'idul_adha', 'natal_tahun_baru', 'imlek')
+
+CALENDAR_RANGE = ('2008-01-01', '2035-12-31')
+
+
+@lru_cache(maxsize=1)
+def _daily_calendar():
+    """
+    Indikator harian (0/1) semua fitur untuk seluruh rentang tabel (dihitung sekali)
+    """
+    days = pd.date_range(*CALENDAR_RANGE, freq='D')
+    day_number = days.values.astype('datetime64[D]').astype(np.int64)
+    table = {}
+    for name, (anchor, start, end) in CALENDAR_WINDOWS.items():
+        anchors = pd.to_datetime(HOLIDAY_DATES[anchor]).values.astype('datetime64[D]').astype(np.int64)
+        # Selisih setiap hari ke setiap tanggal acuan (n_hari x n_tahun), vektor
+        offset = day_number[:, None] - anchors[None, :]
+        table[name] = ((offset >= start) & (offset <= end)).any(axis=1)
+    table['natal_tahun_baru'] = ((days.month == 12) & (days.day >= 18)) | ((days.month == 1) & (days.day == 1))
+    return pd.DataFrame(table, index=days, columns=list(CALENDAR_FEATURES)).astype(float)
+
+
+@lru_cache(maxsize=64)
+def _calendar_frame(start, end, freq):
+    """
+    Fitur kalender teragregasi ke frekuensi freq untuk rentang [start, end] (di-cache)
+    """
+    with timed_stage('calendar_features', freq=freq):
+        daily = _daily_calendar()
+        offset = pd.tseries.frequencies.to_offset(freq)
+        # Lebihkan dua periode di kedua sisi agar periode tepi teragregasi penuh
+        days = pd.date_range(start - 2 * offset, end + 2 * offset, freq='D')
+        daily = daily.reindex(days, fill_value=0.0)
+        return daily.resample(freq).mean()
+
+
+def calendar_features(index, features=None, freq=None):
+    """
+    Fitur kalender Indonesia untuk setiap tanggal di index
+
+    Args:
+        index: pd.DatetimeIndex (tanggal data atau tanggal forecast)
+        features: Nama fitur (default: semua CALENDAR_FEATURES)
+        freq: Frekuensi data (default: index.freq / hasil infer, atau harian)
+
+    Returns:
+        pd.DataFrame: Index = index, kolom fitur dengan nilai 0-1
+    """
+    features = list(CALENDAR_FEATURES) if features is None else list(features)
+    unknown = [f for f in features if f not in CALENDAR_FEATURES]
+    if unknown:
+        raise ValueError(f"Fitur kalender tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(CALENDAR_FEATURES)}")
+    index = pd.DatetimeIndex(index)
+    if len(index) == 0:
+        return pd.DataFrame(columns=features, index=index, dtype=float)
+    freq = freq or index.freqstr or (pd.infer_freq(index) if len(index) > 2 else None) or 'D'
+
+    frame = _calendar_frame(index.min().normalize(), index.max().normalize(), freq)
+    aligned = frame.reindex(index)
+    # Tanggal yang tidak jatuh tepat di label periode (index tidak teratur): periode terdekat
+    if aligned.isna().any().any():
+        aligned = frame.reindex(index, method='nearest')
+    return aligned[features].copy()
+
+
+def make_exog(index, exog=None, freq=None, data=None):
+    """
+    Bangun matriks regresor untuk tanggal index
+
+    Args:
+        index: pd.DatetimeIndex series yang akan di-fit
+        exog: None, nama regresor (str / list str), atau DataFrame / Series regresor
+              (mis. harga BBM). Nama / kolom yang termasuk CALENDAR_FEATURES selalu
+              dihitung dari kalender; nama lain diambil dari kolom data.
+        freq: Frekuensi data (untuk agregasi fitur kalender)
+        data: DataFrame sumber kolom regresor non-kalender jika exog berupa nama
+
+    Returns:
+        pd.DataFrame atau None: Regresor selaras dengan index, tanpa NaN
+    """
+    if exog is None:
+        return None
+    if isinstance(exog, str):
+        exog = [exog]
+    if isinstance(exog, (list, tuple)):
+        if len(exog) == 0:
+            return None
+        external = [name for name in exog if name not in CALENDAR_FEATURES]
+        missing = [name for name in external if data is None or name not in data.columns]
+        if missing:
+            raise ValueError(f"Regresor tidak ditemukan di data: {', '.join(map(str, missing))}")
+        exog = pd.DataFrame(
+            {name: data[name] if name in external else np.nan for name in exog},
+            index=data.index if external else index
+        )
+
+    exog = exog.to_frame() if isinstance(exog, pd.Series) else exog
+    exog = exog.reindex(index).astype(float)
+    calendar_cols = [c for c in exog.columns if c in CALENDAR_FEATURES]
+    if calendar_cols:
+        exog[calendar_cols] = calendar_features(index, calendar_cols, freq)
+    # Regresor eksternal (harga BBM) berupa level: tahan nilai terakhir di gap
+    exog = exog.ffill().bfill()
+    if exog.isna().any().any():
+        empty = exog.columns[exog.isna().all()].tolist()
+        raise ValueError(f"Regresor tanpa nilai: {', '.join(map(str, empty))}")
+    return exog
+
+
+def extend_exog(exog, future_index, future_exog=None, freq=None):
+    """
+    Regresor untuk periode forecast
+
+    Kolom kalender dihitung dari tanggal; kolom lain diambil dari future_exog jika ada,
+    selain itu nilai terakhir ditahan (mis. harga BBM dianggap tidak berubah).
+
+    Args:
+        exog: DataFrame regresor periode fit (hasil make_exog)
+        future_index: pd.DatetimeIndex tanggal forecast
+        future_exog: DataFrame nilai regresor masa depan (opsional, sebagian kolom boleh)
+        freq: Frekuensi data
+
+    Returns:
+        pd.DataFrame atau None: Regresor untuk future_index dengan kolom yang sama dengan exog
+    """
+    if exog is None:
+        return None
+    future = pd.DataFrame(
+        np.repeat(exog.iloc[[-1]].to_numpy(), len(future_index), axis=0),
+        index=future_index, columns=exog.columns
+    )
+    if future_exog is not None:
+        future_exog = future_exog.to_frame() if isinstance(future_exog, pd.Series) else future_exog
+        given = future_exog.reindex(future_index)[[c for c in exog.columns if c in future_exog.columns]]
+        future.update(given.astype(float))
+    calendar_cols = [c for c in exog.columns if c in CALENDAR_FEATURES]
+    if calendar_cols:
+        future[calendar_cols] = calendar_features(future_index, calendar_cols, freq or exog.index.freqstr)
+    return future
+
+
+def exog_names(exog):
+    """
+    Nama kolom regresor untuk disimpan di best_params.json / fit_info
+
+    Args:
+        exog: None, str, list nama, atau DataFrame / Series
+
+    Returns:
+        list: Nama kolom (list kosong jika tanpa regresor)
+    """
+    if exog is None:
+        return []
+    if isinstance(exog, str):
+        return [exog]
+    if isinstance(exog, pd.Series):
+        return [exog.name]
+    if isinstance(exog, pd.DataFrame):
+        return [str(c) for c in exog.columns]
+    return [str(c) for c in exog]
@@ -0,0 +1,304 @@
+"""
+============================================
+CHARTING
+Grafik Plotly dengan downsampling dan cache per hash data
+============================================
+
+Histori panjang (bertahun-tahun data harian x banyak komoditas) tidak dikirim
+utuh ke browser:
+    - setiap garis di-downsample ke resolusi layar (LTTB, atau min-max yang
+      mempertahankan puncak/lembah), gap NaN tetap menjadi putus garis
+    - trace dengan titik asli > WEBGL_THRESHOLD memakai Scattergl (WebGL)
+    - figure dibangun sekali per data (dataset_cached), rerun Streamlit
+      memakai figure yang sama
+
+Sehingga ukuran payload dan waktu render tetap walaupun histori bertambah.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.utils import dataset_cached
+
+# Titik per garis kira-kira selebar grafik dalam pixel
+DEFAULT_MAX_POINTS = 1500
+# Di atas jumlah titik asli ini trace memakai WebGL
+WEBGL_THRESHOLD = 5000
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+
+def _as_float(x):
+    if isinstance(x, pd.DatetimeIndex):
+        return x.asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Index titik terpilih dengan Largest-Triangle-Three-Buckets
+
+    Args:
+        x: Array numerik (naik)
+        y: Array nilai tanpa NaN
+        n_out: Jumlah titik output
+
+    Returns:
+        np.ndarray: Index titik terpilih (termasuk titik pertama dan terakhir)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Luas segitiga (titik terpilih sebelumnya, kandidat, rata-rata bucket berikutnya)
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Index titik minimum dan maksimum per bucket (vektor, tanpa loop)
+
+    Args:
+        y: Array nilai tanpa NaN
+        n_out: Jumlah titik output (kira-kira, 2 per bucket)
+
+    Returns:
+        np.ndarray: Index titik terpilih, terurut
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    n_buckets = n_out // 2
+    bucket = (np.arange(n) * n_buckets) // n
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    selected = np.concatenate([order[starts], order[ends], [0, n - 1]])
+    return np.unique(selected)
+
+
+def downsample(series, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """
+    Downsample series untuk plot; gap NaN dipertahankan sebagai satu titik NaN
+
+    Args:
+        series: pd.Series
+        max_points: Jumlah titik maksimum
+        method: 'lttb' (bentuk garis) atau 'minmax' (puncak/lembah)
+
+    Returns:
+        pd.Series: Series dengan <= max_points titik terisi
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Metode downsample '{method}' tidak dikenal. Pilihan: {', '.join(DOWNSAMPLE_METHODS)}")
+    if len(series) <= max_points:
+        return series
+
+    values = series.to_numpy(dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    if method == 'lttb':
+        chosen = lttb_indices(_as_float(series.index[valid]), values[valid], max_points)
+    else:
+        chosen = minmax_indices(values[valid], max_points)
+
+    # Satu NaN di awal setiap gap supaya garis tetap terputus
+    missing = np.isnan(values)
+    gap_starts = np.flatnonzero(missing & ~np.roll(missing, 1))
+    return series.iloc[np.union1d(valid[chosen], gap_starts)]
+
+
+def line_trace(series, name, max_points=DEFAULT_MAX_POINTS, method='lttb',
+               webgl_threshold=WEBGL_THRESHOLD, **kwargs):
+    """
+    Trace garis dari series: downsample + Scattergl untuk series besar
+
+    Args:
+        series: pd.Series
+        name: Nama trace
+        max_points: Jumlah titik maksimum yang dikirim ke browser
+        method: Metode downsample ('lttb' / 'minmax')
+        webgl_threshold: Jumlah titik asli di atas ini memakai Scattergl
+        **kwargs: Argumen tambahan go.Scatter (mode, line, marker, ...)
+
+    Returns:
+        go.Scatter atau go.Scattergl
+    """
+    points = downsample(series, max_points, method)
+    trace_cls = go.Scattergl if len(series) > webgl_threshold else go.Scatter
+    kwargs.setdefault('mode', 'lines')
+    return trace_cls(x=points.index, y=points.values, name=name, **kwargs)
+
+
+def _band_trace(forecast_df, lower, upper, name, opacity):
+    # Area interval (polygon toself); selalu SVG karena jumlah titik forecast kecil
+    return go.Scatter(
+        x=list(forecast_df.index) + list(reversed(forecast_df.index)),
+        y=list(forecast_df[upper].values) + list(reversed(forecast_df[lower].values)),
+        fill='toself',
+        fillcolor=f'rgba(231, 76, 60, {opacity})',
+        line=dict(color='rgba(231,76,60,0)'),
+        showlegend=True,
+        name=name,
+        hoverinfo='skip'
+    )
+
+
+@dataset_cached(maxsize=32)
+def timeseries_figure(df, columns=None, title='', height=500, colors=None,
+                      max_points=DEFAULT_MAX_POINTS, method='lttb', yaxis_title='Harga', yaxis_range=None):
+    """
+    Figure garis untuk satu atau semua kolom dataset (di-cache per hash data)
+
+    Args:
+        df: DataFrame (index datetime)
+        columns: Kolom yang diplot (default: semua)
+        title: Judul grafik
+        height: Tinggi grafik
+        colors: List warna per kolom (opsional)
+        max_points: Titik maksimum per garis
+        method: Metode downsample
+        yaxis_title: Judul sumbu Y
+        yaxis_range: Rentang sumbu Y [min, max] (default: otomatis)
+
+    Returns:
+        go.Figure
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    fig = go.Figure()
+    for i, col in enumerate(columns):
+        line = dict(color=colors[i], width=2) if colors else None
+        fig.add_trace(line_trace(df[col], col, max_points, method, line=line))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Tanggal",
+        yaxis_title=yaxis_title,
+        yaxis_range=yaxis_range,
+        hovermode='x unified',
+        height=height,
+        template="plotly_white"
+    )
+    return fig
+
+
+@dataset_cached(maxsize=16)
+def validation_figure(train_data, test_data, forecast_df, title='', max_points=DEFAULT_MAX_POINTS):
+    """
+    Figure validasi: data training, data test, prediksi dan CI 95% (di-cache per hash data)
+
+    Args:
+        train_data: pd.Series data training
+        test_data: pd.Series data test
+        forecast_df: DataFrame forecast (kolom forecast, lower, upper)
+        title: Judul grafik
+        max_points: Titik maksimum untuk garis training
+
+    Returns:
+        go.Figure
+    """
+    fig = go.Figure()
+
+    # Data Training (80%)
+    if len(train_data) > 0:
+        fig.add_trace(line_trace(
+            train_data, 'Data Training (80%)', max_points,
+            line=dict(color='#95a5a6', width=2), opacity=0.7
+        ))
+
+    # Data Test Aktual (20%)
+    if len(test_data) > 0:
+        fig.add_trace(line_trace(
+            test_data, 'Data Test Aktual (20%)', max_points,
+            mode='lines+markers',
+            line=dict(color='#3498db', width=2.5),
+            marker=dict(size=7, symbol='circle')
+        ))
+
+    # Prediksi pada Test Set
+    if len(forecast_df) > 0:
+        fig.add_trace(go.Scatter(
+            x=forecast_df.index,
+            y=forecast_df['forecast'].values,
+            mode='lines+markers',
+            name='Prediksi Model',
+            line=dict(color='#e74c3c', width=2.5, dash='dash'),
+            marker=dict(size=7, symbol='diamond')
+        ))
+
+        # Confidence interval
+        if 'upper' in forecast_df.columns and 'lower' in forecast_df.columns:
+            fig.add_trace(_band_trace(forecast_df, 'lower', 'upper', 'Confidence Interval (95%)', 0.15))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Tanggal",
+        yaxis_title="Harga (Rp)",
+        hovermode='x unified',
+        height=550,
+        template="plotly_white",
+        legend=dict(x=0.01, y=0.99)
+    )
+    return fig
+
+
+@dataset_cached(maxsize=16)
+def forecast_figure(history, forecast_df, title='', max_points=DEFAULT_MAX_POINTS):
+    """
+    Figure prediksi: histori, forecast, CI 95% dan fan chart 80%/50% (di-cache per hash data)
+
+    Args:
+        history: pd.Series data historis
+        forecast_df: DataFrame forecast (kolom forecast, lower, upper, lower_80, ...)
+        title: Judul grafik
+        max_points: Titik maksimum untuk garis histori
+
+    Returns:
+        go.Figure
+    """
+    fig = go.Figure()
+
+    # Data historis
+    fig.add_trace(line_trace(history, 'Data Historis', max_points, line=dict(color='#3498db', width=2)))
+
+    # Prediksi masa depan
+    fig.add_trace(go.Scatter(
+        x=forecast_df.index,
+        y=forecast_df['forecast'].values,
+        mode='lines+markers',
+        name='Prediksi Masa Depan',
+        line=dict(color='#e74c3c', width=2.5, dash='dash'),
+        marker=dict(size=7, symbol='diamond')
+    ))
+
+    # Confidence interval
+    fig.add_trace(_band_trace(forecast_df, 'lower', 'upper', 'Confidence Interval (95%)', 0.15))
+
+    # Fan chart: interval 80% dan 50% dari forecast yang sama (tanpa fit ulang)
+    for level, opacity in [('80', 0.2), ('50', 0.3)]:
+        if f'lower_{level}' in forecast_df.columns:
+            fig.add_trace(_band_trace(
+                forecast_df, f'lower_{level}', f'upper_{level}', f'Confidence Interval ({level}%)', opacity
+            ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Tanggal",
+        yaxis_title="Harga (Rp)",
+        hovermode='x unified',
+        height=550,
+        template="plotly_white",
+        legend=dict(x=0.01, y=0.99)
+    )
+    return fig
@@ -0,0 +1,298 @@
+"""
+============================================
+COMPACT MODEL
+Representasi ringkas hasil fit SARIMAX yang siap untuk forecast
+============================================
+
+Hasil fit statsmodels menyimpan seluruh state filtered/smoothed beserta
+kovariansnya (nobs x k_states^2). Dengan m=52 objek ini bisa puluhan-ratusan MB
+per komoditas. CompactForecastModel hanya menyimpan:
+    - parameter, AIC/BIC, info optimizer
+    - matriks state space (time-invariant) dan scale
+    - koefisien regresi exog (obs_intercept dihitung dari exog periode forecast)
+    - state prediksi terakhir beserta kovariansnya
+    - residual
+
+Forecast dihitung dengan rekursi Kalman dari state terakhir, hasilnya identik
+dengan get_forecast() statsmodels. Interface get_forecast(steps) /
+predicted_mean / conf_int(alpha) sama sehingga bisa dipakai sebagai pengganti.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from src.instrumentation import timed_stage
+
+_SSM_MATRICES = [
+    'design', 'obs_intercept', 'obs_cov',
+    'transition', 'state_intercept', 'selection', 'state_cov'
+]
+
+
+def _label(value):
+    # 0.8 -> '80', 0.025 -> '2.5'
+    return f"{value * 100:g}"
+
+
+def interval_z(levels):
+    """
+    Nilai z normal untuk setiap confidence level
+
+    Args:
+        levels: Confidence level (0-1), satu nilai atau list
+
+    Returns:
+        np.ndarray: z per level
+    """
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    if np.any((levels <= 0) | (levels >= 1)):
+        raise ValueError(f"Confidence level harus di antara 0 dan 1, bukan {levels.tolist()}")
+    return norm.ppf(1 - (1 - levels) / 2)
+
+
+def prediction_intervals(mean, std, levels=None, quantiles=None, index=None):
+    """
+    Interval prediksi untuk banyak level dan quantile sekaligus dari satu mean/std
+    (vektorisasi, tanpa fit atau forecast ulang)
+
+    Args:
+        mean: Array forecast mean
+        std: Array standar deviasi forecast
+        levels: Confidence level (0-1), mis. [0.5, 0.8, 0.95] -> kolom lower_50, upper_50, ...
+        quantiles: Quantile (0-1), mis. [0.1, 0.5, 0.9] -> kolom q10, q50, q90
+        index: Index DataFrame hasil
+
+    Returns:
+        pd.DataFrame: Kolom interval dan quantile
+    """
+    mean = np.asarray(mean, dtype=float)[:, None]
+    std = np.asarray(std, dtype=float)[:, None]
+    columns = {}
+
+    if levels is not None and len(np.atleast_1d(levels)):
+        levels = np.atleast_1d(np.asarray(levels, dtype=float))
+        half_width = std * interval_z(levels)[None, :]
+        lower, upper = mean - half_width, mean + half_width
+        for i, level in enumerate(levels):
+            columns[f'lower_{_label(level)}'] = lower[:, i]
+            columns[f'upper_{_label(level)}'] = upper[:, i]
+
+    if quantiles is not None and len(np.atleast_1d(quantiles)):
+        quantiles = np.atleast_1d(np.asarray(quantiles, dtype=float))
+        if np.any((quantiles <= 0) | (quantiles >= 1)):
+            raise ValueError(f"Quantile harus di antara 0 dan 1, bukan {quantiles.tolist()}")
+        values = mean + std * norm.ppf(quantiles)[None, :]
+        for i, q in enumerate(quantiles):
+            columns[f'q{_label(q)}'] = values[:, i]
+
+    return pd.DataFrame(columns, index=index)
+
+
+class CompactForecast:
+    """
+    Hasil forecast dari CompactForecastModel (mirip PredictionResults statsmodels)
+    """
+
+    def __init__(self, predicted_mean, var_pred_mean, endog_name='y'):
+        self.predicted_mean = predicted_mean
+        self.var_pred_mean = var_pred_mean
+        self.endog_name = endog_name
+
+    def conf_int(self, alpha=0.05):
+        """
+        Confidence interval normal
+
+        Args:
+            alpha: Significance level
+
+        Returns:
+            pd.DataFrame: Kolom 'lower <nama>' dan 'upper <nama>'
+        """
+        intervals = self.intervals(levels=[1 - alpha])
+        intervals.columns = [f'lower {self.endog_name}', f'upper {self.endog_name}']
+        return intervals
+
+    def intervals(self, levels=(0.5, 0.8, 0.95), quantiles=None):
+        """
+        Interval untuk banyak level / quantile sekaligus (lihat prediction_intervals)
+        """
+        return prediction_intervals(
+            self.predicted_mean.values, np.sqrt(self.var_pred_mean.values),
+            levels=levels, quantiles=quantiles, index=self.predicted_mean.index
+        )
+
+
+class CompactForecastModel:
+    """
+    Model SARIMAX ringkas: cukup untuk forecast, residual, dan info model
+    """
+
+    def __init__(self, params, matrices, state, state_cov, scale, resid,
+                 last_index, freq=None, endog_name='y', order=None, seasonal_order=None,
+                 aic=None, bic=None, llf=None, mle_retvals=None, exog_names=None, exog_params=None):
+        self.params = params
+        self.matrices = matrices
+        self.state = state
+        self.state_cov = state_cov
+        self.scale = scale
+        self.resid = resid
+        self.last_index = last_index
+        self.freq = freq
+        self.endog_name = endog_name
+        self.order = order
+        self.seasonal_order = seasonal_order
+        self.aic = aic
+        self.bic = bic
+        self.llf = llf
+        self.mle_retvals = mle_retvals or {}
+        self.exog_names = list(exog_names or [])
+        self.exog_params = np.zeros(0) if exog_params is None else np.asarray(exog_params, dtype=float)
+
+    @classmethod
+    def from_results(cls, fitted_model):
+        """
+        Buat model ringkas dari hasil fit / filter SARIMAX statsmodels
+
+        Args:
+            fitted_model: SARIMAXResults (boleh hasil filter low-memory)
+
+        Returns:
+            CompactForecastModel
+        """
+        with timed_stage('compact_model'):
+            model = fitted_model.model
+            ssm = model.ssm
+
+            # Regresi exog (mle_regression) masuk ke obs_intercept = exog @ beta per waktu:
+            # simpan beta dan bagian obs_intercept yang konstan
+            exog_names, exog_params = [], None
+            if getattr(model, 'k_exog', 0) and getattr(model, 'mle_regression', False):
+                exog_names = list(model.exog_names)
+                exog_params = np.asarray(fitted_model.params[:model.k_exog], dtype=float)
+
+            matrices = {}
+            for name in _SSM_MATRICES:
+                matrix = np.asarray(ssm[name])
+                if name == 'obs_intercept' and exog_names and matrix.ndim > 1:
+                    matrix = matrix[:, -1] - np.asarray(model.exog)[-1] @ exog_params
+                if name in ('obs_intercept', 'state_intercept'):
+                    expected_ndim = 1
+                else:
+                    expected_ndim = 2
+                if matrix.ndim > expected_ndim:
+                    raise ValueError(f"Matriks '{name}' time-varying, tidak bisa diringkas")
+                matrices[name] = matrix.copy()
+
+            filter_results = fitted_model.filter_results
+            index = model._index
+            freq = getattr(index, 'freqstr', None) if isinstance(index, pd.DatetimeIndex) else None
+
+            try:
+                resid = pd.Series(np.asarray(fitted_model.resid), index=index, name=model.endog_names)
+            except Exception:
+                resid = None
+
+            return cls(
+                params=fitted_model.params.copy(),
+                matrices=matrices,
+                state=np.array(filter_results.predicted_state[:, -1]),
+                state_cov=np.array(filter_results.predicted_state_cov[:, :, -1]),
+                scale=float(fitted_model.scale),
+                resid=resid,
+                last_index=index[-1],
+                freq=freq,
+                endog_name=model.endog_names,
+                order=tuple(model.order),
+                seasonal_order=tuple(model.seasonal_order),
+                aic=float(fitted_model.aic),
+                bic=float(fitted_model.bic),
+                llf=float(fitted_model.llf),
+                mle_retvals=dict(getattr(fitted_model, 'mle_retvals', None) or {}),
+                exog_names=exog_names,
+                exog_params=exog_params
+            )
+
+    @property
+    def nobs(self):
+        return 0 if self.resid is None else len(self.resid)
+
+    @property
+    def nbytes(self):
+        """
+        Perkiraan ukuran array yang disimpan (byte)
+        """
+        total = self.state.nbytes + self.state_cov.nbytes + self.exog_params.nbytes
+        total += sum(m.nbytes for m in self.matrices.values())
+        if self.resid is not None:
+            total += self.resid.values.nbytes
+        return total
+
+    def _forecast_index(self, steps):
+        if self.freq is not None:
+            return pd.date_range(start=self.last_index, periods=steps + 1, freq=self.freq)[1:]
+        start = int(self.last_index) + 1 if isinstance(self.last_index, (int, np.integer)) else self.nobs
+        return pd.RangeIndex(start, start + steps)
+
+    def _exog_intercept(self, steps, exog):
+        """
+        obs_intercept per langkah forecast (konstan jika model tanpa exog)
+        """
+        intercept = np.full(steps, float(self.matrices['obs_intercept'][0]))
+        if not self.exog_names:
+            return intercept
+        if exog is None:
+            raise ValueError(f"Model memakai regresor exog ({', '.join(self.exog_names)}); exog forecast wajib diisi")
+        exog = np.asarray(exog, dtype=float).reshape(-1, len(self.exog_names))
+        if len(exog) < steps:
+            raise ValueError(f"exog forecast berisi {len(exog)} baris, dibutuhkan {steps}")
+        return intercept + exog[:steps] @ self.exog_params
+
+    def get_forecast(self, steps=1, exog=None):
+        """
+        Forecast out-of-sample dari state terakhir
+
+        Args:
+            steps: Jumlah periode forecast
+            exog: Regresor periode forecast (steps x k_exog), wajib jika model memakai exog
+
+        Returns:
+            CompactForecast: predicted_mean, var_pred_mean, conf_int(alpha)
+        """
+        m = self.matrices
+        obs_intercept = self._exog_intercept(steps, exog)
+        design, transition = m['design'], m['transition']
+        # state_cov terakhir sudah dalam skala asli; noise baru dikalikan scale
+        # (scale = 1 kecuali concentrate_scale=True)
+        state_noise = self.scale * (m['selection'] @ m['state_cov'] @ m['selection'].T)
+        obs_noise = self.scale * m['obs_cov']
+
+        state = self.state
+        state_cov = self.state_cov
+        means = np.empty(steps)
+        variances = np.empty(steps)
+        for h in range(steps):
+            means[h] = (design @ state)[0] + obs_intercept[h]
+            variances[h] = (design @ state_cov @ design.T + obs_noise)[0, 0]
+            state = transition @ state + m['state_intercept']
+            state_cov = transition @ state_cov @ transition.T + state_noise
+
+        index = self._forecast_index(steps)
+        return CompactForecast(
+            pd.Series(means, index=index, name='predicted_mean'),
+            pd.Series(variances, index=index, name='var_pred_mean'),
+            endog_name=self.endog_name
+        )
+
+    def forecast(self, steps=1, exog=None):
+        """
+        Forecast titik (predicted mean)
+
+        Args:
+            steps: Jumlah periode forecast
+            exog: Regresor periode forecast (jika model memakai exog)
+
+        Returns:
+            pd.Series
+        """
+        return self.get_forecast(steps, exog).predicted_mean
@@ -0,0 +1,263 @@
+"""
+============================================
+CROSS CORRELATION
+Korelasi antar komoditas dan analisis lead-lag (FFT, semua pasangan)
+============================================
+
+Menjawab "komoditas mana yang bergerak lebih dulu" (mis. bawang merah sebelum
+cabai). Korelasi dihitung pada perubahan harga (default log return), bukan
+level, agar trend bersama tidak menghasilkan korelasi semu.
+
+Korelasi silang r_ij(l) = corr(x_i(t), x_j(t + l)) untuk l = -max_lag..max_lag:
+    - setiap kolom di-FFT sekali; setiap pasangan cukup satu perkalian spektrum
+      dan satu inverse FFT (O(n log n) per pasangan, dikerjakan per blok baris
+      sebagai operasi array, bukan loop per pasangan per lag)
+    - data kosong ditangani dengan mask: jumlah kuadrat dan jumlah observasi
+      dihitung hanya pada periode yang teramati di kedua series (juga lewat FFT)
+    - l > 0 berarti komoditas i bergerak l periode lebih dulu dari j
+
+Korelasi bergulir (rolling) dihitung dari jumlah kumulatif untuk satu komoditas
+terhadap semua komoditas lain sekaligus. Semua hasil di-cache per hash dataset.
+
+    table = lead_lag_table(df, max_lag=8)
+    table[table['significant']].head()       # leader, follower, lag, corr
+    rolling = rolling_correlation(df, 'Cabai Merah kriting', window=26)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import fft as sp_fft
+from scipy.stats import norm
+
+from src.utils import dataset_cached
+from src.instrumentation import timed_stage
+
+TRANSFORMS = ('log_return', 'diff', 'level')
+
+LEAD_LAG_COLUMNS = ['leader', 'follower', 'lag', 'corr', 'corr_lag0', 'n_overlap', 'threshold', 'significant']
+
+# Jumlah komoditas per blok inverse FFT (membatasi memori: blok x k x panjang FFT)
+_BLOCK_SIZE = 16
+
+
+def transform_prices(df, transform='log_return'):
+    """
+    Ubah harga ke perubahan harga sebelum dikorelasikan
+
+    Args:
+        df: DataFrame harga (index datetime, satu kolom per komoditas)
+        transform: 'log_return', 'diff', atau 'level'
+
+    Returns:
+        pd.DataFrame: Data hasil transformasi (NaN dipertahankan)
+    """
+    if transform not in TRANSFORMS:
+        raise ValueError(f"Transformasi '{transform}' tidak dikenal. Pilihan: {', '.join(TRANSFORMS)}")
+    data = df.astype(float)
+    if transform == 'level':
+        return data
+    if transform == 'diff':
+        return data.diff()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.log(data.where(data > 0)).diff()
+
+
+def _standardize(values):
+    """
+    Standarisasi per kolom (mean 0, std 1) dan mask observasi; NaN menjadi 0
+    """
+    mask = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(np.where(mask, values, np.nan), axis=0)
+        std = np.nanstd(np.where(mask, values, np.nan), axis=0)
+        z = (values - mean) / np.where(std > 0, std, np.nan)
+    mask &= np.isfinite(z)
+    return np.where(mask, z, 0.0), mask.astype(float)
+
+
+def _lagged_products(left, right, size, max_lag):
+    """
+    sum_t left_i(t) * right_j(t + l) untuk blok baris left dan kolom right
+
+    Args:
+        left: rFFT blok series (b, f)
+        right: rFFT series pasangan (k, f)
+
+    Returns:
+        np.ndarray: (2 * max_lag + 1, b, k) untuk lag -max_lag..max_lag
+    """
+    full = sp_fft.irfft(np.conj(left)[:, None, :] * right[None, :, :], n=size, axis=-1, workers=-1)
+    # Lag negatif ada di ujung array FFT sirkular
+    lagged = np.concatenate([full[..., size - max_lag:], full[..., :max_lag + 1]], axis=-1)
+    return np.moveaxis(lagged, -1, 0)
+
+
+@dataset_cached(maxsize=8)
+def cross_correlation_matrix(df, max_lag=8, transform='log_return'):
+    """
+    Korelasi silang semua pasangan komoditas untuk lag -max_lag..max_lag
+
+    Args:
+        df: DataFrame harga (index teratur, satu kolom per komoditas)
+        max_lag: Lag maksimum (periode)
+        transform: 'log_return', 'diff', atau 'level' (lihat transform_prices)
+
+    Returns:
+        dict: {'corr': array (lags, k, k), 'n_overlap': array (lags, k, k),
+               'lags': array lag, 'columns': list komoditas}.
+              corr[l, i, j] = corr(x_i(t), x_j(t + lag)). Hasil di-cache: jangan diubah.
+    """
+    data = transform_prices(df, transform)
+    values = data.to_numpy()
+    n, k = values.shape
+    max_lag = int(max(0, min(max_lag, n - 2)))
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    with timed_stage('cross_correlation', commodities=k, rows=n, max_lag=max_lag):
+        z, mask = _standardize(values)
+        # Zero-padding >= n + max_lag: korelasi sirkular FFT sama dengan linear untuk |lag| <= max_lag
+        size = sp_fft.next_fast_len(n + max_lag + 1, real=True)
+        fz = sp_fft.rfft(z.T, n=size, axis=-1, workers=-1)
+        fz2 = sp_fft.rfft(z.T ** 2, n=size, axis=-1, workers=-1)
+        fm = sp_fft.rfft(mask.T, n=size, axis=-1, workers=-1)
+
+        corr = np.full((len(lags), k, k), np.nan)
+        overlap = np.zeros((len(lags), k, k))
+        for start in range(0, k, _BLOCK_SIZE):
+            # Hanya pasangan i <= j; sisanya dari simetri r_ij(l) = r_ji(-l)
+            rows, cols = slice(start, min(start + _BLOCK_SIZE, k)), slice(start, k)
+            sxy = _lagged_products(fz[rows], fz[cols], size, max_lag)
+            # Jumlah kuadrat hanya pada periode yang teramati di kedua series
+            sxx = _lagged_products(fz2[rows], fm[cols], size, max_lag)
+            syy = _lagged_products(fm[rows], fz2[cols], size, max_lag)
+            count = np.rint(_lagged_products(fm[rows], fm[cols], size, max_lag))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                r = sxy / np.sqrt(sxx * syy)
+            corr[:, rows, cols] = np.where((count > 2) & np.isfinite(r), np.clip(r, -1, 1), np.nan)
+            overlap[:, rows, cols] = count
+
+        lower = np.tril_indices(k, -1)
+        corr[:, lower[0], lower[1]] = corr[::-1, lower[1], lower[0]]
+        overlap[:, lower[0], lower[1]] = overlap[::-1, lower[1], lower[0]]
+
+    return {'corr': corr, 'n_overlap': overlap, 'lags': lags, 'columns': list(df.columns)}
+
+
+def cross_correlation(df, first, second, max_lag=8, transform='log_return'):
+    """
+    Korelasi silang satu pasangan per lag (untuk grafik)
+
+    Args:
+        df: DataFrame harga
+        first: Komoditas i
+        second: Komoditas j
+        max_lag: Lag maksimum
+        transform: Transformasi harga
+
+    Returns:
+        pd.Series: Index lag; nilai > 0 di lag positif berarti first mendahului second
+    """
+    result = cross_correlation_matrix(df[[first, second]], max_lag, transform)
+    return pd.Series(result['corr'][:, 0, 1], index=pd.Index(result['lags'], name='lag'),
+                     name=f'{first} → {second}')
+
+
+@dataset_cached(maxsize=8)
+def lead_lag_table(df, max_lag=8, transform='log_return', alpha=0.05, min_overlap=20):
+    """
+    Lead-lag terkuat untuk setiap pasangan komoditas
+
+    Args:
+        df: DataFrame harga
+        max_lag: Lag maksimum (periode)
+        transform: Transformasi harga (lihat transform_prices)
+        alpha: Significance level (batas white noise z / sqrt(n_overlap))
+        min_overlap: Observasi bersama minimum agar lag dipertimbangkan
+
+    Returns:
+        pd.DataFrame: Satu baris per pasangan, kolom LEAD_LAG_COLUMNS, urut |corr| menurun.
+            lag = berapa periode leader bergerak lebih dulu (0 = bergerak bersamaan).
+            Hasil di-cache: jangan dimodifikasi in-place.
+    """
+    result = cross_correlation_matrix(df, max_lag, transform)
+    corr, overlap, lags = result['corr'], result['n_overlap'], result['lags']
+    columns = np.asarray(result['columns'], dtype=object)
+    k = len(columns)
+    if k < 2:
+        return pd.DataFrame(columns=LEAD_LAG_COLUMNS)
+
+    with timed_stage('lead_lag_table', pairs=k * (k - 1) // 2):
+        i, j = np.triu_indices(k, 1)
+        pair_corr = corr[:, i, j]                                             # (lags, pairs)
+        pair_overlap = overlap[:, i, j]
+        usable = np.where(pair_overlap >= min_overlap, np.abs(pair_corr), np.nan)
+        has_value = ~np.isnan(usable).all(axis=0)
+        best = np.argmax(np.nan_to_num(usable, nan=-1.0), axis=0)
+
+        pairs = np.arange(len(i))
+        best_lag = lags[best]
+        best_corr = pair_corr[best, pairs]
+        n_overlap = pair_overlap[best, pairs]
+        zero = int(np.flatnonzero(lags == 0)[0])
+        # Lag negatif: j yang bergerak lebih dulu, tukar peran
+        swap = best_lag < 0
+        table = pd.DataFrame({
+            'leader': np.where(swap, columns[j], columns[i]),
+            'follower': np.where(swap, columns[i], columns[j]),
+            'lag': np.abs(best_lag),
+            'corr': best_corr,
+            'corr_lag0': pair_corr[zero],
+            'n_overlap': n_overlap.astype(int)
+        }, columns=LEAD_LAG_COLUMNS)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Koreksi Bonferroni untuk jumlah lag yang dicoba per pasangan
+            table['threshold'] = norm.ppf(1 - alpha / (2 * len(lags))) / np.sqrt(n_overlap)
+        table['significant'] = has_value & (np.abs(best_corr) > table['threshold'].to_numpy())
+        table = table[has_value]
+        order = np.argsort(-np.abs(table['corr'].to_numpy()), kind='stable')
+        return table.iloc[order].reset_index(drop=True)
+
+
+@dataset_cached(maxsize=16)
+def rolling_correlation(df, target, window=26, transform='log_return', min_periods=None):
+    """
+    Korelasi bergulir satu komoditas terhadap semua komoditas lain (lag 0)
+
+    Args:
+        df: DataFrame harga
+        target: Komoditas acuan
+        window: Panjang jendela (periode)
+        transform: Transformasi harga (lihat transform_prices)
+        min_periods: Observasi bersama minimum per jendela (default: window // 2)
+
+    Returns:
+        pd.DataFrame: Index tanggal, satu kolom per komoditas lain
+    """
+    min_periods = window // 2 if min_periods is None else min_periods
+    data = transform_prices(df, transform)
+    others = [c for c in data.columns if c != target]
+    x = data[target].to_numpy()[:, None]
+    y = data[others].to_numpy()
+
+    with timed_stage('rolling_correlation', commodities=len(others), rows=len(data), window=window):
+        both = ~np.isnan(x) & ~np.isnan(y)
+        xs, ys = np.where(both, x, 0.0), np.where(both, y, 0.0)
+        # Awal jendela setiap baris (jendela di awal data lebih pendek; dibatasi min_periods)
+        window_start = np.maximum(np.arange(1, len(data) + 1) - window, 0)
+
+        def window_sum(values):
+            # Jumlah per jendela dari selisih jumlah kumulatif (semua kolom sekaligus)
+            cum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+            return cum[1:] - cum[window_start]
+
+        count = window_sum(both.astype(float))
+        sx, sy = window_sum(xs), window_sum(ys)
+        sxx, syy, sxy = window_sum(xs ** 2), window_sum(ys ** 2), window_sum(xs * ys)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = sxy - sx * sy / count
+            var_x = sxx - sx ** 2 / count
+            var_y = syy - sy ** 2 / count
+            r = cov / np.sqrt(var_x * var_y)
+        r = np.where((count >= max(min_periods, 3)) & (var_x > 1e-12) & (var_y > 1e-12), np.clip(r, -1, 1), np.nan)
+
+    return pd.DataFrame(r, index=data.index, columns=others)
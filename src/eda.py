@@ -0,0 +1,275 @@
+"""
+============================================
+EDA PROFILE
+Profil statistik semua komoditas dalam satu pass vektor
+============================================
+
+Tab Explorasi dulu menghitung statistik per kolom (describe, loop missing
+value) di setiap rerun. profile_dataset menghitung semuanya sekaligus pada
+matriks (tanggal x komoditas) lalu di-cache per hash dataset:
+
+    - jumlah observasi, missing, gap terpanjang, periode awal/akhir
+    - mean, std, CV, quantile
+    - volatilitas log return per periode
+    - uji ADF (H0: unit root) dan KPSS (H0: stasioner level)
+    - ACF lag 1 dan lag musiman, uji Ljung-Box
+
+Setiap kolom hanya memakai rentang datanya sendiri (observasi pertama s.d.
+terakhir); gap di tengah diinterpolasi linear untuk uji dan ACF. Regresi ADF
+semua kolom diselesaikan sebagai satu batch persamaan normal dengan jumlah
+lag bersama (aturan Schwert) - bukan pemilihan lag AIC per kolom seperti
+adfuller statsmodels, sehingga statistik bisa sedikit berbeda.
+
+    profile = profile_dataset(df)
+    profile.loc['Beras Premium', ['adf_p', 'kpss_p', 'stationary']]
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.utils import dataset_cached, get_dataset_frequency
+from src.cleaning import gap_lengths
+from src.seasonality import seasonal_candidates
+from src.instrumentation import timed_stage
+
+# Try imports that may not be available in every environment
+try:
+    from statsmodels.tsa.adfvalues import mackinnonp
+    _STATSMODELS_IMPORT_ERROR = None
+except Exception as e:
+    mackinnonp = None
+    _STATSMODELS_IMPORT_ERROR = e
+
+PROFILE_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Nilai kritis KPSS stasioner level (Kwiatkowski et al. 1992, tabel 1)
+_KPSS_CRITICAL = np.array([0.347, 0.463, 0.574, 0.739])
+_KPSS_PVALUES = np.array([0.10, 0.05, 0.025, 0.01])
+
+# Observasi minimum agar uji stasioneritas / ACF dihitung
+MIN_TEST_OBS = 20
+
+
+def _spans(values):
+    """
+    Mask rentang data per kolom (observasi pertama s.d. terakhir) dan
+    nilai dengan gap tengah terisi interpolasi linear
+    """
+    observed = ~np.isnan(values)
+    inside = (np.cumsum(observed, axis=0) > 0) & (np.cumsum(observed[::-1], axis=0)[::-1] > 0)
+    filled = pd.DataFrame(values).interpolate(limit_area='inside').to_numpy()
+    return inside, np.where(inside, filled, 0.0)
+
+
+def _autocovariance(centered, n_obs, max_lag):
+    """
+    Autokovarians lag 0..max_lag semua kolom lewat FFT (baris di luar rentang bernilai 0)
+    """
+    size = 1 << int(np.ceil(np.log2(2 * centered.shape[0] - 1)))
+    spectrum = np.fft.rfft(centered, n=size, axis=0)
+    acov = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=0)[:max_lag + 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return acov / n_obs
+
+
+def acf_matrix(values, inside, max_lag):
+    """
+    ACF lag 0..max_lag untuk semua kolom
+
+    Args:
+        values: Array (n, k) hasil _spans (0 di luar rentang)
+        inside: Mask rentang data (n, k)
+        max_lag: Lag maksimum
+
+    Returns:
+        np.ndarray: (max_lag + 1, k)
+    """
+    n_obs = inside.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = values.sum(axis=0) / n_obs
+    centered = np.where(inside, values - mean, 0.0)
+    acov = _autocovariance(centered, n_obs, max_lag)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(acov[0] > 0, acov / acov[0], np.nan)
+
+
+def batch_adf(values, inside, lags):
+    """
+    Uji ADF (konstanta, tanpa trend) untuk semua kolom dengan jumlah lag yang sama
+
+    Args:
+        values: Array (n, k) hasil _spans
+        inside: Mask rentang data (n, k)
+        lags: Jumlah lag selisih di regresi
+
+    Returns:
+        tuple: (statistik ADF, p-value MacKinnon) - array (k,)
+    """
+    n, k = values.shape
+    diff = np.diff(values, axis=0)                                       # (n-1, k)
+    rows = np.arange(lags + 1, n)
+    # Baris t dipakai jika y_t dan semua lag-nya berada di dalam rentang data
+    usable = inside[rows] & inside[rows - lags - 1]
+    columns = [np.ones((len(rows), k)), values[rows - 1]]
+    columns += [diff[rows - 1 - i] for i in range(1, lags + 1)]
+    X = np.stack(columns, axis=0) * usable[None, :, :]                  # (p+2, T, k)
+    X = np.ascontiguousarray(X.transpose(2, 1, 0))                      # (k, T, p+2)
+    y = (diff[rows - 1] * usable).T                                     # (k, T)
+
+    # Persamaan normal semua kolom sebagai satu matmul batch
+    xtx = X.transpose(0, 2, 1) @ X
+    xty = (X.transpose(0, 2, 1) @ y[:, :, None])[:, :, 0]
+    n_used = usable.sum(axis=0)
+    n_params = lags + 2
+    valid = n_used > n_params + 5
+    # Kolom yang tidak cukup data diberi sistem identitas agar solve batch tidak gagal
+    xtx[~valid] = np.eye(n_params)
+    xty[~valid] = 0.0
+    try:
+        beta = np.linalg.solve(xtx, xty[:, :, None])[:, :, 0]
+        inverse = np.linalg.inv(xtx)
+    except np.linalg.LinAlgError:
+        beta = np.einsum('kpq,kq->kp', np.linalg.pinv(xtx), xty)
+        inverse = np.linalg.pinv(xtx)
+
+    resid = y - (X @ beta[:, :, None])[:, :, 0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma2 = (resid ** 2).sum(axis=1) / (n_used - n_params)
+        stat = beta[:, 1] / np.sqrt(sigma2 * inverse[:, 1, 1])
+    stat = np.where(valid & np.isfinite(stat), stat, np.nan)
+
+    pvalue = np.full(k, np.nan)
+    if mackinnonp is not None:
+        finite = np.isfinite(stat)
+        pvalue[finite] = [mackinnonp(s, regression='c', N=1) for s in stat[finite]]
+    return stat, pvalue
+
+
+def batch_kpss(values, inside, lags=None):
+    """
+    Uji KPSS stasioner level untuk semua kolom (varians jangka panjang Newey-West)
+
+    Args:
+        values: Array (n, k) hasil _spans
+        inside: Mask rentang data (n, k)
+        lags: Lag Bartlett (default: ceil(12 * (n/100)^0.25))
+
+    Returns:
+        tuple: (statistik KPSS, p-value interpolasi tabel, dibatasi 0.01-0.10) - array (k,)
+    """
+    n_obs = inside.sum(axis=0)
+    if lags is None:
+        lags = int(np.ceil(12 * (max(n_obs.max(), 1) / 100) ** 0.25))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = values.sum(axis=0) / n_obs
+    resid = np.where(inside, values - mean, 0.0)
+    partial = np.cumsum(resid, axis=0)
+
+    acov = _autocovariance(resid, n_obs, lags)
+    weights = 1 - np.arange(1, lags + 1) / (lags + 1)
+    long_run = acov[0] + 2 * (weights[:, None] * acov[1:]).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stat = (np.where(inside, partial, 0.0) ** 2).sum(axis=0) / (n_obs ** 2 * long_run)
+    stat = np.where((n_obs >= MIN_TEST_OBS) & (long_run > 0), stat, np.nan)
+    # Tabel naik: statistik lebih besar -> p-value lebih kecil
+    pvalue = np.interp(stat, _KPSS_CRITICAL, _KPSS_PVALUES)
+    return stat, np.where(np.isnan(stat), np.nan, pvalue)
+
+
+@dataset_cached(maxsize=16)
+def profile_dataset(df, quantiles=PROFILE_QUANTILES, alpha=0.05, adf_lags=None, acf_lags=None):
+    """
+    Profil statistik semua kolom sekaligus (di-cache per hash dataset)
+
+    Args:
+        df: DataFrame (index datetime, satu kolom per komoditas)
+        quantiles: Quantile yang dihitung -> kolom q5, q25, ...
+        alpha: Significance level uji stasioneritas dan Ljung-Box
+        adf_lags: Jumlah lag ADF (default: floor(12 * (n/100)^0.25), dibatasi n/5)
+        acf_lags: Lag Ljung-Box (default: min(10, n/5))
+
+    Returns:
+        pd.DataFrame: Satu baris per komoditas dengan kolom n_obs, missing, missing_pct,
+            longest_gap, start, end, mean, std, cv, min, q.., max, volatility,
+            max_abs_return, adf_stat, adf_p, kpss_stat, kpss_p, stationary,
+            acf_1, seasonal_lag, acf_seasonal, ljung_box_p.
+            Hasil di-cache: jangan dimodifikasi in-place.
+    """
+    with timed_stage('profile_dataset', commodities=len(df.columns), rows=len(df)):
+        data = df.astype(float)
+        values = data.to_numpy()
+        n, k = values.shape
+        observed = ~np.isnan(values)
+        inside, filled = _spans(values)
+        n_obs = observed.sum(axis=0)
+        span = inside.sum(axis=0)
+
+        profile = pd.DataFrame(index=pd.Index(df.columns, name='komoditas'))
+        profile['n_obs'] = n_obs
+        profile['missing'] = n - n_obs
+        profile['missing_pct'] = 100 * (n - n_obs) / max(n, 1)
+        profile['longest_gap'] = gap_lengths(~observed & inside).max(axis=0) if n else 0
+        # Posisi observasi pertama / terakhir per kolom (argmax pada mask, tanpa loop)
+        has_data = n_obs > 0
+        first = np.argmax(observed, axis=0) if n else np.zeros(k, dtype=int)
+        last = n - 1 - np.argmax(observed[::-1], axis=0) if n else np.zeros(k, dtype=int)
+        profile['start'] = pd.Series(df.index[first] if n else [pd.NaT] * k, index=profile.index).where(has_data)
+        profile['end'] = pd.Series(df.index[last] if n else [pd.NaT] * k, index=profile.index).where(has_data)
+
+        # Statistik level (pandas skipna, semua kolom sekaligus)
+        profile['mean'] = data.mean()
+        profile['std'] = data.std()
+        profile['cv'] = profile['std'] / profile['mean'].abs()
+        profile['min'] = data.min()
+        quantile_table = data.quantile(list(quantiles)).T
+        quantile_table.columns = [f'q{q * 100:g}' for q in quantiles]
+        profile[quantile_table.columns] = quantile_table
+        profile['max'] = data.max()
+
+        # Volatilitas: log return antar observasi berurutan di dalam rentang
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_level = np.log(np.where(inside & (filled > 0), filled, np.nan))
+        returns = pd.DataFrame(np.diff(log_level, axis=0), columns=df.columns)
+        profile['volatility'] = 100 * returns.std()
+        profile['max_abs_return'] = 100 * returns.abs().max()
+
+        # Uji stasioneritas
+        testable = span >= MIN_TEST_OBS
+        max_span = int(span.max()) if k else 0
+        if adf_lags is None:
+            adf_lags = int(np.floor(12 * (max(max_span, 1) / 100) ** 0.25))
+        adf_lags = max(0, min(adf_lags, max_span // 5))
+        if max_span >= MIN_TEST_OBS:
+            adf_stat, adf_p = batch_adf(filled, inside, adf_lags)
+            kpss_stat, kpss_p = batch_kpss(filled, inside)
+        else:
+            adf_stat = adf_p = kpss_stat = kpss_p = np.full(k, np.nan)
+        profile['adf_stat'] = np.where(testable, adf_stat, np.nan)
+        profile['adf_p'] = np.where(testable, adf_p, np.nan)
+        profile['kpss_stat'] = np.where(testable, kpss_stat, np.nan)
+        profile['kpss_p'] = np.where(testable, kpss_p, np.nan)
+        # Stasioner jika ADF menolak unit root dan KPSS tidak menolak stasioneritas
+        stationary = pd.Series((profile['adf_p'] < alpha) & (profile['kpss_p'] > alpha), dtype='boolean')
+        profile['stationary'] = stationary.mask(profile['adf_p'].isna() | profile['kpss_p'].isna())
+
+        # ACF: lag 1, lag musiman terbesar yang muat dua siklus, Ljung-Box
+        candidates = [m for m in seasonal_candidates(get_dataset_frequency(df)) if 2 * m < max_span]
+        seasonal_lag = max(candidates) if candidates else None
+        if acf_lags is None:
+            acf_lags = max(1, min(10, max_span // 5))
+        max_lag = max(acf_lags, seasonal_lag or 1)
+        if max_span > max_lag:
+            acf = acf_matrix(filled, inside, max_lag)
+        else:
+            acf = np.full((max_lag + 1, k), np.nan)
+        lag = np.arange(1, acf_lags + 1)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            q_stat = span * (span + 2) * (acf[1:acf_lags + 1] ** 2 / (span - lag)).sum(axis=0)
+        profile['acf_1'] = np.where(testable, acf[1], np.nan)
+        profile['seasonal_lag'] = seasonal_lag
+        profile['acf_seasonal'] = np.where(testable & (seasonal_lag is not None),
+                                           acf[seasonal_lag or 0], np.nan)
+        profile['ljung_box_p'] = np.where(testable, stats.chi2.sf(q_stat, acf_lags), np.nan)
+
+    return profile
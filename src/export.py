@@ -0,0 +1,238 @@
+"""
+============================================
+EXPORT
+Export forecast, interval dan metrik semua komoditas (CSV / Parquet / Feather / Excel)
+============================================
+
+Satu tabel export dibangun sekali dari output batch_forecast (long-format):
+
+    komoditas | date | forecast | lower_95 | upper_95 | ... | model_type | aic | MAE | ...
+
+lalu ditulis ke format yang dipilih:
+    csv      : di-stream per chunk baris (iter_csv_chunks), tanpa satu string raksasa
+    parquet  : kolumnar via pyarrow
+    feather  : kolumnar via pyarrow (paling cepat dibaca ulang oleh pandas)
+    xlsx     : sheet 'Ringkasan' (metrik) + satu sheet per komoditas; memakai
+               xlsxwriter jika terpasang (jauh lebih cepat), fallback openpyxl
+
+    data = export_forecasts(result['forecast'], metrics, fmt='parquet')    # bytes
+    export_forecasts(result['forecast'], metrics, fmt='csv', output='prediksi.csv')
+"""
+
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import timed_stage
+from src.params_schema import METRIC_FIELDS
+
+try:
+    import pyarrow  # noqa: F401
+    _PYARROW_IMPORT_ERROR = None
+except Exception as e:
+    pyarrow = None
+    _PYARROW_IMPORT_ERROR = e
+
+try:
+    import xlsxwriter  # noqa: F401
+    _XLSX_ENGINE = 'xlsxwriter'
+    # in_memory: tanpa file temporer per sheet (membuat/menghapus ratusan file temp lambat)
+    _XLSX_ENGINE_KWARGS = {'options': {'in_memory': True}}
+except Exception:
+    _XLSX_ENGINE = 'openpyxl'
+    _XLSX_ENGINE_KWARGS = {}
+
+EXPORT_FORMATS = ('csv', 'parquet', 'feather', 'xlsx')
+
+EXPORT_MIME_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/octet-stream',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+DEFAULT_CHUNK_ROWS = 50000
+
+_SHEET_INVALID = re.compile(r'[\[\]:*?/\\]')
+
+
+def iter_csv_chunks(df, chunk_size=DEFAULT_CHUNK_ROWS, index=False):
+    """
+    CSV per chunk baris (header hanya di chunk pertama)
+
+    Args:
+        df: DataFrame
+        chunk_size: Jumlah baris per chunk
+        index: Sertakan index
+
+    Yields:
+        bytes: Potongan CSV UTF-8
+    """
+    if len(df) == 0:
+        yield df.to_csv(index=index).encode('utf-8')
+        return
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        yield chunk.to_csv(index=index, header=start == 0).encode('utf-8')
+
+
+def model_summary_table(params, commodities=None):
+    """
+    Tabel info model per komoditas dari best_params.json
+
+    Args:
+        params: Dictionary parameter (SARIMAParamsLoader.load_params())
+        commodities: List komoditas (default: semua)
+
+    Returns:
+        pd.DataFrame: Index komoditas; model_type, order, seasonal_order, aic, bic, MAE, RMSE,
+            MAPE (metrik tersimpan saat tuning / import, kosong jika belum ada), tuning_date
+    """
+    commodities = list(params) if commodities is None else [c for c in commodities if c in params]
+    rows = {
+        komoditas: {
+            'model_type': params[komoditas].get('model_type'),
+            'order': str(tuple(params[komoditas].get('order', ()))),
+            'seasonal_order': str(tuple(params[komoditas].get('seasonal_order', ()))),
+            **{field: params[komoditas].get(field) for field in METRIC_FIELDS},
+            'tuning_date': params[komoditas].get('tuning_date')
+        }
+        for komoditas in commodities
+    }
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    if len(table):
+        # Metrik yang belum ada (None) menjadi NaN agar kolom tetap numerik di Excel / Parquet
+        table[METRIC_FIELDS] = table[METRIC_FIELDS].apply(pd.to_numeric, errors='coerce')
+    table.index.name = 'komoditas'
+    return table
+
+
+def forecast_export_table(forecast, metrics=None):
+    """
+    Tabel export wide: satu baris per (komoditas, tanggal), kolom interval per level
+    dan metrik per komoditas (vektor, tanpa loop per komoditas)
+
+    Args:
+        forecast: DataFrame long-format hasil batch_forecast
+        metrics: DataFrame metrik/info model dengan index komoditas (opsional)
+
+    Returns:
+        pd.DataFrame
+    """
+    keys = ['komoditas', 'date']
+    if forecast.empty:
+        return pd.DataFrame(columns=keys + ['forecast'])
+
+    # Forecast mean sama untuk semua level: ambil dari level pertama
+    first_level = forecast['level'].iloc[0]
+    mean = forecast.loc[np.isclose(forecast['level'], first_level), keys + ['forecast']]
+
+    bounds = forecast.pivot(index=keys, columns='level', values=['lower', 'upper'])
+    levels = sorted(forecast['level'].unique())
+    ordered = [(bound, level) for level in levels for bound in ('lower', 'upper')]
+    bounds = bounds[ordered]
+    bounds.columns = [f"{bound}_{level * 100:g}" for bound, level in ordered]
+
+    # Urutan komoditas mengikuti urutan input batch
+    table = mean.merge(bounds.reset_index(), on=keys, how='left', sort=False)
+    if metrics is not None and len(metrics):
+        table = table.merge(metrics, left_on='komoditas', right_index=True, how='left', sort=False)
+    return table
+
+
+def _sheet_name(name, used):
+    # Batas Excel: 31 karakter, tanpa []:*?/\, unik (case-insensitive)
+    base = _SHEET_INVALID.sub('_', str(name))[:31] or 'Sheet'
+    candidate, i = base, 1
+    while candidate.lower() in used:
+        suffix = f" ({i})"
+        candidate = base[:31 - len(suffix)] + suffix
+        i += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def write_excel(table, output, metrics=None, sheet_by='komoditas'):
+    """
+    Tulis tabel ke xlsx: sheet 'Ringkasan' + satu sheet per nilai kolom sheet_by
+
+    Args:
+        table: DataFrame export
+        output: Path atau file object biner
+        metrics: DataFrame ringkasan per komoditas (sheet 'Ringkasan', opsional)
+        sheet_by: Kolom pemisah sheet (None = satu sheet 'Data')
+    """
+    used = set()
+    with pd.ExcelWriter(output, engine=_XLSX_ENGINE, engine_kwargs=_XLSX_ENGINE_KWARGS) as writer:
+        if metrics is not None and len(metrics):
+            metrics.to_excel(writer, sheet_name=_sheet_name('Ringkasan', used))
+        if sheet_by is None or sheet_by not in table.columns:
+            table.to_excel(writer, sheet_name=_sheet_name('Data', used), index=False)
+            return
+        metric_columns = [] if metrics is None else [c for c in metrics.columns if c in table.columns]
+        for name, group in table.groupby(sheet_by, sort=False):
+            group.drop(columns=[sheet_by] + metric_columns).to_excel(
+                writer, sheet_name=_sheet_name(name, used), index=False
+            )
+
+
+def write_export(table, fmt='csv', output=None, metrics=None, chunk_size=DEFAULT_CHUNK_ROWS):
+    """
+    Tulis tabel export ke format tertentu
+
+    Args:
+        table: DataFrame export (forecast_export_table)
+        fmt: Salah satu EXPORT_FORMATS
+        output: Path atau file object biner; None = kembalikan bytes
+        metrics: Ringkasan per komoditas (dipakai untuk sheet 'Ringkasan' xlsx)
+        chunk_size: Baris per chunk CSV
+
+    Returns:
+        bytes jika output None, selain itu None
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format export '{fmt}' tidak didukung. Pilihan: {', '.join(EXPORT_FORMATS)}")
+    if fmt in ('parquet', 'feather') and pyarrow is None:
+        raise ImportError(f"Export {fmt} membutuhkan pyarrow: {_PYARROW_IMPORT_ERROR}")
+
+    buffer = io.BytesIO() if output is None else None
+    target = buffer if buffer is not None else output
+
+    with timed_stage('export', format=fmt, rows=len(table)):
+        if fmt == 'csv':
+            handle = open(target, 'wb') if isinstance(target, str) else target
+            try:
+                for chunk in iter_csv_chunks(table, chunk_size):
+                    handle.write(chunk)
+            finally:
+                if handle is not target:
+                    handle.close()
+        elif fmt == 'parquet':
+            table.to_parquet(target, index=False)
+        elif fmt == 'feather':
+            table.reset_index(drop=True).to_feather(target)
+        else:
+            write_excel(table, target, metrics=metrics)
+
+    return buffer.getvalue() if buffer is not None else None
+
+
+def export_forecasts(forecast, metrics=None, fmt='csv', output=None, chunk_size=DEFAULT_CHUNK_ROWS):
+    """
+    Export forecast, interval dan metrik semua komoditas dalam satu langkah
+
+    Args:
+        forecast: DataFrame long-format hasil batch_forecast
+        metrics: DataFrame metrik/info model dengan index komoditas (opsional),
+                 mis. model_summary_table(params) atau metrik validasi
+        fmt: 'csv', 'parquet', 'feather', atau 'xlsx'
+        output: Path atau file object biner; None = kembalikan bytes
+        chunk_size: Baris per chunk CSV
+
+    Returns:
+        bytes jika output None, selain itu None
+    """
+    table = forecast_export_table(forecast, metrics)
+    return write_export(table, fmt, output, metrics=metrics, chunk_size=chunk_size)
@@ -11,29 +11,552 @@ import streamlit as st
 import warnings
 import json
 import os
+import time
 from datetime import datetime
 
 # Try imports that may not be available in every environment
 try:
     from statsmodels.tsa.statespace.sarimax import SARIMAX
+    from statsmodels.tsa.statespace import kalman_filter as _kalman_filter
+    # Simpan hanya yang dibutuhkan untuk forecast out-of-sample. Forecast mean/cov
+    # tetap disimpan karena dipakai untuk menghitung scale saat concentrate_scale=True.
+    _FORECAST_ONLY_MEMORY = (
+        _kalman_filter.MEMORY_NO_PREDICTED_MEAN | _kalman_filter.MEMORY_NO_PREDICTED_COV |
+        _kalman_filter.MEMORY_NO_FILTERED_MEAN | _kalman_filter.MEMORY_NO_FILTERED_COV |
+        _kalman_filter.MEMORY_NO_LIKELIHOOD | _kalman_filter.MEMORY_NO_GAIN |
+        _kalman_filter.MEMORY_NO_SMOOTHING | _kalman_filter.MEMORY_NO_STD_FORECAST
+    )
     _STATSMODELS_IMPORT_ERROR = None
 except Exception as e:
     SARIMAX = None
+    _FORECAST_ONLY_MEMORY = 0
     _STATSMODELS_IMPORT_ERROR = e
 
 try:
     from pmdarima import auto_arima
+    from pmdarima.arima import StepwiseContext
     _PMDARIMA_IMPORT_ERROR = None
 except Exception as e:
     auto_arima = None
+    StepwiseContext = None
     _PMDARIMA_IMPORT_ERROR = e
 
-from src.utils import calculate_metrics_summary
+from src.utils import calculate_metrics_summary, create_forecast_dates, get_dataset_frequency
+from src.instrumentation import timed_stage, fit_diagnostics
+from src.tuning_profiler import profiled_auto_arima, save_tuning_profile, candidate_scope
+from src.compact_model import CompactForecastModel, prediction_intervals
+from src.seasonality import detect_seasonality, seasonal_candidates
+from src.cleaning import regularize_index
+from src.retune import series_fingerprint
+from src.calendar_features import make_exog, extend_exog, exog_names
 
 warnings.filterwarnings('ignore')
 
 
-def train_and_evaluate(series, order, seasonal_order=None, model_type='SARIMA', test_size=0.2):
+def resolve_seasonal_order(seasonal_order, model_type='SARIMA'):
+    """
+    Seasonal order efektif: ARIMA (atau seasonal_order None) berarti tanpa komponen seasonal
+
+    Args:
+        seasonal_order: Tuple (P, D, Q, m) atau None
+        model_type: 'ARIMA' atau 'SARIMA'
+
+    Returns:
+        tuple: (P, D, Q, m)
+    """
+    if model_type.upper() == 'ARIMA' or seasonal_order is None:
+        return (0, 0, 0, 0)
+    return seasonal_order
+
+
+# Penanganan observasi kosong sebelum fit
+#   None     : series dipakai apa adanya
+#   'drop'   : NaN dibuang (jarak antar observasi tidak lagi teratur)
+#   'kalman' : index disamakan ke frekuensi teratur, NaN diteruskan ke Kalman filter
+#              (observasi kosong dilewati di langkah update, tanpa imputasi)
+MISSING_MODES = (None, 'drop', 'kalman')
+
+
+def prepare_endog(series, missing=None):
+    """
+    Siapkan series untuk fit sesuai mode penanganan data kosong (lihat MISSING_MODES)
+    
+    Args:
+        series: pd.Series dengan index datetime
+        missing: None, 'drop', atau 'kalman'
+    
+    Returns:
+        pd.Series: Series siap fit
+    """
+    if missing not in MISSING_MODES:
+        raise ValueError(f"Mode missing '{missing}' tidak dikenal. Pilihan: drop, kalman")
+    if missing == 'drop':
+        return series.dropna()
+    if missing == 'kalman':
+        if isinstance(series.index, pd.DatetimeIndex) and len(series.dropna()) > 2:
+            series = regularize_index(series)
+        # NaN di awal/akhir tidak membawa informasi; forecast mulai dari observasi terakhir
+        return series.loc[series.first_valid_index():series.last_valid_index()]
+    return series
+
+
+def _observed_metrics(actual, forecast):
+    """
+    Metrik hanya pada periode test yang teramati (periode NaN dilewati)
+    """
+    actual = np.asarray(actual, dtype=float)
+    forecast = np.asarray(forecast, dtype=float)
+    observed = ~np.isnan(actual)
+    if not observed.any():
+        raise ValueError("Test set tidak memiliki observasi")
+    return calculate_metrics_summary(actual[observed], forecast[observed])
+
+
+# Profil konfigurasi SARIMAX, dipilih per komoditas lewat key 'fit_profile' di best_params.json
+#   concentrate_scale   : sigma2 dikonsentrasikan keluar dari likelihood (1 parameter lebih sedikit)
+#   simple_differencing : estimasi pada series yang sudah di-difference (state space lebih kecil),
+#                         lalu parameter di-filter ulang pada model level untuk forecast
+#   low_memory          : filter akhir hanya menyimpan yang dibutuhkan forecast (untuk fit forecast-only)
+FIT_PROFILES = {
+    'default': {'concentrate_scale': False, 'simple_differencing': False, 'low_memory': False},
+    'fast': {'concentrate_scale': True, 'simple_differencing': True, 'low_memory': True}
+}
+
+
+def resolve_fit_profile(fit_profile=None):
+    """
+    Ambil konfigurasi profil fit
+    
+    Args:
+        fit_profile: Nama profil ('default', 'fast'), dict konfigurasi, atau None
+    
+    Returns:
+        dict: Konfigurasi profil lengkap (termasuk key 'name')
+    """
+    if fit_profile is None:
+        fit_profile = 'default'
+    if isinstance(fit_profile, dict):
+        profile = dict(FIT_PROFILES['default'])
+        profile.update(fit_profile)
+        profile.setdefault('name', 'custom')
+        return profile
+    if fit_profile not in FIT_PROFILES:
+        raise ValueError(f"fit_profile '{fit_profile}' tidak dikenal. Pilihan: {', '.join(FIT_PROFILES)}")
+    return dict(FIT_PROFILES[fit_profile], name=fit_profile)
+
+
+def _build_sarimax(endog, order, seasonal_order, concentrate_scale=False, simple_differencing=False,
+                   exog=None):
+    """
+    Buat model SARIMAX dengan setting standar aplikasi
+    """
+    with timed_stage('model_construction', order=tuple(order), seasonal_order=tuple(seasonal_order),
+                     k_exog=0 if exog is None else exog.shape[1]):
+        return SARIMAX(
+            endog,
+            exog=exog,
+            order=order,
+            seasonal_order=seasonal_order,
+            enforce_stationarity=False,
+            enforce_invertibility=False,
+            concentrate_scale=concentrate_scale,
+            simple_differencing=simple_differencing
+        )
+
+
+def _refilter(endog, order, seasonal_order, params, profile, forecast_only, exog=None):
+    """
+    Jalankan Kalman filter pada model level dengan parameter hasil estimasi
+    (dipakai setelah estimasi dengan simple_differencing / untuk filter low-memory)
+    """
+    low_memory = profile['low_memory'] and forecast_only
+    with timed_stage('filter', low_memory=low_memory):
+        model = _build_sarimax(endog, order, seasonal_order, concentrate_scale=profile['concentrate_scale'],
+                               exog=exog)
+        if low_memory:
+            model.ssm.set_conserve_memory(_FORECAST_ONLY_MEMORY)
+        return model.filter(params)
+
+
+# Budget default untuk setiap fit SARIMAX. Bisa di-override per panggilan lewat
+# argumen fit_budget (dict parsial), mis. {'timeout': 10, 'method': 'powell'}
+DEFAULT_FIT_BUDGET = {
+    'method': 'lbfgs',          # optimizer statsmodels: 'lbfgs', 'bfgs', 'powell', 'nm', ...
+    'timeout': 60.0,            # batas wall-clock satu fit termasuk semua fallback (detik), None = tanpa batas
+    'work_budget': 2e7,         # nobs * k_states^2 * iterasi yang diizinkan
+    'min_maxiter': 100,
+    'max_maxiter': 500,
+    'fallback': True,           # coba model yang lebih sederhana jika fit gagal / timeout
+    'fallback_reserve': 0.1,    # porsi timeout yang disisakan untuk kandidat terakhir (0,d,0)
+    'tuning_timeout': 60.0,     # batas wall-clock seluruh tuning satu komoditas, semua pencarian (detik)
+    'tuning_reserve': 0.25,     # porsi tuning_timeout yang disisakan untuk pencarian ARIMA setelah SARIMA
+    'tuning_maxiter': 50        # batas iterasi per kandidat auto_arima (default pmdarima)
+}
+
+
+class FitTimeoutError(ValueError):
+    """
+    Fit melewati batas waktu. Turunan ValueError supaya auto_arima
+    (error_action='ignore') menganggapnya sebagai kandidat gagal.
+    """
+
+
+def resolve_fit_budget(fit_budget=None):
+    """
+    Gabungkan override budget dengan DEFAULT_FIT_BUDGET
+    
+    Args:
+        fit_budget: Dict parsial atau None
+    
+    Returns:
+        dict: Budget lengkap
+    """
+    budget = dict(DEFAULT_FIT_BUDGET)
+    if fit_budget:
+        budget.update(fit_budget)
+    return budget
+
+
+def adaptive_maxiter(nobs, k_states, fit_budget=None):
+    """
+    Batas iterasi optimizer berdasarkan biaya satu evaluasi likelihood
+    (sebanding nobs * k_states^2): model kecil boleh iterasi banyak,
+    model dengan state besar (mis. m=52) dibatasi agar waktunya terprediksi.
+    
+    Args:
+        nobs: Jumlah observasi
+        k_states: Dimensi state space
+        fit_budget: Budget (dict) atau None untuk default
+    
+    Returns:
+        int: maxiter
+    """
+    budget = resolve_fit_budget(fit_budget)
+    cost = max(1, int(nobs) * int(k_states) ** 2)
+    return int(np.clip(budget['work_budget'] / cost, budget['min_maxiter'], budget['max_maxiter']))
+
+
+class _DeadlineCallback:
+    """
+    Callback optimizer yang melempar FitTimeoutError jika waktu habis.
+    Berupa class (bukan closure) supaya fitted model yang menyimpannya tetap bisa di-pickle.
+    """
+
+    def __init__(self, timeout, start=None):
+        self.timeout = timeout
+        self.deadline = (start if start is not None else time.perf_counter()) + timeout
+
+    def __call__(self, *args, **kwargs):
+        if time.perf_counter() > self.deadline:
+            raise FitTimeoutError(f"Fit melewati batas waktu {self.timeout:.1f} detik")
+
+
+def _deadline_callback(timeout, start=None):
+    """
+    Callback deadline, atau None jika tanpa batas waktu
+    """
+    if timeout is None:
+        return None
+    return _DeadlineCallback(timeout, start)
+
+
+def _fit_sarimax(model, fit_budget=None, deadline=None):
+    """
+    Fit model SARIMAX dengan budget (optimizer, maxiter adaptif, timeout) dan catat
+    durasi, iterasi, serta status konvergensi. deadline (perf_counter) menggantikan
+    budget['timeout'] jika diberikan (sisa waktu dari budget fit keseluruhan).
+    """
+    budget = resolve_fit_budget(fit_budget)
+    if deadline is not None:
+        now = time.perf_counter()
+        callback = _DeadlineCallback(deadline - now, now)
+    else:
+        callback = _deadline_callback(budget['timeout'])
+    maxiter = adaptive_maxiter(model.nobs, model.k_states, budget)
+    labels = {
+        'nobs': int(model.nobs), 'k_states': int(model.k_states),
+        'method': budget['method'], 'maxiter': maxiter
+    }
+    with timed_stage('fit', **labels) as span:
+        try:
+            fitted_model = model.fit(
+                disp=False, maxiter=maxiter, method=budget['method'],
+                callback=callback
+            )
+        except FitTimeoutError:
+            span['timed_out'] = True
+            raise
+        span.update(fit_diagnostics(fitted_model))
+    return fitted_model
+
+
+def _fallback_candidates(order, seasonal_order):
+    """
+    Urutan kandidat dari model yang diminta ke model yang makin sederhana
+    """
+    p, d, q = order
+    candidates = [
+        (tuple(order), tuple(seasonal_order)),
+        (tuple(order), (0, 0, 0, 0)),
+        ((min(p, 1), d, min(q, 1)), (0, 0, 0, 0)),
+        ((0, d, 0), (0, 0, 0, 0))
+    ]
+    unique = []
+    for cand in candidates:
+        if cand not in unique:
+            unique.append(cand)
+    return unique
+
+
+def _fit_with_budget(endog, order, seasonal_order, fit_budget=None, fit_profile=None, forecast_only=False,
+                     exog=None):
+    """
+    Build dan fit SARIMAX dengan budget. Jika fit gagal atau melewati batas waktu,
+    coba model yang lebih sederhana (kecuali budget['fallback'] False).
+    budget['timeout'] berlaku untuk seluruh rantai fallback: satu deadline dipasang di awal,
+    setiap kandidat hanya mendapat sisa waktu, dan porsi budget['fallback_reserve'] disisakan
+    untuk kandidat terakhir (0,d,0) sehingga total waktu fit tetap dibatasi timeout.
+    fit_profile menentukan konfigurasi SARIMAX (lihat FIT_PROFILES); forecast_only
+    mengizinkan filter low-memory (residual / smoothing tidak tersedia).
+    exog (DataFrame selaras dengan endog, lihat make_exog) dipakai di semua kandidat.
+    
+    Returns:
+        tuple: (fitted_model, fit_info) - fit_info berisi diagnostik konvergensi
+    """
+    budget = resolve_fit_budget(fit_budget)
+    profile = resolve_fit_profile(fit_profile)
+    needs_refilter = profile['simple_differencing'] or (profile['low_memory'] and forecast_only)
+    candidates = _fallback_candidates(order, seasonal_order)
+    if not budget['fallback']:
+        candidates = candidates[:1]
+
+    fit_start = time.perf_counter()
+    timeout = budget['timeout']
+    deadline = None if timeout is None else fit_start + timeout
+    reserve = 0.0 if timeout is None or len(candidates) == 1 else timeout * budget['fallback_reserve']
+
+    attempts = []
+    for i, (cand_order, cand_seasonal) in enumerate(candidates):
+        start = time.perf_counter()
+        # Kandidat sebelum yang terakhir tidak boleh memakai porsi cadangan
+        cand_deadline = None if deadline is None else deadline - (0.0 if i == len(candidates) - 1 else reserve)
+        if cand_deadline is not None and start >= cand_deadline:
+            attempts.append({
+                'order': cand_order,
+                'seasonal_order': cand_seasonal,
+                'error': f"Budget waktu fit {timeout:.1f} detik habis sebelum kandidat dicoba",
+                'timed_out': True,
+                'elapsed_s': 0.0
+            })
+            continue
+        try:
+            model = _build_sarimax(
+                endog, cand_order, cand_seasonal,
+                concentrate_scale=profile['concentrate_scale'],
+                simple_differencing=profile['simple_differencing'],
+                exog=exog
+            )
+            estimated = _fit_sarimax(model, budget, deadline=cand_deadline)
+            fitted_model = estimated
+            if needs_refilter:
+                fitted_model = _refilter(endog, cand_order, cand_seasonal, estimated.params, profile,
+                                         forecast_only, exog=exog)
+        except Exception as e:
+            attempts.append({
+                'order': cand_order,
+                'seasonal_order': cand_seasonal,
+                'error': str(e),
+                'timed_out': isinstance(e, FitTimeoutError),
+                'elapsed_s': time.perf_counter() - start
+            })
+            continue
+
+        fit_info = fit_diagnostics(estimated)
+        fit_info.update({
+            'fit_profile': profile['name'],
+            'low_memory': bool(profile['low_memory'] and forecast_only),
+            'method': budget['method'],
+            'maxiter': adaptive_maxiter(model.nobs, model.k_states, budget),
+            'timeout': budget['timeout'],
+            'elapsed_s': time.perf_counter() - start,
+            'total_elapsed_s': time.perf_counter() - fit_start,
+            'order': cand_order,
+            'seasonal_order': cand_seasonal,
+            'requested_order': tuple(order),
+            'requested_seasonal_order': tuple(seasonal_order),
+            'exog': exog_names(exog),
+            'fallback_used': len(attempts) > 0,
+            'failed_attempts': attempts
+        })
+        return fitted_model, fit_info
+
+    last = attempts[-1]
+    if last['timed_out']:
+        raise FitTimeoutError(
+            f"Fit gagal dalam budget waktu {timeout:.1f} detik ({len(attempts)} kandidat dicoba): {last['error']}"
+        )
+    raise RuntimeError(last['error'])
+
+
+def _model_type_for(seasonal_order, model_type):
+    """
+    Model type setelah fallback (SARIMA yang seasonal-nya dibuang menjadi ARIMA)
+    """
+    if tuple(seasonal_order) == (0, 0, 0, 0) and model_type.upper() == 'SARIMA':
+        return 'ARIMA'
+    return model_type
+
+
+def _tuning_state_dim(max_p, max_d, max_q, max_P=0, max_D=0, max_Q=0, m=0):
+    """
+    Dimensi state kandidat terbesar dalam pencarian auto_arima
+    """
+    m = m if m and m > 1 else 0
+    return max_d + max_D * m + max(max_p + max_P * m, max_q + max_Q * m + 1)
+
+
+def _forecast_frame(fitted_model, steps, alpha=0.05, levels=None, quantiles=None, exog=None):
+    """
+    Forecast dari fitted model sebagai DataFrame kolom lower, upper, forecast, std.
+    Mean dan variansi dihitung sekali; interval tambahan (lower_80, upper_80, ...) dan
+    quantile (q10, q90, ...) diturunkan secara vektor dari keduanya.
+    exog: regresor untuk periode forecast (wajib jika model di-fit dengan exog)
+    """
+    with timed_stage('get_forecast', steps=steps):
+        forecast = fitted_model.get_forecast(steps=steps, exog=exog)
+    with timed_stage('conf_int', steps=steps, alpha=alpha):
+        mean = np.asarray(forecast.predicted_mean)
+        std = np.sqrt(np.asarray(forecast.var_pred_mean))
+        index = forecast.predicted_mean.index
+        forecast_df = prediction_intervals(mean, std, levels=[1 - alpha], index=index)
+        forecast_df.columns = ['lower', 'upper']
+        forecast_df['forecast'] = mean
+        forecast_df['std'] = std
+        if levels is not None or quantiles is not None:
+            extra = prediction_intervals(mean, std, levels=levels, quantiles=quantiles, index=index)
+            forecast_df = pd.concat([forecast_df, extra], axis=1)
+    return forecast_df
+
+
+def forecast_intervals(fitted_model, periods=12, levels=(0.5, 0.8, 0.95), quantiles=None, exog=None):
+    """
+    Interval forecast untuk banyak level / quantile dari model yang sudah di-fit
+    (tanpa fit ulang), mis. untuk fan chart atau laporan risiko
+    
+    Args:
+        fitted_model: result['model'] dari forecast_future / train_and_evaluate
+                      (CompactForecastModel atau hasil fit statsmodels)
+        periods: Jumlah periode forecast
+        levels: Confidence level (0-1) -> kolom lower_<pct>, upper_<pct>
+        quantiles: Quantile (0-1) -> kolom q<pct>
+        exog: Regresor periode forecast jika model memakai exog (mis. result['future_exog'])
+    
+    Returns:
+        pd.DataFrame: Kolom forecast, std, interval, dan quantile
+    """
+    forecast_df = _forecast_frame(fitted_model, periods, levels=levels, quantiles=quantiles, exog=exog)
+    return forecast_df.drop(columns=['lower', 'upper'])
+
+
+def fit_and_forecast(series, order, seasonal_order=None, model_type='SARIMA', periods=12, fit_budget=None,
+                     fit_profile=None, exog=None, future_exog=None, levels=None, quantiles=None,
+                     compact=True, fitted=None, last_date=None, freq=None):
+    """
+    Fit SARIMAX (atau pakai model yang sudah di-fit) lalu forecast periods ke depan.
+    Dipakai bersama oleh forecast_future dan batch_forecast.
+
+    Args:
+        series: Series siap fit (hasil prepare_endog)
+        order: Tuple (p, d, q)
+        seasonal_order: Tuple (P, D, Q, m) - jika None, gunakan ARIMA
+        model_type: 'ARIMA' atau 'SARIMA'
+        periods: Jumlah periode forecast
+        fit_budget: Override DEFAULT_FIT_BUDGET
+        fit_profile: Profil konfigurasi SARIMAX (lihat FIT_PROFILES)
+        exog: DataFrame regresor selaras dengan series (hasil make_exog) atau None
+        future_exog: Nilai regresor non-kalender periode forecast (lihat extend_exog)
+        levels: Confidence level tambahan (0-1)
+        quantiles: Quantile (0-1)
+        compact: Jika True, model dikembalikan sebagai CompactForecastModel
+        fitted: Tuple (model, fit_info) hasil fit sebelumnya (mis. dari cache) - fit dilewati
+        last_date: Tanggal terakhir data untuk index forecast (default: akhir series)
+        freq: Frekuensi data (default: get_dataset_frequency(series))
+
+    Returns:
+        dict: {'model', 'fit_info', 'forecast' (index tanggal forecast), 'future_exog'}
+    """
+    freq = freq or get_dataset_frequency(series)
+    if fitted is None:
+        model, fit_info = _fit_with_budget(
+            series, order, resolve_seasonal_order(seasonal_order, model_type),
+            fit_budget, fit_profile, forecast_only=True, exog=exog
+        )
+    else:
+        model, fit_info = fitted
+
+    # Index forecast sesuai frekuensi data; regresor kalender dihitung untuk tanggal tersebut
+    forecast_dates = create_forecast_dates(series.index[-1] if last_date is None else last_date, periods, freq)
+    forecast_exog = extend_exog(exog, forecast_dates, future_exog, freq)
+
+    forecast_df = _forecast_frame(model, periods, alpha=0.05, levels=levels, quantiles=quantiles,
+                                  exog=forecast_exog)
+    forecast_df.index = forecast_dates
+
+    if compact and not isinstance(model, CompactForecastModel):
+        model = CompactForecastModel.from_results(model)
+
+    return {
+        'model': model,
+        'fit_info': fit_info,
+        'forecast': forecast_df,
+        'future_exog': forecast_exog
+    }
+
+
+def _run_auto_arima(series, search, profile_log=None, fit_budget=None, deadline=None, **kwargs):
+    """
+    Jalankan auto_arima dengan budget: optimizer, maxiter adaptif per kandidat dan
+    batas waktu untuk seluruh pencarian. deadline (time.perf_counter()) dipasang oleh
+    pemanggil agar beberapa pencarian berbagi satu budget; default tuning_timeout dari
+    sekarang. Kandidat yang sedang berjalan saat waktu habis dianggap gagal, kandidat
+    berikutnya tidak di-fit, dan pencarian berhenti dengan model terbaik sejauh ini.
+    Jika profile_log diberikan, jalankan dalam mode profiling dan kumpulkan
+    kandidat serta cProfile ke profile_log.
+    """
+    budget = resolve_fit_budget(fit_budget)
+    if deadline is None and budget['tuning_timeout'] is not None:
+        deadline = time.perf_counter() + budget['tuning_timeout']
+    remaining = None if deadline is None else deadline - time.perf_counter()
+    if remaining is not None and remaining <= 0:
+        raise FitTimeoutError(f"Waktu tuning habis sebelum pencarian {search}")
+    k_states = _tuning_state_dim(
+        kwargs.get('max_p', 5), kwargs.get('max_d', 2), kwargs.get('max_q', 5),
+        kwargs.get('max_P', 0), kwargs.get('max_D', 0), kwargs.get('max_Q', 0),
+        kwargs.get('m', 0) if kwargs.get('seasonal', True) else 0
+    )
+    kwargs.update({
+        'method': budget['method'],
+        'maxiter': min(budget['tuning_maxiter'], adaptive_maxiter(len(series), k_states, budget)),
+        'callback': _deadline_callback(remaining)
+    })
+
+    with timed_stage('auto_arima', search=search, profiled=profile_log is not None,
+                     maxiter=kwargs['maxiter'], method=budget['method']):
+        with StepwiseContext(max_dur=remaining):
+            if profile_log is None:
+                with candidate_scope(deadline=deadline):
+                    return auto_arima(series, **kwargs)
+
+            best_model, candidates, profiler = profiled_auto_arima(auto_arima, series, search, deadline=deadline,
+                                                                   **kwargs)
+            profile_log['candidates'].extend(candidates)
+            profile_log['profilers'].append(profiler)
+            return best_model
+
+
+def train_and_evaluate(series, order, seasonal_order=None, model_type='SARIMA', test_size=0.2,
+                       fit_budget=None, fit_profile=None, compact=True, levels=None, quantiles=None,
+                       missing=None, exog=None):
     """
     Train model ARIMA/SARIMA dan evaluasi dengan test set
     
@@ -43,9 +566,20 @@ def train_and_evaluate(series, order, seasonal_order=None, model_type='SARIMA',
         seasonal_order: Tuple (P, D, Q, m) - jika None, gunakan ARIMA
         model_type: 'ARIMA' atau 'SARIMA'
         test_size: Proporsi test set (0-1)
+        fit_budget: Override DEFAULT_FIT_BUDGET (optimizer, timeout, maxiter, fallback)
+        fit_profile: Profil konfigurasi SARIMAX ('default' / 'fast', lihat FIT_PROFILES)
+        compact: Jika True, 'model' berupa CompactForecastModel (parameter, state terakhir,
+                 residual) alih-alih hasil fit statsmodels lengkap
+        levels: Confidence level tambahan (0-1), mis. [0.5, 0.8] -> kolom lower_50, upper_50, ...
+        quantiles: Quantile (0-1), mis. [0.1, 0.9] -> kolom q10, q90
+        missing: Penanganan data kosong (None, 'drop', 'kalman'; lihat MISSING_MODES).
+                 Dengan 'kalman' metrik hanya dihitung pada periode test yang teramati
+        exog: Regresor eksogen - nama fitur kalender (mis. ['ramadan', 'lebaran']) atau
+              DataFrame ber-index tanggal (mis. harga BBM); lihat make_exog.
+              Periode test memakai nilai regresor aktual.
     
     Returns:
-        dict: Dictionary dengan model, metrics, forecast, dan info
+        dict: Dictionary dengan model, metrics, forecast, fit_info, dan info
     """
     try:
         # Ensure statsmodels is available
@@ -53,51 +587,45 @@ def train_and_evaluate(series, order, seasonal_order=None, model_type='SARIMA',
             st.error("Package 'statsmodels' is not installed or failed to import. Install with: pip install statsmodels")
             return {'success': False, 'error': f"statsmodels import error: {_STATSMODELS_IMPORT_ERROR}"}
 
+        freq = get_dataset_frequency(series)
+        series = prepare_endog(series, missing)
+        exog = make_exog(series.index, exog, freq)
+        
         # Split data
         split_idx = int(len(series) * (1 - test_size))
         train_data = series.iloc[:split_idx]
         test_data = series.iloc[split_idx:]
+        train_exog = None if exog is None else exog.iloc[:split_idx]
+        test_exog = None if exog is None else exog.iloc[split_idx:]
         
-        # Train model (ARIMA atau SARIMA)
-        if model_type.upper() == 'ARIMA' or seasonal_order is None:
-            # ARIMA (tanpa seasonal)
-            model = SARIMAX(
-                train_data,
-                order=order,
-                seasonal_order=(0, 0, 0, 0),
-                enforce_stationarity=False,
-                enforce_invertibility=False
-            )
-        else:
-            # SARIMA (dengan seasonal)
-            model = SARIMAX(
-                train_data,
-                order=order,
-                seasonal_order=seasonal_order,
-                enforce_stationarity=False,
-                enforce_invertibility=False
-            )
-        
-        fitted_model = model.fit(disp=False, maxiter=500)
+        # Train model (ARIMA atau SARIMA), fallback ke model lebih sederhana jika gagal
+        fitted_model, fit_info = _fit_with_budget(
+            train_data, order, resolve_seasonal_order(seasonal_order, model_type),
+            fit_budget, fit_profile, forecast_only=True, exog=train_exog
+        )
         
         # Get forecast untuk test set
-        forecast = fitted_model.get_forecast(steps=len(test_data))
-        forecast_df = forecast.conf_int(alpha=0.05)
-        forecast_df['forecast'] = forecast.predicted_mean
-        forecast_df.columns = ['lower', 'upper', 'forecast']
+        forecast_df = _forecast_frame(fitted_model, len(test_data), alpha=0.05,
+                                      levels=levels, quantiles=quantiles, exog=test_exog)
         
-        # Calculate metrics
-        metrics = calculate_metrics_summary(test_data.values, forecast_df['forecast'].values)
+        # Calculate metrics (periode test yang kosong dilewati)
+        metrics = _observed_metrics(test_data.values, forecast_df['forecast'].values)
+        fit_info['n_missing'] = int(series.isna().sum())
+        
+        if compact:
+            fitted_model = CompactForecastModel.from_results(fitted_model)
         
         result = {
             'model': fitted_model,
             'train_data': train_data,
             'test_data': test_data,
+            'exog': exog,
             'forecast': forecast_df,
             'metrics': metrics,
-            'order': order,
-            'seasonal_order': seasonal_order,
-            'model_type': model_type,
+            'order': fit_info['order'] if fit_info['fallback_used'] else order,
+            'seasonal_order': fit_info['seasonal_order'] if fit_info['fallback_used'] else seasonal_order,
+            'model_type': _model_type_for(fit_info['seasonal_order'], model_type) if fit_info['fallback_used'] else model_type,
+            'fit_info': fit_info,
             'success': True
         }
         
@@ -111,7 +639,9 @@ def train_and_evaluate(series, order, seasonal_order=None, model_type='SARIMA',
         }
 
 
-def forecast_future(series, order, seasonal_order=None, model_type='SARIMA', periods=12, full_data=True):
+def forecast_future(series, order, seasonal_order=None, model_type='SARIMA', periods=12, full_data=True,
+                    fit_budget=None, fit_profile=None, compact=True, levels=None, quantiles=None,
+                    missing=None, exog=None, future_exog=None):
     """
     Forecast untuk periode ke depan
     
@@ -122,9 +652,19 @@ def forecast_future(series, order, seasonal_order=None, model_type='SARIMA', per
         model_type: 'ARIMA' atau 'SARIMA'
         periods: Jumlah periode untuk forecast
         full_data: Jika True, train dengan semua data. Jika False, gunakan sebagian.
+        fit_budget: Override DEFAULT_FIT_BUDGET (optimizer, timeout, maxiter, fallback)
+        fit_profile: Profil konfigurasi SARIMAX ('default' / 'fast', lihat FIT_PROFILES)
+        compact: Jika True, 'model' berupa CompactForecastModel (parameter, state terakhir,
+                 residual) alih-alih hasil fit statsmodels lengkap
+        levels: Confidence level tambahan (0-1), mis. [0.5, 0.8] -> kolom lower_50, upper_50, ...
+        quantiles: Quantile (0-1), mis. [0.1, 0.9] -> kolom q10, q90
+        missing: Penanganan data kosong (None, 'drop', 'kalman'; lihat MISSING_MODES)
+        exog: Regresor eksogen (nama fitur kalender atau DataFrame; lihat make_exog)
+        future_exog: Nilai regresor non-kalender untuk periode forecast (opsional);
+                     tanpa ini nilai terakhir ditahan, fitur kalender selalu dihitung
     
     Returns:
-        dict: Dictionary dengan forecast dan model
+        dict: Dictionary dengan forecast, model, future_exog, dan fit_info
     """
     try:
         # Ensure statsmodels is available
@@ -132,6 +672,10 @@ def forecast_future(series, order, seasonal_order=None, model_type='SARIMA', per
             st.error("Package 'statsmodels' is not installed or failed to import. Install with: pip install statsmodels")
             return {'success': False, 'error': f"statsmodels import error: {_STATSMODELS_IMPORT_ERROR}"}
 
+        freq = get_dataset_frequency(series)
+        series = prepare_endog(series, missing)
+        exog = make_exog(series.index, exog, freq)
+        
         # Train dengan semua data jika full_data=True
         if full_data:
             train_series = series
@@ -139,44 +683,25 @@ def forecast_future(series, order, seasonal_order=None, model_type='SARIMA', per
             # Train dengan 80% data
             split_idx = int(len(series) * 0.8)
             train_series = series.iloc[:split_idx]
-        
-        # Fit model (ARIMA atau SARIMA)
-        if model_type.upper() == 'ARIMA' or seasonal_order is None:
-            model = SARIMAX(
-                train_series,
-                order=order,
-                seasonal_order=(0, 0, 0, 0),
-                enforce_stationarity=False,
-                enforce_invertibility=False
-            )
-        else:
-            model = SARIMAX(
-                train_series,
-                order=order,
-                seasonal_order=seasonal_order,
-                enforce_stationarity=False,
-                enforce_invertibility=False
-            )
-        
-        fitted_model = model.fit(disp=False, maxiter=500)
-        
-        # Forecast
-        forecast = fitted_model.get_forecast(steps=periods)
-        forecast_df = forecast.conf_int(alpha=0.05)
-        forecast_df['forecast'] = forecast.predicted_mean
-        forecast_df.columns = ['lower', 'upper', 'forecast']
-        
-        # Generate index untuk forecast (assuming weekly data)
-        last_date = series.index[-1]
-        forecast_dates = pd.date_range(start=last_date, periods=periods+1, freq='W')[1:]
-        forecast_df.index = forecast_dates
-        
+        train_exog = None if exog is None else exog.loc[train_series.index]
+
+        # Fit model (ARIMA atau SARIMA, fallback ke model lebih sederhana jika gagal) lalu forecast
+        fitted = fit_and_forecast(
+            train_series, order, seasonal_order, model_type, periods, fit_budget, fit_profile,
+            exog=train_exog, future_exog=future_exog, levels=levels, quantiles=quantiles,
+            compact=compact, last_date=series.index[-1], freq=freq
+        )
+        fit_info = fitted['fit_info']
+        fit_info['n_missing'] = int(train_series.isna().sum())
+
         result = {
-            'forecast': forecast_df,
-            'model': fitted_model,
+            'forecast': fitted['forecast'],
+            'model': fitted['model'],
             'original_series': series,
+            'future_exog': fitted['future_exog'],
             'periods': periods,
-            'model_type': model_type,
+            'model_type': _model_type_for(fit_info['seasonal_order'], model_type) if fit_info['fallback_used'] else model_type,
+            'fit_info': fit_info,
             'success': True
         }
         
@@ -191,7 +716,8 @@ def forecast_future(series, order, seasonal_order=None, model_type='SARIMA', per
 
 
 def auto_tune_per_commodity(series, komoditas, params_file='models/best_params.json', 
-                          max_p=5, max_d=2, max_q=5, max_P=2, max_D=1, max_Q=2, m=52):
+                          max_p=5, max_d=2, max_q=5, max_P=2, max_D=1, max_Q=2, m=52,
+                          profile=False, fit_budget=None, detect_seasonal=True, exog=None):
     """
     Auto tune ARIMA/SARIMA parameter menggunakan pmdarima dan SIMPAN ke JSON
     Fungsi ini akan menentukan apakah model terbaik adalah ARIMA atau SARIMA
@@ -202,7 +728,17 @@ def auto_tune_per_commodity(series, komoditas, params_file='models/best_params.j
         params_file: Path file best_params.json
         max_p, max_d, max_q: Max parameters untuk order
         max_P, max_D, max_Q: Max parameters untuk seasonal order
-        m: Seasonal period
+        m: Seasonal period (dipakai apa adanya jika detect_seasonal=False)
+        profile: Jika True, catat setiap kandidat order (waktu fit, konvergensi) dan
+                 cProfile ke tuning_profile.csv / tuning_profiles/ di folder params_file
+        fit_budget: Override DEFAULT_FIT_BUDGET (optimizer, tuning_timeout, tuning_reserve,
+                    tuning_maxiter). tuning_timeout membatasi seluruh tuning (deteksi musiman,
+                    pencarian SARIMA dan ARIMA); SARIMA berhenti lebih awal agar porsi
+                    tuning_reserve tersisa untuk ARIMA.
+        detect_seasonal: Jika True, m dipilih dengan detect_seasonality; pencarian SARIMA
+                         dilewati jika tidak ada musiman signifikan
+        exog: Regresor eksogen untuk semua kandidat (nama fitur kalender atau DataFrame;
+              lihat make_exog). Nama regresor disimpan di key 'exog' best_params.json.
     
     Returns:
         dict: Dictionary dengan best parameter, model_type, AIC, BIC, dan status penyimpanan
@@ -213,46 +749,89 @@ def auto_tune_per_commodity(series, komoditas, params_file='models/best_params.j
             st.error("Package 'pmdarima' is not installed or failed to import. Install with: pip install pmdarima")
             return {'success': False, 'error': f"pmdarima import error: {_PMDARIMA_IMPORT_ERROR}"}
 
+        profile_log = {'candidates': [], 'profilers': []} if profile else None
+        X = make_exog(series.index, exog, get_dataset_frequency(series))
+
+        # Satu deadline untuk seluruh tuning; setiap pencarian hanya mendapat sisa waktu
+        budget = resolve_fit_budget(fit_budget)
+        tuning_start = time.perf_counter()
+        timeout = budget['tuning_timeout']
+        deadline = None if timeout is None else tuning_start + timeout
+        sarima_deadline = None if deadline is None else deadline - timeout * budget['tuning_reserve']
+        
         with st.spinner(f"🔄 Tuning parameter untuk {komoditas}..."):
             
+            # Deteksi musiman dulu: pilih m dari data, atau lewati SARIMA sama sekali
+            seasonality = None
+            run_seasonal = True
+            if detect_seasonal:
+                candidates = seasonal_candidates(get_dataset_frequency(series)) or (m,)
+                detection = detect_seasonality(series, candidates=candidates).iloc[0]
+                seasonality = {
+                    'seasonal': bool(detection['seasonal']),
+                    'm': detection['m'],
+                    'strength': detection['strength'],
+                    'spectral_period': detection['spectral_period']
+                }
+                run_seasonal = seasonality['seasonal']
+                if run_seasonal:
+                    m = int(seasonality['m'])
+            
             # Auto tune dengan SEASONAL=True dulu (akan mencoba SARIMA)
-            auto_model_sarima = auto_arima(
-                series,
-                start_p=0, max_p=max_p,
-                start_d=0, max_d=max_d,
-                start_q=0, max_q=max_q,
-                seasonal=True,
-                start_P=0, max_P=max_P,
-                start_D=0, max_D=max_D,
-                start_Q=0, max_Q=max_Q,
-                m=m,
-                trace=False,
-                error_action='ignore',
-                suppress_warnings=True,
-                stepwise=True,
-                n_jobs=-1
-            )
+            auto_model_sarima = None
+            if run_seasonal:
+                try:
+                    auto_model_sarima = _run_auto_arima(
+                        series, 'sarima', profile_log, fit_budget, sarima_deadline,
+                        start_p=0, max_p=max_p,
+                        start_d=0, max_d=max_d,
+                        start_q=0, max_q=max_q,
+                        seasonal=True,
+                        start_P=0, max_P=max_P,
+                        start_D=0, max_D=max_D,
+                        start_Q=0, max_Q=max_Q,
+                        m=m,
+                        X=X,
+                        trace=False,
+                        error_action='ignore',
+                        suppress_warnings=True,
+                        stepwise=True,
+                        n_jobs=-1
+                    )
+                except ValueError:
+                    # Tidak ada kandidat SARIMA valid sebelum waktunya habis: lanjut ke ARIMA
+                    if sarima_deadline is None or time.perf_counter() < sarima_deadline:
+                        raise
             
             # Auto tune tanpa SEASONAL (akan menghasilkan ARIMA)
-            auto_model_arima = auto_arima(
-                series,
-                start_p=0, max_p=max_p,
-                start_d=0, max_d=max_d,
-                start_q=0, max_q=max_q,
-                seasonal=False,
-                trace=False,
-                error_action='ignore',
-                suppress_warnings=True,
-                stepwise=True,
-                n_jobs=-1
-            )
+            auto_model_arima = None
+            try:
+                auto_model_arima = _run_auto_arima(
+                    series, 'arima', profile_log, fit_budget, deadline,
+                    X=X,
+                    start_p=0, max_p=max_p,
+                    start_d=0, max_d=max_d,
+                    start_q=0, max_q=max_q,
+                    seasonal=False,
+                    trace=False,
+                    error_action='ignore',
+                    suppress_warnings=True,
+                    stepwise=True,
+                    n_jobs=-1
+                )
+            except ValueError as e:
+                # Waktu habis: pakai model SARIMA jika ada, selain itu tuning gagal
+                if deadline is None or time.perf_counter() < deadline:
+                    raise
+                if auto_model_sarima is None:
+                    raise FitTimeoutError(f"Tuning gagal dalam budget waktu {timeout:.0f} detik: {e}") from e
             
             # Bandingkan AIC antara SARIMA dan ARIMA
-            aic_sarima = auto_model_sarima.aic()
-            aic_arima = auto_model_arima.aic()
+            aic_sarima = auto_model_sarima.aic() if auto_model_sarima is not None else None
+            aic_arima = auto_model_arima.aic() if auto_model_arima is not None else None
             
             # Pilih model dengan AIC lebih rendah
-            if aic_sarima < aic_arima:
+            if aic_sarima is not None and (aic_arima is None or aic_sarima < aic_arima):
                 best_model = auto_model_sarima
                 model_type = 'SARIMA'
                 order = best_model.order
@@ -284,6 +863,13 @@ def auto_tune_per_commodity(series, komoditas, params_file='models/best_params.j
                 params_data[komoditas]['bic'] = float(bic)
                 params_data[komoditas]['tuning_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 params_data[komoditas]['is_tuned'] = True
+                # Regresor dipakai ulang saat validasi / forecast komoditas ini
+                if X is not None:
+                    params_data[komoditas]['exog'] = exog_names(X)
+                else:
+                    params_data[komoditas].pop('exog', None)
+                # Dasar pembanding untuk plan_retuning saat dataset baru di-upload
+                params_data[komoditas]['fingerprint'] = series_fingerprint(series, best_model)
             else:
                 st.error(f"Komoditas '{komoditas}' tidak ditemukan di {params_file}")
                 return {'success': False, 'error': f"Komoditas '{komoditas}' tidak ditemukan"}
@@ -316,11 +902,22 @@ def auto_tune_per_commodity(series, komoditas, params_file='models/best_params.j
                 'bic': bic,
                 'aic_sarima': aic_sarima,
                 'aic_arima': aic_arima,
+                'seasonality': seasonality,
+                'seasonal_search_skipped': not run_seasonal,
+                'tuning_time_s': time.perf_counter() - tuning_start,
+                'exog': exog_names(X),
                 'komoditas': komoditas,
                 'saved_to_file': True,
                 'success': True
             }
             
+            if profile:
+                result['profile'] = save_tuning_profile(
+                    komoditas, profile_log['candidates'], profile_log['profilers'],
+                    output_dir=os.path.dirname(params_file) or '.',
+                    n_obs=len(series), selected_search=model_type.lower()
+                )
+            
             return result
     
     except Exception as e:
@@ -332,7 +929,8 @@ def auto_tune_per_commodity(series, komoditas, params_file='models/best_params.j
 
 
 def auto_tune_sarima(series, seasonal=True, max_p=5, max_d=2, max_q=5,
-                     max_P=2, max_D=1, max_Q=2, m=52):
+                     max_P=2, max_D=1, max_Q=2, m=52, profile=False,
+                     profile_dir='models', profile_label='manual', fit_budget=None):
     """
     Auto tune SARIMA parameter menggunakan pmdarima (Deprecated - gunakan auto_tune_per_commodity)
     
@@ -342,6 +940,10 @@ def auto_tune_sarima(series, seasonal=True, max_p=5, max_d=2, max_q=5,
         max_p, max_d, max_q: Max parameters untuk order
         max_P, max_D, max_Q: Max parameters untuk seasonal order
         m: Seasonal period
+        profile: Jika True, simpan kandidat order dan cProfile ke profile_dir
+        profile_dir: Folder artefak profiling (default: folder best_params.json)
+        profile_label: Label run di tuning_profile.csv
+        fit_budget: Override DEFAULT_FIT_BUDGET (optimizer, tuning_timeout, tuning_maxiter)
     
     Returns:
         dict: Dictionary dengan best parameter dan summary
@@ -352,10 +954,12 @@ def auto_tune_sarima(series, seasonal=True, max_p=5, max_d=2, max_q=5,
             st.error("Package 'pmdarima' is not installed or failed to import. Install with: pip install pmdarima")
             return {'success': False, 'error': f"pmdarima import error: {_PMDARIMA_IMPORT_ERROR}"}
 
+        profile_log = {'candidates': [], 'profilers': []} if profile else None
+        
         with st.spinner("🔄 Tuning parameter SARIMA..."):
             
-            auto_model = auto_arima(
-                series,
+            auto_model = _run_auto_arima(
+                series, 'sarima' if seasonal else 'arima', profile_log, fit_budget,
                 start_p=0, max_p=max_p,
                 start_d=0, max_d=max_d,
                 start_q=0, max_q=max_q,
@@ -382,6 +986,12 @@ def auto_tune_sarima(series, seasonal=True, max_p=5, max_d=2, max_q=5,
                 'success': True
             }
             
+            if profile:
+                result['profile'] = save_tuning_profile(
+                    profile_label, profile_log['candidates'], profile_log['profilers'],
+                    output_dir=profile_dir, n_obs=len(series)
+                )
+            
             st.success("✅ Tuning selesai!")
             return result
     
@@ -482,7 +1092,8 @@ def check_model_diagnostics(fitted_model):
         return None
 
 
-def fit_sarima_model(series, order, seasonal_order):
+def fit_sarima_model(series, order, seasonal_order, fit_budget=None, fit_profile=None, missing=None,
+                     exog=None):
     """
     Fit SARIMA model pada data
     
@@ -490,6 +1101,10 @@ def fit_sarima_model(series, order, seasonal_order):
         series: Time series data
         order: Tuple (p, d, q)
         seasonal_order: Tuple (P, D, Q, m)
+        fit_budget: Override DEFAULT_FIT_BUDGET (optimizer, timeout, maxiter, fallback)
+        fit_profile: Profil konfigurasi SARIMAX ('default' / 'fast', lihat FIT_PROFILES)
+        missing: Penanganan data kosong (None, 'drop', 'kalman'; lihat MISSING_MODES)
+        exog: Regresor eksogen (nama fitur kalender atau DataFrame; lihat make_exog)
     
     Returns:
         Fitted model atau None jika gagal
@@ -500,15 +1115,11 @@ def fit_sarima_model(series, order, seasonal_order):
             st.error("Package 'statsmodels' is not installed or failed to import. Install with: pip install statsmodels")
             return None
 
-        model = SARIMAX(
-            series,
-            order=order,
-            seasonal_order=seasonal_order,
-            enforce_stationarity=False,
-            enforce_invertibility=False
+        endog = prepare_endog(series, missing)
+        fitted_model, _ = _fit_with_budget(
+            endog, order, seasonal_order, fit_budget, fit_profile,
+            exog=make_exog(endog.index, exog, get_dataset_frequency(series))
         )
-        
-        fitted_model = model.fit(disp=False, maxiter=500)
         return fitted_model
     
     except Exception as e:
@@ -528,10 +1139,7 @@ def forecast_sarima(fitted_model, periods):
         pd.DataFrame: Forecast dengan confidence interval
     """
     try:
-        forecast = fitted_model.get_forecast(steps=periods)
-        forecast_df = forecast.conf_int(alpha=0.05)
-        forecast_df['forecast'] = forecast.predicted_mean
-        forecast_df.columns = ['lower', 'upper', 'forecast']
+        forecast_df = _forecast_frame(fitted_model, periods, alpha=0.05)
         
         return forecast_df
     
@@ -554,7 +1162,9 @@ def calculate_metrics(y_true, y_pred):
     return calculate_metrics_summary(y_true, y_pred)
 
 
-def predict_with_confidence_interval(series, order, seasonal_order, periods=12, alpha=0.05):
+def predict_with_confidence_interval(series, order, seasonal_order, periods=12, alpha=0.05,
+                                     fit_budget=None, fit_profile=None, model=None,
+                                     levels=None, quantiles=None):
     """
     Predict dengan confidence interval
     
@@ -564,33 +1174,34 @@ def predict_with_confidence_interval(series, order, seasonal_order, periods=12,
         seasonal_order: Tuple (P, D, Q, m)
         periods: Jumlah periode forecast
         alpha: Significance level
+        fit_budget: Override DEFAULT_FIT_BUDGET (optimizer, timeout, maxiter, fallback)
+        fit_profile: Profil konfigurasi SARIMAX ('default' / 'fast', lihat FIT_PROFILES)
+        model: Model yang sudah di-fit (mis. result['model'] dari panggilan sebelumnya).
+               Jika diberikan, tidak ada fit ulang - hanya interval yang dihitung ulang.
+        levels: Confidence level tambahan (0-1) -> kolom lower_<pct>, upper_<pct>
+        quantiles: Quantile (0-1) -> kolom q<pct>
     
     Returns:
         dict: Dictionary dengan forecast dan confidence interval
     """
     try:
-        # Ensure statsmodels is available
-        if SARIMAX is None:
-            st.error("Package 'statsmodels' is not installed or failed to import. Install with: pip install statsmodels")
-            return {'success': False, 'error': f"statsmodels import error: {_STATSMODELS_IMPORT_ERROR}"}
-        model = SARIMAX(
-            series,
-            order=order,
-            seasonal_order=seasonal_order,
-            enforce_stationarity=False,
-            enforce_invertibility=False
-        )
-        
-        fitted_model = model.fit(disp=False, maxiter=500)
+        fit_info = None
+        if model is None:
+            # Ensure statsmodels is available
+            if SARIMAX is None:
+                st.error("Package 'statsmodels' is not installed or failed to import. Install with: pip install statsmodels")
+                return {'success': False, 'error': f"statsmodels import error: {_STATSMODELS_IMPORT_ERROR}"}
+            fitted_model, fit_info = _fit_with_budget(
+                series, order, seasonal_order, fit_budget, fit_profile, forecast_only=True
+            )
+            model = CompactForecastModel.from_results(fitted_model)
         
-        forecast = fitted_model.get_forecast(steps=periods)
-        forecast_df = forecast.conf_int(alpha=alpha)
-        forecast_df['forecast'] = forecast.predicted_mean
-        forecast_df.columns = ['lower', 'upper', 'forecast']
+        forecast_df = _forecast_frame(model, periods, alpha=alpha, levels=levels, quantiles=quantiles)
         
         return {
             'forecast_df': forecast_df,
-            'model': fitted_model,
+            'model': model,
+            'fit_info': fit_info,
             'success': True
         }
     
@@ -601,7 +1212,7 @@ def predict_with_confidence_interval(series, order, seasonal_order, periods=12,
         }
 
 
-def backtest_model(series, order, seasonal_order, test_size=0.2):
+def backtest_model(series, order, seasonal_order, test_size=0.2, fit_budget=None, fit_profile=None):
     """
     Backtest model dengan walk-forward validation
     
@@ -610,6 +1221,8 @@ def backtest_model(series, order, seasonal_order, test_size=0.2):
         order: Tuple (p, d, q)
         seasonal_order: Tuple (P, D, Q, m)
         test_size: Proporsi test set
+        fit_budget: Override DEFAULT_FIT_BUDGET (optimizer, timeout, maxiter, fallback)
+        fit_profile: Profil konfigurasi SARIMAX ('default' / 'fast', lihat FIT_PROFILES)
     
     Returns:
         dict: Backtest results
@@ -625,19 +1238,13 @@ def backtest_model(series, order, seasonal_order, test_size=0.2):
         test_data = series.iloc[split_idx:]
         
         # Train model
-        model = SARIMAX(
-            train_data,
-            order=order,
-            seasonal_order=seasonal_order,
-            enforce_stationarity=False,
-            enforce_invertibility=False
+        fitted_model, fit_info = _fit_with_budget(
+            train_data, order, seasonal_order, fit_budget, fit_profile, forecast_only=True
         )
         
-        fitted_model = model.fit(disp=False, maxiter=500)
-        
         # Get forecast untuk test set
-        forecast = fitted_model.get_forecast(steps=len(test_data))
-        forecast_values = forecast.predicted_mean
+        with timed_stage('get_forecast', steps=len(test_data)):
+            forecast_values = fitted_model.get_forecast(steps=len(test_data)).predicted_mean
         
         # Calculate metrics
         metrics = calculate_metrics_summary(test_data.values, forecast_values.values)
@@ -647,6 +1254,7 @@ def backtest_model(series, order, seasonal_order, test_size=0.2):
             'test_data': test_data,
             'forecast': forecast_values,
             'metrics': metrics,
+            'fit_info': fit_info,
             'success': True
         }
     
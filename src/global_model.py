@@ -0,0 +1,278 @@
+"""
+============================================
+GLOBAL MODEL
+Satu model pooled (lintas series) untuk ribuan series pendek
+============================================
+
+Alternatif untuk SARIMAX per komoditas ketika jumlah series sangat banyak atau
+series terlalu pendek untuk di-fit sendiri (< 30 titik). Semua series dilatih
+bersama dalam satu model:
+
+    target   : log return r_t = log(y_t) - log(y_{t-1})   (bebas skala harga)
+    fitur    : r_{t-1} .. r_{t-n_lags}, deviasi log level dari rata-rata n_lags
+               terakhir (mean reversion), Fourier tahunan dari tanggal target
+    estimator: 'ridge' (Ridge, cepat) atau 'gbrt' (HistGradientBoostingRegressor,
+               non-linear, menerima NaN langsung)
+
+Fitur dibangun dari matriks (tanggal x series) dengan pergeseran array, tanpa
+loop per series. Forecast rekursif juga untuk semua series sekaligus: satu
+predict() per langkah horizon. Interval dari std residual in-sample per series,
+melebar dengan sqrt(h).
+
+    model = GlobalForecastModel(n_lags=8).fit(df)
+    forecast = model.forecast(periods=12, levels=[0.8, 0.95])   # format batch_forecast
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+
+from src.utils import create_forecast_dates, get_dataset_frequency
+from src.compact_model import interval_z
+from src.batch_forecast import BATCH_COLUMNS
+from src.instrumentation import timed_stage
+
+GLOBAL_ESTIMATORS = ('ridge', 'gbrt')
+
+# Jumlah pasangan sin/cos musiman tahunan
+FOURIER_TERMS = 2
+
+
+def _fourier(dates, terms=FOURIER_TERMS):
+    """
+    Fitur Fourier tahunan dari tanggal (sama untuk semua series)
+
+    Returns:
+        np.ndarray: (len(dates), 2 * terms)
+    """
+    if terms == 0:
+        return np.empty((len(dates), 0))
+    phase = 2 * np.pi * (np.asarray(dates.dayofyear, dtype=float) / 365.25)
+    k = np.arange(1, terms + 1)
+    return np.hstack([np.sin(np.outer(phase, k)), np.cos(np.outer(phase, k))])
+
+
+def _lag_stack(returns, level, n_lags):
+    """
+    Fitur lag untuk setiap (t, series): tensor (T, N, n_lags + 1) dimana baris t
+    berisi informasi sampai t-1 (siap memprediksi return pada t)
+    """
+    T, N = returns.shape
+    features = np.full((T, N, n_lags + 1), np.nan)
+    for k in range(1, n_lags + 1):
+        features[k:, :, k - 1] = returns[:-k]
+    # Deviasi log level t-1 dari rata-rata n_lags level sebelumnya
+    level_mean = pd.DataFrame(level).rolling(n_lags, min_periods=1).mean().to_numpy()
+    features[1:, :, n_lags] = level[:-1] - level_mean[:-1]
+    return features
+
+
+class GlobalForecastModel:
+    """
+    Model forecast global: satu estimator sklearn dipakai bersama oleh semua series
+    """
+
+    def __init__(self, n_lags=8, estimator='ridge', alpha=1.0, seasonal=True, max_iter=200,
+                 random_state=0):
+        """
+        Args:
+            n_lags: Jumlah lag return sebagai fitur
+            estimator: 'ridge' atau 'gbrt'
+            alpha: Regularisasi Ridge
+            seasonal: Sertakan fitur Fourier tahunan
+            max_iter: Jumlah iterasi boosting (gbrt)
+            random_state: Seed gbrt
+        """
+        if estimator not in GLOBAL_ESTIMATORS:
+            raise ValueError(f"Estimator '{estimator}' tidak dikenal. Pilihan: {', '.join(GLOBAL_ESTIMATORS)}")
+        self.n_lags = int(n_lags)
+        self.estimator = estimator
+        self.alpha = alpha
+        self.seasonal = seasonal
+        self.max_iter = max_iter
+        self.random_state = random_state
+        self.model_ = None
+
+    def _fourier_terms(self):
+        return FOURIER_TERMS if self.seasonal else 0
+
+    def _new_estimator(self):
+        if self.estimator == 'ridge':
+            return Ridge(alpha=self.alpha)
+        return HistGradientBoostingRegressor(max_iter=self.max_iter, random_state=self.random_state)
+
+    def _prepare(self, df):
+        values = df.astype(float).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            level = np.log(np.where(values > 0, values, np.nan))
+        returns = np.diff(level, axis=0, prepend=np.nan)
+        return level, returns
+
+    def fit(self, df):
+        """
+        Latih satu model pada semua kolom df
+
+        Args:
+            df: DataFrame (index datetime teratur, satu kolom per series)
+
+        Returns:
+            GlobalForecastModel: self
+        """
+        start = time.perf_counter()
+        with timed_stage('global_model_fit', series=df.shape[1], rows=df.shape[0], estimator=self.estimator):
+            level, returns = self._prepare(df)
+            T, N = returns.shape
+            lags = _lag_stack(returns, level, self.n_lags)
+            fourier = np.broadcast_to(_fourier(df.index, self._fourier_terms())[:, None, :],
+                                      (T, N, 2 * self._fourier_terms()))
+            X = np.concatenate([lags, fourier], axis=2).reshape(T * N, -1)
+            y = returns.reshape(T * N)
+            series_id = np.tile(np.arange(N), T)
+
+            # Ridge butuh fitur lengkap; gbrt menerima NaN (series pendek tetap ikut)
+            usable = np.isfinite(y)
+            if self.estimator == 'ridge':
+                usable &= np.isfinite(X).all(axis=1)
+            else:
+                usable &= np.isfinite(X[:, 0])
+            if usable.sum() < X.shape[1] + 1:
+                raise ValueError("Data terlalu sedikit untuk melatih model global")
+
+            self.model_ = self._new_estimator().fit(X[usable], y[usable])
+            resid = y[usable] - self.model_.predict(X[usable])
+
+            # Std residual per series; series tanpa baris latih memakai std gabungan
+            ids = series_id[usable]
+            counts = np.bincount(ids, minlength=N)
+            sq = np.bincount(ids, weights=resid ** 2, minlength=N)
+            pooled = float(np.sqrt(np.mean(resid ** 2)))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                per_series = np.sqrt(sq / counts)
+            per_series = np.where(counts >= 4, per_series, pooled)
+
+        self.columns_ = list(df.columns)
+        self.freq_ = get_dataset_frequency(df)
+        self.residual_std_ = pd.Series(per_series, index=self.columns_)
+        self.pooled_std_ = pooled
+        self.n_train_rows_ = int(usable.sum())
+        self.train_counts_ = pd.Series(counts, index=self.columns_)
+        self.fit_time_ = time.perf_counter() - start
+        self.history_ = df
+        return self
+
+    def forecast(self, df=None, periods=12, levels=(0.95,), commodities=None, min_obs=2):
+        """
+        Forecast rekursif untuk semua series sekaligus
+
+        Args:
+            df: Data terbaru (default: data saat fit); kolom baru memakai std gabungan
+            periods: Jumlah periode forecast
+            levels: Confidence level (0-1)
+            commodities: Subset kolom yang di-forecast (default: semua)
+            min_obs: Observasi minimum per series
+
+        Returns:
+            tuple: (DataFrame long-format BATCH_COLUMNS, dict error per series)
+        """
+        if self.model_ is None:
+            raise ValueError("Model global belum di-fit")
+        df = self.history_ if df is None else df
+        commodities = list(df.columns) if commodities is None else [c for c in commodities if c in df.columns]
+        levels = [float(level) for level in np.atleast_1d(levels)]
+        z = interval_z(levels)
+
+        data = df[commodities]
+        counts = data.notna().sum()
+        errors = {c: f'Observasi kurang dari {min_obs}' for c in counts.index[counts < min_obs]}
+        data = data.loc[:, counts >= min_obs]
+        if data.shape[1] == 0:
+            return pd.DataFrame(columns=BATCH_COLUMNS), errors
+
+        with timed_stage('global_model_forecast', series=data.shape[1], periods=periods):
+            level, returns = self._prepare(data)
+            # Gap di ujung data: lanjut dari level terakhir, return kosong dianggap 0
+            level = pd.DataFrame(level).ffill().to_numpy()
+            window = self.n_lags + 1
+            level = level[-window:]
+            # Series pendek: awal jendela yang kosong diisi level pertama yang ada
+            level = pd.DataFrame(level).bfill().to_numpy()
+            returns = np.nan_to_num(returns[-window:])
+
+            dates = create_forecast_dates(df.index[-1], periods, get_dataset_frequency(df))
+            fourier = _fourier(dates, self._fourier_terms())
+            N = data.shape[1]
+            predicted = np.empty((periods, N))
+            for h in range(periods):
+                recent = returns[::-1][:self.n_lags].T                                     # (N, n_lags)
+                deviation = level[-1] - np.nanmean(level[-self.n_lags:], axis=0)
+                X = np.column_stack([recent, deviation, np.broadcast_to(fourier[h], (N, fourier.shape[1]))])
+                step = self.model_.predict(X)
+                predicted[h] = level[-1] + step
+                level = np.vstack([level[1:], predicted[h]])
+                returns = np.vstack([returns[1:], step])
+
+            sigma = self.residual_std_.reindex(data.columns).fillna(self.pooled_std_).to_numpy()
+            horizon_scale = np.sqrt(np.arange(1, periods + 1))
+            log_std = np.outer(horizon_scale, sigma)                                           # (H, N)
+
+            # Long-format: per series, per level, per tanggal (sama dengan batch_forecast)
+            L = len(levels)
+            mean = np.exp(predicted).T                                                         # (N, H)
+            lower = np.exp(predicted.T[:, None, :] - z[None, :, None] * log_std.T[:, None, :])
+            upper = np.exp(predicted.T[:, None, :] + z[None, :, None] * log_std.T[:, None, :])
+            forecast = pd.DataFrame({
+                'komoditas': np.repeat(np.asarray(data.columns, dtype=object), L * periods),
+                'date': np.tile(dates.values, N * L),
+                'level': np.tile(np.repeat(levels, periods), N),
+                'forecast': np.repeat(mean[:, None, :], L, axis=1).ravel(),
+                'lower': lower.ravel(),
+                'upper': upper.ravel()
+            }, columns=BATCH_COLUMNS)
+
+        return forecast, errors
+
+
+def global_forecast(df, commodities=None, periods=12, levels=(0.95,), n_lags=8, estimator='ridge',
+                    min_obs=2, **model_kwargs):
+    """
+    Latih model global pada semua kolom df lalu forecast (format hasil sama dengan batch_forecast)
+
+    Args:
+        df: DataFrame dataset (index datetime, satu kolom per series)
+        commodities: Series yang di-forecast (default: semua); model tetap dilatih dari semua kolom
+        periods: Jumlah periode forecast
+        levels: Confidence level (0-1)
+        n_lags: Jumlah lag return
+        estimator: 'ridge' atau 'gbrt'
+        min_obs: Observasi minimum per series untuk di-forecast
+        **model_kwargs: Argumen tambahan GlobalForecastModel (alpha, seasonal, max_iter)
+
+    Returns:
+        dict: {'forecast', 'model', 'models', 'errors', 'periods', 'levels', 'method', 'success'}
+    """
+    try:
+        model = GlobalForecastModel(n_lags=n_lags, estimator=estimator, **model_kwargs).fit(df)
+        missing = [c for c in commodities if c not in df.columns] if commodities is not None else []
+        forecast, errors = model.forecast(df, periods, levels, commodities, min_obs)
+        errors.update({c: 'Komoditas tidak ada di dataset' for c in missing})
+        forecasted = list(pd.unique(forecast['komoditas']))
+        return {
+            'forecast': forecast,
+            'model': model,
+            'models': {komoditas: model for komoditas in forecasted},
+            'fit_info': {'estimator': estimator, 'n_train_rows': model.n_train_rows_, 'fit_time_s': model.fit_time_},
+            'errors': errors,
+            'periods': periods,
+            'levels': [float(level) for level in np.atleast_1d(levels)],
+            'method': 'global',
+            'success': len(forecasted) > 0
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
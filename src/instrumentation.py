@@ -0,0 +1,320 @@
+"""
+============================================
+INSTRUMENTATION
+Timing ringan untuk hot path (parsing, fit, forecast, metrics, plot)
+============================================
+
+Setiap stage dicatat sebagai event ke ring buffer in-memory:
+    {'stage', 'timestamp', 'duration', 'error', 'session', ...label/field tambahan}
+
+Buffer dipakai bersama satu proses (semua sesi Streamlit, forecast service).
+Event diberi id sesi dari set_session agar panel diagnostik hanya menampilkan
+event sesinya sendiri: get_events(session=...). Fungsi yang dijalankan di thread
+pool dibungkus bind_session agar event worker tetap ikut sesi pemanggil.
+
+Contoh:
+    with timed_stage('fit', order=(1, 1, 1)) as span:
+        fitted = model.fit(disp=False)
+        span.update(fit_diagnostics(fitted))
+
+    @instrumented('load_dataset')
+    def load_dataset(uploaded_file): ...
+"""
+
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUFFER_SIZE = 2000
+
+_buffer = deque(maxlen=DEFAULT_BUFFER_SIZE)
+_lock = threading.Lock()
+_enabled = True
+_session = contextvars.ContextVar('instrumentation_session', default=None)
+
+
+def set_enabled(enabled):
+    """
+    Aktifkan / nonaktifkan pencatatan event
+
+    Args:
+        enabled: Boolean
+    """
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def set_buffer_size(size):
+    """
+    Ubah kapasitas ring buffer (event lama tetap disimpan sampai kapasitas baru)
+
+    Args:
+        size: Jumlah maksimum event
+    """
+    global _buffer
+    with _lock:
+        _buffer = deque(_buffer, maxlen=size)
+
+
+def set_session(session_id):
+    """
+    Set id sesi untuk event yang dicatat di konteks (thread / script run) saat ini
+
+    Args:
+        session_id: Id sesi (mis. per sesi Streamlit), None untuk tanpa sesi
+    """
+    _session.set(session_id)
+
+
+def _run_in_session(session_id, func, *args, **kwargs):
+    _session.set(session_id)
+    return func(*args, **kwargs)
+
+
+def bind_session(func):
+    """
+    Bungkus func agar dijalankan dengan id sesi pemanggil (untuk executor.submit;
+    thread worker tidak mewarisi context). Hasilnya tetap bisa di-pickle.
+
+    Args:
+        func: Fungsi level modul
+
+    Returns:
+        callable: functools.partial
+    """
+    return functools.partial(_run_in_session, _session.get(), func)
+
+
+def record_event(stage, duration, **fields):
+    """
+    Simpan satu event ke ring buffer
+
+    Args:
+        stage: Nama stage (mis. 'fit', 'get_forecast')
+        duration: Durasi dalam detik
+        **fields: Label / field tambahan
+    """
+    if not _enabled:
+        return
+    event = {'stage': stage, 'timestamp': time.time(), 'duration': duration}
+    event.update(fields)
+    session_id = _session.get()
+    if session_id is not None:
+        event['session'] = session_id
+    with _lock:
+        _buffer.append(event)
+
+
+@contextmanager
+def timed_stage(stage, **labels):
+    """
+    Context manager untuk mengukur durasi satu stage.
+    Yield dict yang bisa diisi field tambahan (iterations, converged, dll).
+
+    Args:
+        stage: Nama stage
+        **labels: Label tambahan untuk event
+    """
+    span = dict(labels)
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception as e:
+        span['error'] = type(e).__name__
+        raise
+    finally:
+        record_event(stage, time.perf_counter() - start, **span)
+
+
+def instrumented(stage=None):
+    """
+    Decorator untuk mengukur durasi pemanggilan fungsi
+
+    Args:
+        stage: Nama stage (default: nama fungsi)
+    """
+    def decorator(func):
+        name = stage or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def fit_diagnostics(fitted_model):
+    """
+    Ambil info optimizer dari fitted SARIMAX (iterasi dan status konvergensi)
+
+    Args:
+        fitted_model: Fitted SARIMAX model
+
+    Returns:
+        dict: {'iterations', 'converged', 'fcalls'}
+    """
+    retvals = getattr(fitted_model, 'mle_retvals', None) or {}
+    iterations = retvals.get('iterations')
+    fcalls = retvals.get('fcalls')
+    converged = retvals.get('converged')
+    return {
+        'iterations': int(iterations) if iterations is not None else None,
+        'fcalls': int(fcalls) if fcalls is not None else None,
+        'converged': bool(converged) if converged is not None else None
+    }
+
+
+def get_events(stage=None, limit=None, session=None):
+    """
+    Ambil snapshot event dari ring buffer
+
+    Args:
+        stage: Filter nama stage (opsional)
+        limit: Ambil N event terakhir saja (opsional)
+        session: Filter id sesi (opsional, default: semua sesi)
+
+    Returns:
+        list: List dict event (paling lama di depan)
+    """
+    with _lock:
+        events = list(_buffer)
+    if stage is not None:
+        events = [e for e in events if e['stage'] == stage]
+    if session is not None:
+        events = [e for e in events if e.get('session') == session]
+    if limit is not None:
+        events = events[-limit:]
+    return events
+
+
+def clear_events(session=None):
+    """
+    Kosongkan ring buffer
+
+    Args:
+        session: Hanya hapus event sesi ini (opsional, default: semua event)
+    """
+    with _lock:
+        if session is None:
+            _buffer.clear()
+            return
+        kept = [e for e in _buffer if e.get('session') != session]
+        _buffer.clear()
+        _buffer.extend(kept)
+
+
+def summarize_events(events=None):
+    """
+    Ringkasan durasi per stage
+
+    Args:
+        events: List event (default: semua event di buffer)
+
+    Returns:
+        pd.DataFrame: count, total, mean, p50, p95, max per stage (+ iterasi dan konvergensi untuk fit)
+    """
+    if events is None:
+        events = get_events()
+    if not events:
+        return pd.DataFrame(columns=['count', 'total_s', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+
+    df = pd.DataFrame(events)
+    grouped = df.groupby('stage', sort=False)['duration']
+    summary = pd.DataFrame({
+        'count': grouped.count(),
+        'total_s': grouped.sum(),
+        'mean_ms': grouped.mean() * 1000,
+        'p50_ms': grouped.quantile(0.5) * 1000,
+        'p95_ms': grouped.quantile(0.95) * 1000,
+        'max_ms': grouped.max() * 1000
+    })
+
+    if 'iterations' in df.columns:
+        summary['iterations'] = df.groupby('stage', sort=False)['iterations'].sum(min_count=1)
+    if 'converged' in df.columns:
+        not_converged = df['converged'].eq(False)
+        summary['not_converged'] = not_converged.groupby(df['stage'], sort=False).sum()
+
+    return summary
+
+
+def _json_default(value):
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return float(value)
+    if isinstance(value, (np.bool_,)):
+        return bool(value)
+    return str(value)
+
+
+def export_json(events=None, indent=None):
+    """
+    Export event ke JSON
+
+    Args:
+        events: List event (default: semua event di buffer)
+        indent: Indentasi JSON
+
+    Returns:
+        str: JSON string
+    """
+    if events is None:
+        events = get_events()
+    return json.dumps(events, default=_json_default, indent=indent, ensure_ascii=False)
+
+
+def export_prometheus(events=None, prefix='prediksi_pangan'):
+    """
+    Export ringkasan event dalam format teks Prometheus (summary per stage)
+
+    Args:
+        events: List event (default: semua event di buffer)
+        prefix: Prefix nama metric
+
+    Returns:
+        str: Teks exposition format Prometheus
+    """
+    if events is None:
+        events = get_events()
+
+    lines = [
+        f"# HELP {prefix}_stage_duration_seconds Durasi stage hot path",
+        f"# TYPE {prefix}_stage_duration_seconds summary"
+    ]
+
+    by_stage = {}
+    for event in events:
+        by_stage.setdefault(event['stage'], []).append(event)
+
+    for stage, stage_events in by_stage.items():
+        durations = np.array([e['duration'] for e in stage_events])
+        for q in (0.5, 0.95, 0.99):
+            lines.append(
+                f'{prefix}_stage_duration_seconds{{stage="{stage}",quantile="{q}"}} {np.quantile(durations, q):.6f}'
+            )
+        lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{stage}"}} {durations.sum():.6f}')
+        lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{stage}"}} {len(durations)}')
+
+    fit_events = [e for e in events if e.get('iterations') is not None or e.get('converged') is not None]
+    if fit_events:
+        lines.append(f"# HELP {prefix}_optimizer_iterations_total Total iterasi optimizer")
+        lines.append(f"# TYPE {prefix}_optimizer_iterations_total counter")
+        lines.append(f"{prefix}_optimizer_iterations_total {sum(e.get('iterations') or 0 for e in fit_events)}")
+        lines.append(f"# HELP {prefix}_fits_total Jumlah fit per status konvergensi")
+        lines.append(f"# TYPE {prefix}_fits_total counter")
+        converged = sum(1 for e in fit_events if e.get('converged') is True)
+        lines.append(f'{prefix}_fits_total{{converged="true"}} {converged}')
+        lines.append(f'{prefix}_fits_total{{converged="false"}} {len(fit_events) - converged}')
+
+    return "\n".join(lines) + "\n"
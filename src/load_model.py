@@ -9,6 +9,8 @@ import json
 import os
 import streamlit as st
 
+from src.params_schema import validate_params
+
 
 class SARIMAParamsLoader:
     """
@@ -91,26 +93,12 @@ class SARIMAParamsLoader:
         if not self.params:
             return False
         
-        for komoditas, params in self.params.items():
-            # Cek order
-            if 'order' not in params:
-                st.error(f"❌ {komoditas} tidak punya 'order'")
-                return False
-            
-            if len(params['order']) != 3:
-                st.error(f"❌ {komoditas} order harus 3 elemen (p,d,q)")
-                return False
-            
-            # Cek seasonal_order
-            if 'seasonal_order' not in params:
-                st.error(f"❌ {komoditas} tidak punya 'seasonal_order'")
-                return False
-            
-            if len(params['seasonal_order']) != 4:
-                st.error(f"❌ {komoditas} seasonal_order harus 4 elemen (P,D,Q,m)")
-                return False
+        # Aturan skema ada di satu tempat (src/params_schema.py)
+        errors = validate_params(self.params)
+        for komoditas, messages in errors.items():
+            st.error(f"❌ {komoditas}: {'; '.join(messages)}")
         
-        return True
+        return not errors
     
     
     def display_params_info(self):
@@ -0,0 +1,225 @@
+"""
+============================================
+MULTIVARIATE FORECAST
+VAR / VECM untuk kelompok komoditas yang bergerak bersama
+============================================
+
+SARIMAX per komoditas mem-fit setiap series sendiri-sendiri, sehingga harga yang
+saling terkait (Bawang Merah / Bawang Putih, kelompok Cabai) tidak berbagi
+informasi. Mode ini mem-fit satu model gabungan untuk satu kelompok komoditas:
+
+    var   : VAR pada log harga (level), orde lag dipilih dengan information criterion
+    vecm  : VECM (error correction) dengan rank kointegrasi dari uji Johansen;
+            rank 0 setara VAR pada log return
+    auto  : uji Johansen -> rank penuh (semua stasioner) memakai VAR, selain itu VECM
+
+Forecast dan interval dihitung di skala log (interval forecast MSE model gabungan,
+termasuk kovarians antar komoditas) lalu dikembalikan ke Rupiah dengan exp().
+Hasil memakai format yang sama dengan batch_forecast / global_forecast:
+
+    result = multivariate_forecast(df, ['Bawang Merah', 'Bawang Putih'], periods=12)
+    result['forecast']        # komoditas | date | level | forecast | lower | upper
+    result['fit_info']        # model, lag_order, coint_rank, ic, n_obs
+"""
+
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.api import VAR
+from statsmodels.tsa.vector_ar.vecm import VECM, select_coint_rank, select_order
+
+from src.utils import create_forecast_dates, get_dataset_frequency
+from src.batch_forecast import BATCH_COLUMNS
+from src.instrumentation import timed_stage
+
+MULTIVARIATE_MODELS = ('auto', 'var', 'vecm')
+
+INFORMATION_CRITERIA = ('aic', 'bic', 'hqic', 'fpe')
+
+# Observasi bersama minimum per parameter per persamaan saat membatasi orde lag
+_OBS_PER_PARAM = 2
+
+
+def prepare_group(df, commodities, log=True, min_obs=30):
+    """
+    Data gabungan satu kelompok komoditas untuk VAR / VECM
+
+    Gap di tengah diinterpolasi, ujung data ditahan dari nilai terakhir (seperti
+    model global), lalu baris awal yang belum lengkap dibuang.
+
+    Args:
+        df: DataFrame dataset (index datetime teratur)
+        commodities: Kolom kelompok
+        log: Model di skala log (harga harus positif)
+        min_obs: Observasi bersama minimum
+
+    Returns:
+        tuple: (DataFrame siap fit, dict error per komoditas yang dikeluarkan)
+    """
+    errors = {c: 'Komoditas tidak ada di dataset' for c in commodities if c not in df.columns}
+    data = df[[c for c in commodities if c in df.columns]].astype(float)
+    if log:
+        nonpositive = data.columns[(data <= 0).any()]
+        errors.update({c: 'Harga tidak positif (tidak bisa log)' for c in nonpositive})
+        data = np.log(data.drop(columns=nonpositive))
+
+    data = data.interpolate(limit_area='inside').ffill()
+    counts = data.notna().sum()
+    errors.update({c: f'Observasi kurang dari {min_obs}' for c in counts.index[counts < min_obs]})
+    data = data.loc[:, counts >= min_obs].dropna()
+    if len(data) < min_obs:
+        errors.update({c: f'Observasi bersama kurang dari {min_obs}' for c in data.columns})
+        data = data.iloc[:, :0]
+    return data, errors
+
+
+def _max_lags(n_obs, k, max_lags):
+    """
+    Batasi orde lag agar jumlah parameter per persamaan (k * p + 1) masih didukung data
+    """
+    return int(max(1, min(max_lags, (n_obs // _OBS_PER_PARAM - 1) // (k + 1))))
+
+
+def fit_multivariate(data, model='auto', max_lags=8, ic='aic', coint_rank=None, signif=0.05):
+    """
+    Fit VAR / VECM pada data gabungan (hasil prepare_group)
+
+    Args:
+        data: DataFrame tanpa NaN, minimal 2 kolom
+        model: 'auto', 'var', atau 'vecm'
+        max_lags: Orde lag maksimum yang dibandingkan
+        ic: Information criterion pemilihan lag ('aic', 'bic', 'hqic', 'fpe')
+        coint_rank: Rank kointegrasi VECM (default: uji Johansen)
+        signif: Significance level uji Johansen
+
+    Returns:
+        tuple: (hasil fit statsmodels, dict fit_info)
+    """
+    if model not in MULTIVARIATE_MODELS:
+        raise ValueError(f"Model '{model}' tidak dikenal. Pilihan: {', '.join(MULTIVARIATE_MODELS)}")
+    if ic not in INFORMATION_CRITERIA:
+        raise ValueError(f"Information criterion '{ic}' tidak dikenal. Pilihan: {', '.join(INFORMATION_CRITERIA)}")
+    n_obs, k = data.shape
+    if k < 2:
+        raise ValueError("VAR/VECM butuh minimal 2 komoditas")
+    max_lags = _max_lags(n_obs, k, max_lags)
+
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # Index tanpa freq eksplisit / estimasi awal: peringatan statsmodels tidak relevan di UI
+        warnings.simplefilter('ignore')
+        # Orde lag dalam bentuk selisih (k_ar_diff); VAR level memakai k_ar_diff + 1
+        k_ar_diff = int(select_order(data, maxlags=max_lags, deterministic='co').selected_orders[ic])
+        if model != 'var' and coint_rank is None:
+            coint_rank = int(select_coint_rank(data, det_order=0, k_ar_diff=k_ar_diff, signif=signif).rank)
+        if model == 'auto':
+            model = 'var' if coint_rank >= k else 'vecm'
+
+        if model == 'var':
+            results = VAR(data.to_numpy()).fit(k_ar_diff + 1, trend='c')
+            lag_order, coint_rank = results.k_ar, None
+        else:
+            # VECM butuh rank < k (rank penuh = semua stasioner, ditangani VAR pada mode auto)
+            coint_rank = min(int(coint_rank), k - 1)
+            results = VECM(data.to_numpy(), k_ar_diff=k_ar_diff, coint_rank=coint_rank,
+                           deterministic='co').fit()
+            lag_order = k_ar_diff + 1
+
+    fit_info = {
+        'model': model,
+        'lag_order': int(lag_order),
+        'coint_rank': coint_rank,
+        'ic': ic,
+        'n_obs': int(n_obs),
+        'fit_time_s': time.perf_counter() - start
+    }
+    return results, fit_info
+
+
+def _forecast_levels(results, model, history, periods, levels):
+    """
+    Forecast dan interval untuk setiap confidence level
+
+    Returns:
+        tuple: (mean (H, k), lower (L, H, k), upper (L, H, k))
+    """
+    lower, upper = [], []
+    for level in levels:
+        if model == 'var':
+            mean, low, high = results.forecast_interval(history[-results.k_ar:], periods, alpha=1 - level)
+        else:
+            mean, low, high = results.predict(steps=periods, alpha=1 - level)
+        lower.append(low)
+        upper.append(high)
+    return mean, np.asarray(lower), np.asarray(upper)
+
+
+def multivariate_forecast(df, commodities=None, periods=12, levels=(0.95,), model='auto', max_lags=8,
+                          ic='aic', log=True, min_obs=30, coint_rank=None):
+    """
+    Fit satu VAR / VECM untuk kelompok komoditas lalu forecast (format hasil sama dengan batch_forecast)
+
+    Args:
+        df: DataFrame dataset (index datetime, satu kolom per komoditas)
+        commodities: Kelompok komoditas yang di-fit bersama (default: semua kolom)
+        periods: Jumlah periode forecast
+        levels: Confidence level (0-1)
+        model: 'auto', 'var', atau 'vecm'
+        max_lags: Orde lag maksimum
+        ic: Information criterion pemilihan lag
+        log: Fit pada log harga (interval tidak pernah negatif)
+        min_obs: Observasi bersama minimum
+        coint_rank: Rank kointegrasi VECM (default: uji Johansen)
+
+    Returns:
+        dict: {'forecast', 'model', 'models', 'fit_info', 'errors', 'periods', 'levels', 'method', 'success'}
+    """
+    try:
+        commodities = list(df.columns) if commodities is None else list(commodities)
+        levels = [float(level) for level in np.atleast_1d(levels)]
+        data, errors = prepare_group(df, commodities, log, min_obs)
+        if data.shape[1] < 2:
+            return {
+                'success': False,
+                'error': "VAR/VECM butuh minimal 2 komoditas dengan data cukup",
+                'errors': errors
+            }
+
+        with timed_stage('multivariate_forecast', commodities=data.shape[1], rows=len(data), model=model):
+            results, fit_info = fit_multivariate(data, model, max_lags, ic, coint_rank)
+            mean, lower, upper = _forecast_levels(results, fit_info['model'], data.to_numpy(), periods, levels)
+            if log:
+                mean, lower, upper = np.exp(mean), np.exp(lower), np.exp(upper)
+
+            # Long-format: per komoditas, per level, per tanggal (sama dengan batch_forecast)
+            dates = create_forecast_dates(df.index[-1], periods, get_dataset_frequency(df))
+            k, L = data.shape[1], len(levels)
+            forecast = pd.DataFrame({
+                'komoditas': np.repeat(np.asarray(data.columns, dtype=object), L * periods),
+                'date': np.tile(dates.values, k * L),
+                'level': np.tile(np.repeat(levels, periods), k),
+                'forecast': np.repeat(mean.T[:, None, :], L, axis=1).ravel(),
+                'lower': lower.transpose(2, 0, 1).ravel(),
+                'upper': upper.transpose(2, 0, 1).ravel()
+            }, columns=BATCH_COLUMNS)
+
+        fit_info['commodities'] = list(data.columns)
+        return {
+            'forecast': forecast,
+            'model': results,
+            'models': {komoditas: results for komoditas in data.columns},
+            'fit_info': fit_info,
+            'errors': errors,
+            'periods': periods,
+            'levels': levels,
+            'method': 'multivariate',
+            'success': True
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
@@ -0,0 +1,221 @@
+"""
+============================================
+PARAMS IMPORT
+Konversi tabel hasil tuning (mis. export Colab) ke best_params.json
+============================================
+
+Pengganti generate_params_from_dataframe yang lama (iterrows + eval):
+    - kolom order / seasonal order di-parse sekaligus dengan operasi string
+      pandas (tanpa eval, aman untuk file dari luar), baik berupa string
+      "(1, 1, 1)" / "[1,1,1]" maupun tuple/list
+    - bentuk order divalidasi (3 / 4 bilangan bulat >= 0, m = 0 atau >= 2);
+      baris yang tidak valid dikembalikan sebagai tabel error, bukan dibuang diam-diam
+    - kolom MAE / RMSE / MAPE (dan AIC / BIC jika ada) ikut disimpan
+    - hasil digabung ke best_params.json dengan satu kali baca dan satu kali tulis
+
+    params, errors = tuning_results_to_params(hasil_tuning_df)
+    merge_params(params, 'models/best_params.json')
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import timed_stage
+from src.params_schema import diff_params
+
+# Nama kolom di export tuning Colab -> key di best_params.json
+TUNING_COLUMNS = {
+    'komoditas': 'Komoditas',
+    'order': 'Order(p,d,q)',
+    'seasonal_order': 'Seasonal(P,D,Q,m)'
+}
+
+METRIC_COLUMNS = {
+    'MAE': 'MAE',
+    'RMSE': 'RMSE',
+    'MAPE': 'MAPE',
+    'AIC': 'aic',
+    'BIC': 'bic'
+}
+
+_BRACKETS = r'^[\s\(\[]+|[\s\)\]]+$'
+_SEPARATORS = r'[\s,;]+'
+
+
+def parse_order_column(values, length):
+    """
+    Parse kolom order menjadi matriks integer (vektor, tanpa eval)
+
+    Args:
+        values: pd.Series berisi string "(p, d, q)", tuple, atau list
+        length: Jumlah elemen yang diharapkan (3 untuk order, 4 untuk seasonal order)
+
+    Returns:
+        tuple: (DataFrame integer n x length, pd.Series alasan error per baris; '' jika valid)
+    """
+    values = pd.Series(values)
+    # Tuple/list/array -> string agar semua bentuk di-parse dengan jalur yang sama
+    text = values.map(lambda v: ' '.join(map(str, v)) if isinstance(v, (tuple, list, np.ndarray)) else v)
+    text = text.astype('string').str.replace(_BRACKETS, '', regex=True)
+    parts = text.str.split(_SEPARATORS, regex=True)
+
+    n_parts = parts.str.len().fillna(0).astype(int)
+    padded = parts.where(n_parts == length, pd.Series([[None] * length] * len(parts), index=parts.index))
+    numbers = pd.DataFrame(padded.tolist(), index=values.index).apply(pd.to_numeric, errors='coerce')
+    numbers = numbers.reindex(columns=range(length))
+
+    errors = pd.Series('', index=values.index, dtype=object)
+    not_integer = numbers.isna().any(axis=1) | (numbers % 1 != 0).any(axis=1) | (numbers < 0).any(axis=1)
+    errors[not_integer] = f'harus {length} bilangan bulat >= 0'
+    errors[n_parts != length] = f'harus {length} elemen'
+    errors[values.isna()] = 'kosong'
+    return numbers.fillna(0).astype(int), errors
+
+
+def tuning_results_to_params(df, columns=None, tuning_date=None):
+    """
+    Konversi tabel hasil tuning ke dictionary parameter best_params.json
+
+    Args:
+        df: DataFrame dengan kolom Komoditas, Order(p,d,q), Seasonal(P,D,Q,m)
+            dan opsional MAE, RMSE, MAPE, AIC, BIC
+        columns: Override nama kolom (key: 'komoditas', 'order', 'seasonal_order')
+        tuning_date: Tanggal tuning (default: sekarang)
+
+    Returns:
+        tuple: (dict parameter per komoditas, DataFrame baris tidak valid dengan kolom 'error').
+               Komoditas yang muncul lebih dari sekali memakai baris terakhir.
+    """
+    columns = {**TUNING_COLUMNS, **(columns or {})}
+    missing = [name for name in columns.values() if name not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+    tuning_date = tuning_date or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    with timed_stage('params_import', rows=len(df)):
+        komoditas = df[columns['komoditas']].astype('string').str.strip()
+        order, order_errors = parse_order_column(df[columns['order']], 3)
+        seasonal, seasonal_errors = parse_order_column(df[columns['seasonal_order']], 4)
+
+        # Seasonal: m = 0 (ARIMA, P/D/Q juga 0) atau m >= 2
+        m = seasonal[3]
+        non_seasonal = (seasonal == 0).all(axis=1)
+        invalid_m = seasonal_errors.eq('') & ~non_seasonal & (m < 2)
+        seasonal_errors = seasonal_errors.mask(invalid_m, 'm harus 0 (ARIMA) atau >= 2')
+
+        reasons = pd.DataFrame({
+            'komoditas': komoditas.isna() | komoditas.eq(''),
+            'order': order_errors.ne(''),
+            'seasonal_order': seasonal_errors.ne('')
+        })
+        error_text = (
+            np.where(reasons['komoditas'], 'komoditas kosong; ', '')
+            + np.where(reasons['order'], 'order ' + order_errors + '; ', '')
+            + np.where(reasons['seasonal_order'], 'seasonal_order ' + seasonal_errors + '; ', '')
+        )
+        invalid = reasons.any(axis=1)
+        errors = df.loc[invalid].copy()
+        errors['error'] = pd.Series(error_text, index=df.index)[invalid].str.rstrip('; ')
+
+        valid = ~invalid
+        table = pd.DataFrame({
+            'order': order[valid].values.tolist(),
+            'seasonal_order': seasonal[valid].values.tolist(),
+            'model_type': np.where(non_seasonal[valid], 'ARIMA', 'SARIMA'),
+        }, index=komoditas[valid].values)
+        for source, key in METRIC_COLUMNS.items():
+            # AIC/BIC dari order lama tidak berlaku lagi: set None jika tidak ada di tabel
+            if source in df.columns:
+                metric = pd.to_numeric(df.loc[valid, source], errors='coerce')
+                table[key] = metric.astype(object).where(metric.notna(), None).values
+            elif key in ('aic', 'bic'):
+                table[key] = None
+        table['tuning_date'] = tuning_date
+        table['is_tuned'] = True
+
+        table = table[~table.index.duplicated(keep='last')]
+        params = table.to_dict('index')
+
+    return params, errors
+
+
+def merge_params(updates, params_file='models/best_params.json'):
+    """
+    Gabungkan parameter baru ke file parameter (satu baca, satu tulis atomik)
+
+    Key lain per komoditas (mis. fit_profile) dipertahankan; komoditas baru ditambahkan.
+
+    Args:
+        updates: Dictionary parameter per komoditas
+        params_file: Path best_params.json
+
+    Returns:
+        dict: {'updated', 'added', 'changes' (laporan diff_params), 'params', 'success'}
+    """
+    try:
+        params = {}
+        if os.path.exists(params_file):
+            with open(params_file, 'r', encoding='utf-8') as f:
+                params = json.load(f)
+
+        added = [komoditas for komoditas in updates if komoditas not in params]
+        updated = [komoditas for komoditas in updates if komoditas in params]
+        previous = {komoditas: params[komoditas] for komoditas in updated}
+        for komoditas, values in updates.items():
+            params[komoditas] = {**params.get(komoditas, {}), **values}
+        changes = diff_params(previous, {komoditas: params[komoditas] for komoditas in updates})
+
+        # Tulis ke file temporer lalu ganti: file lama utuh jika penulisan gagal
+        folder = os.path.dirname(params_file) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(params, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, params_file)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        return {
+            'updated': updated,
+            'added': added,
+            'changes': changes,
+            'params': params,
+            'success': True
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+
+def import_tuning_results(df, params_file='models/best_params.json', columns=None):
+    """
+    Konversi tabel hasil tuning dan gabungkan ke file parameter dalam satu langkah
+
+    Args:
+        df: DataFrame hasil tuning
+        params_file: Path best_params.json
+        columns: Override nama kolom (lihat tuning_results_to_params)
+
+    Returns:
+        dict: {'updated', 'added', 'errors' (DataFrame baris tidak valid), 'success'}
+    """
+    try:
+        params, errors = tuning_results_to_params(df, columns)
+    except ValueError as e:
+        return {'success': False, 'error': str(e)}
+    if not params:
+        return {'success': False, 'error': 'Tidak ada baris valid', 'errors': errors}
+
+    result = merge_params(params, params_file)
+    result['errors'] = errors
+    return result
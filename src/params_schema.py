@@ -0,0 +1,250 @@
+"""
+============================================
+PARAMS SCHEMA
+Skema parameter model (best_params.json) dan diff antar set parameter
+============================================
+
+best_params.json berisi satu dict per komoditas (atau komoditas x pasar):
+
+    {"order": [p, d, q], "seasonal_order": [P, D, Q, m], "model_type": "SARIMA",
+     "aic": ..., "bic": ..., "MAE": ..., "RMSE": ..., "MAPE": ...,
+     "tuning_date": "YYYY-mm-dd HH:MM:SS", "is_tuned": true, "fit_profile": "fast",
+     "exog": ["ramadan", "lebaran"]}
+
+Untuk ribuan series, dict tersebut diubah sekali menjadi tabel bertipe
+(params_to_frame: satu baris per komoditas, kolom p..m Int64, metrik float,
+tuning_date datetime, is_tuned boolean, exog nama regresor dipisah koma). Validasi (validate_params) dan diff
+(diff_params) bekerja pada tabel ini dengan operasi kolom dan operasi himpunan
+index, tanpa loop per komoditas:
+
+    report = diff_params(old_params, new_params)
+    report[report['refit']].index     # komoditas yang modelnya perlu di-fit ulang
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import timed_stage
+
+ORDER_FIELDS = ['p', 'd', 'q']
+SEASONAL_FIELDS = ['P', 'D', 'Q', 'm']
+METRIC_FIELDS = ['aic', 'bic', 'MAE', 'RMSE', 'MAPE']
+MODEL_TYPES = ('ARIMA', 'SARIMA')
+
+# Kolom tabel parameter beserta dtype-nya
+SCHEMA_COLUMNS = {
+    **{field: 'Int64' for field in ORDER_FIELDS + SEASONAL_FIELDS},
+    'model_type': 'string',
+    'fit_profile': 'string',
+    'exog': 'string',
+    **{field: 'float64' for field in METRIC_FIELDS},
+    'tuning_date': 'datetime64[ns]',
+    'is_tuned': 'boolean'
+}
+
+# Perubahan pada field ini berarti model lama tidak berlaku lagi
+REFIT_FIELDS = ORDER_FIELDS + SEASONAL_FIELDS + ['model_type', 'fit_profile', 'exog']
+
+DIFF_COLUMNS = ['change', 'changed_fields', 'refit', 'order_old', 'order_new',
+                'seasonal_order_old', 'seasonal_order_new']
+
+
+def _expand_order(values, fields):
+    """
+    Pecah kolom list order menjadi kolom integer
+
+    Returns:
+        tuple: (DataFrame angka, Series bool bentuk salah, Series bool nilai salah)
+    """
+    size = len(fields)
+    is_sequence = values.map(lambda v: isinstance(v, (list, tuple)) and len(v) == size)
+    rows = [v if ok else [None] * size for v, ok in zip(values, is_sequence)]
+    numbers = pd.DataFrame(rows, index=values.index, columns=fields).apply(pd.to_numeric, errors='coerce')
+    bad_value = is_sequence & ((numbers % 1 != 0) | (numbers < 0) | numbers.isna()).any(axis=1)
+    return numbers, ~is_sequence, bad_value
+
+
+def _parse(params):
+    """
+    Dict parameter -> (tabel bertipe, DataFrame boolean pelanggaran per aturan)
+    """
+    records = pd.DataFrame.from_dict(params, orient='index') if params else pd.DataFrame()
+    index = pd.Index(list(params), name='komoditas')
+    records = records.reindex(index)
+
+    def column(name):
+        return records[name] if name in records else pd.Series(None, index=index, dtype=object)
+
+    order, order_shape, order_value = _expand_order(column('order'), ORDER_FIELDS)
+    seasonal, seasonal_shape, seasonal_value = _expand_order(column('seasonal_order'), SEASONAL_FIELDS)
+
+    model_type = column('model_type')
+    fit_profile = column('fit_profile')
+    exog = column('exog')
+    is_tuned = column('is_tuned')
+    tuning_date = column('tuning_date')
+    metrics = pd.DataFrame({field: column(field) for field in METRIC_FIELDS})
+    numeric_metrics = metrics.apply(pd.to_numeric, errors='coerce')
+    parsed_date = pd.to_datetime(tuning_date, errors='coerce')
+
+    non_seasonal = seasonal[['P', 'D', 'Q']].eq(0).all(axis=1)
+    violations = pd.DataFrame({
+        "order harus list 3 elemen (p,d,q)": order_shape,
+        "order harus bilangan bulat >= 0": order_value,
+        "seasonal_order harus list 4 elemen (P,D,Q,m)": seasonal_shape,
+        "seasonal_order harus bilangan bulat >= 0": seasonal_value,
+        "m harus 0 (ARIMA) atau >= 2": ~seasonal_shape & ~seasonal_value & (seasonal['m'] < 2) & ~non_seasonal,
+        f"model_type harus salah satu dari {', '.join(MODEL_TYPES)}": model_type.notna() & ~model_type.isin(MODEL_TYPES),
+        "metrik (aic, bic, MAE, RMSE, MAPE) harus angka": (metrics.notna() & numeric_metrics.isna()).any(axis=1),
+        "is_tuned harus boolean": is_tuned.notna() & ~is_tuned.map(lambda v: isinstance(v, (bool, np.bool_))),
+        "tuning_date tidak valid": tuning_date.notna() & parsed_date.isna(),
+        "fit_profile harus nama profil atau dict": fit_profile.notna() & ~fit_profile.map(lambda v: isinstance(v, (str, dict))),
+        "exog harus list nama regresor": exog.notna() & ~exog.map(
+            lambda v: isinstance(v, list) and all(isinstance(name, str) for name in v)),
+    }, index=index).fillna(False)
+
+    frame = pd.concat([order, seasonal], axis=1)
+    frame['model_type'] = model_type
+    # Profil dict dibandingkan lewat JSON dengan key terurut
+    frame['fit_profile'] = fit_profile.map(lambda v: json.dumps(v, sort_keys=True) if isinstance(v, dict) else v)
+    frame['exog'] = exog.map(lambda v: ','.join(map(str, v)) if isinstance(v, list) else v)
+    frame[METRIC_FIELDS] = numeric_metrics
+    frame['tuning_date'] = parsed_date
+    frame['is_tuned'] = is_tuned.where(~violations["is_tuned harus boolean"])
+    frame = frame.astype(SCHEMA_COLUMNS)
+    frame.index.name = 'komoditas'
+    return frame, violations
+
+
+def params_to_frame(params):
+    """
+    Ubah dict parameter menjadi tabel bertipe (satu baris per komoditas)
+
+    Args:
+        params: Dictionary parameter (isi best_params.json) atau DataFrame hasil params_to_frame
+
+    Returns:
+        pd.DataFrame: Index komoditas, kolom SCHEMA_COLUMNS; nilai yang tidak valid menjadi NA
+    """
+    if isinstance(params, pd.DataFrame):
+        return params
+    with timed_stage('params_to_frame', commodities=len(params or {})):
+        return _parse(params or {})[0]
+
+
+def validate_params(params):
+    """
+    Validasi semua parameter terhadap skema (vektor untuk semua komoditas)
+
+    Args:
+        params: Dictionary parameter
+
+    Returns:
+        dict: {komoditas: [pesan error, ...]} hanya untuk komoditas yang tidak valid
+              (dict kosong = semua valid)
+    """
+    if not isinstance(params, dict):
+        raise TypeError("Parameter harus berupa dict {komoditas: {...}}")
+    bad_entries = [komoditas for komoditas, value in params.items() if not isinstance(value, dict)]
+    _, violations = _parse({k: v for k, v in params.items() if isinstance(v, dict)})
+
+    invalid = violations[violations.any(axis=1)]
+    errors = {
+        komoditas: [rule for rule, broken in row.items() if broken]
+        for komoditas, row in invalid.iterrows()
+    }
+    errors.update({komoditas: ['parameter harus berupa dict'] for komoditas in bad_entries})
+    return errors
+
+
+def _order_text(frame, fields):
+    # (p, d, q) sebagai teks untuk laporan; NA jika komoditas tidak ada di sisi tersebut
+    parts = frame[fields].astype('string')
+    text = '(' + parts[fields[0]].str.cat([parts[f] for f in fields[1:]], sep=', ') + ')'
+    return text
+
+
+def _field_changes(old, new, fields):
+    """
+    Matriks boolean perubahan per field untuk index yang sama (NA di kedua sisi = sama)
+    """
+    changed = pd.DataFrame(False, index=old.index, columns=fields)
+    for field in fields:
+        a, b = old[field], new[field]
+        both_missing = a.isna() & b.isna()
+        if pd.api.types.is_float_dtype(a):
+            same = pd.Series(np.isclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float),
+                                        rtol=1e-9, equal_nan=True), index=a.index)
+        else:
+            same = (a == b).fillna(False).astype(bool) | both_missing
+        changed[field] = ~same
+    return changed
+
+
+def diff_params(old, new, fields=None):
+    """
+    Bandingkan dua set parameter dan buat laporan perubahan per komoditas
+
+    Args:
+        old: Dict parameter lama (atau tabel params_to_frame)
+        new: Dict parameter baru (atau tabel params_to_frame)
+        fields: Field yang dibandingkan (default: semua kolom skema)
+
+    Returns:
+        pd.DataFrame: Index komoditas (urutan: set baru, lalu yang dihapus), kolom:
+            change             'added', 'removed', 'changed', atau 'unchanged'
+            changed_fields     nama field yang berubah, dipisah koma
+            refit              True jika model perlu di-fit ulang (baru, atau order /
+                               seasonal order / model_type / fit_profile / exog berubah)
+            order_old/new, seasonal_order_old/new
+    """
+    fields = list(SCHEMA_COLUMNS) if fields is None else list(fields)
+    with timed_stage('params_diff', old=len(old), new=len(new)):
+        old_frame, new_frame = params_to_frame(old), params_to_frame(new)
+
+        added = new_frame.index.difference(old_frame.index, sort=False)
+        removed = old_frame.index.difference(new_frame.index, sort=False)
+        common = new_frame.index.intersection(old_frame.index, sort=False)
+
+        changes = _field_changes(old_frame.loc[common], new_frame.loc[common], fields)
+        any_change = changes.any(axis=1)
+        refit_fields = [f for f in fields if f in REFIT_FIELDS]
+
+        report = pd.DataFrame(index=new_frame.index.append(removed), columns=DIFF_COLUMNS)
+        report.index.name = 'komoditas'
+        report.loc[common, 'change'] = np.where(any_change, 'changed', 'unchanged')
+        report.loc[added, 'change'] = 'added'
+        report.loc[removed, 'change'] = 'removed'
+        report['changed_fields'] = ''
+        report.loc[common, 'changed_fields'] = changes.dot(pd.Index(fields) + ',').str.rstrip(',')
+        report['refit'] = False
+        report.loc[common, 'refit'] = changes[refit_fields].any(axis=1)
+        report.loc[added, 'refit'] = True
+        report['refit'] = report['refit'].astype(bool)
+
+        old_aligned = old_frame.reindex(report.index)
+        new_aligned = new_frame.reindex(report.index)
+        report['order_old'] = _order_text(old_aligned, ORDER_FIELDS)
+        report['order_new'] = _order_text(new_aligned, ORDER_FIELDS)
+        report['seasonal_order_old'] = _order_text(old_aligned, SEASONAL_FIELDS)
+        report['seasonal_order_new'] = _order_text(new_aligned, SEASONAL_FIELDS)
+        return report
+
+
+def diff_summary(report):
+    """
+    Ringkasan laporan diff_params
+
+    Args:
+        report: DataFrame hasil diff_params
+
+    Returns:
+        dict: Jumlah per jenis perubahan, jumlah refit, dan list komoditas yang perlu refit
+    """
+    counts = report['change'].value_counts()
+    return {
+        **{change: int(counts.get(change, 0)) for change in ('added', 'removed', 'changed', 'unchanged')},
+        'refit': report.index[report['refit']].tolist()
+    }
@@ -0,0 +1,333 @@
+"""
+============================================
+RETUNE SCHEDULER
+Tuning ulang hanya untuk komoditas yang modelnya memburuk
+============================================
+
+Saat tuning, ringkasan data (fingerprint) disimpan di best_params.json per
+komoditas: hash series, periode, statistik level dan selisih, serta parameter
+hasil fit dan skala residualnya. Saat dataset baru di-upload, plan_retuning
+membandingkan data baru dengan fingerprint tersebut, bertahap dari yang paling
+murah:
+
+    1. Hash sama dengan fingerprint / pemeriksaan terakhir     -> keep (tanpa komputasi)
+    2. Data historis direvisi signifikan (mean/std berubah)    -> retune
+    3. Structural break pada selisih periode baru vs saat tuning
+       (uji mean Welch + uji rasio varians, vektor untuk semua komoditas) -> retune
+    4. Drift residual: model lama di-filter (tanpa fit ulang) pada data baru,
+       residual satu langkah diuji bias (z) dan skalanya (chi-square) -> retune
+
+Komoditas lain tetap memakai parameter lama (is_tuned tidak di-reset), sehingga
+upload ulang data yang hampir sama nyaris tanpa biaya.
+
+    plan = plan_retuning(df, params)
+    apply_retuning_plan(plan, 'models/best_params.json')
+"""
+
+import hashlib
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from src.instrumentation import timed_stage
+from src.load_model import SARIMAParamsLoader
+from src.params_import import merge_params
+from src.utils import get_dataset_frequency
+from src.calendar_features import make_exog
+
+try:
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    _STATSMODELS_IMPORT_ERROR = None
+except Exception as e:
+    SARIMAX = None
+    _STATSMODELS_IMPORT_ERROR = e
+
+PLAN_COLUMNS = ['action', 'reason', 'new_obs', 'history_revised', 'break_p',
+                'drift_bias_z', 'drift_scale_p', 'checked_hash']
+
+# Field yang di-reset ketika komoditas dijadwalkan tuning ulang
+RESET_FIELDS = {'is_tuned': False, 'aic': None, 'bic': None, 'tuning_date': None}
+
+
+def series_hash(series):
+    """
+    Hash isi series (nilai + tanggal observasi), tanpa attrs
+
+    Args:
+        series: pd.Series
+
+    Returns:
+        str: SHA-1 hex
+    """
+    hashed = pd.util.hash_pandas_object(series.dropna(), index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def series_fingerprint(series, model=None):
+    """
+    Fingerprint data saat tuning (disimpan di best_params.json key 'fingerprint')
+
+    Args:
+        series: pd.Series yang dipakai untuk tuning
+        model: Model pmdarima hasil auto_arima (opsional, untuk uji drift residual)
+
+    Returns:
+        dict: hash, start, end, n_obs, mean, std, diff_mean, diff_std
+              (+ model_params, trend, resid_std jika model diberikan)
+    """
+    observed = series.dropna().astype(float)
+    diff = observed.diff().dropna()
+    fingerprint = {
+        'hash': series_hash(observed),
+        'start': observed.index[0].strftime('%Y-%m-%d'),
+        'end': observed.index[-1].strftime('%Y-%m-%d'),
+        'n_obs': int(len(observed)),
+        'mean': float(observed.mean()),
+        'std': float(observed.std()),
+        'diff_mean': float(diff.mean()),
+        'diff_std': float(diff.std())
+    }
+
+    results = getattr(model, 'arima_res_', None)
+    if results is not None:
+        order, seasonal_order = model.order, model.seasonal_order
+        # Residual awal (selama differencing) bukan error prediksi
+        burn_in = order[1] + seasonal_order[1] * seasonal_order[3]
+        fingerprint.update({
+            'model_params': [float(v) for v in np.asarray(results.params)],
+            'trend': results.model.trend,
+            'resid_std': float(np.std(np.asarray(results.resid)[burn_in:]))
+        })
+    return fingerprint
+
+
+def _fingerprint_table(params, columns):
+    """
+    Fingerprint semua komoditas sebagai tabel (satu baris per komoditas)
+    """
+    rows = {
+        komoditas: entry.get('fingerprint') or {}
+        for komoditas, entry in params.items() if komoditas in columns
+    }
+    # Komoditas tanpa fingerprint tetap punya baris (semua NaN)
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table = table.reindex(index=list(rows), columns=['hash', 'checked_hash', 'end', 'n_obs', 'mean', 'std',
+                                   'diff_mean', 'diff_std'])
+    table['end'] = pd.to_datetime(table['end'], errors='coerce')
+    return table
+
+
+def detect_breaks(df, fingerprints, alpha=0.01, min_new_obs=4):
+    """
+    Uji structural break untuk semua komoditas sekaligus: selisih periode setelah
+    tuning dibandingkan statistik selisih saat tuning (Welch t untuk mean, F untuk varians)
+
+    Args:
+        df: DataFrame dataset baru (index datetime, satu kolom per komoditas)
+        fingerprints: Tabel fingerprint (index komoditas; kolom end, n_obs, diff_mean, diff_std)
+        alpha: Significance level
+        min_new_obs: Jumlah selisih baru minimum agar diuji
+
+    Returns:
+        pd.DataFrame: Per komoditas: new_obs, break_p (p-value terkecil), break (bool)
+    """
+    columns = list(fingerprints.index)
+    values = df[columns].astype(float)
+    diffs = values.diff().to_numpy()
+    ends = fingerprints['end'].to_numpy(dtype='datetime64[ns]')
+
+    # Mask periode baru per kolom (tanggal > akhir data saat tuning)
+    new_mask = (df.index.to_numpy()[:, None] > ends[None, :]) & ~np.isnan(diffs)
+    new_obs = values.notna().to_numpy() & (df.index.to_numpy()[:, None] > ends[None, :])
+    n_new = new_mask.sum(axis=0)
+    new_diffs = np.where(new_mask, diffs, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        # Kolom tanpa data baru: mean/varians NaN (tidak diuji)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean_new = np.nanmean(new_diffs, axis=0)
+        var_new = np.nanvar(new_diffs, axis=0, ddof=1)
+        n_ref = fingerprints['n_obs'].to_numpy(dtype=float) - 1
+        mean_ref = fingerprints['diff_mean'].to_numpy(dtype=float)
+        var_ref = fingerprints['diff_std'].to_numpy(dtype=float) ** 2
+
+        # Welch t-test: pergeseran rata-rata perubahan harga (tren)
+        se = np.sqrt(var_new / n_new + var_ref / n_ref)
+        t_stat = (mean_new - mean_ref) / se
+        dof = se ** 4 / ((var_new / n_new) ** 2 / (n_new - 1) + (var_ref / n_ref) ** 2 / (n_ref - 1))
+        p_mean = 2 * stats.t.sf(np.abs(t_stat), dof)
+
+        # F-test dua sisi: perubahan volatilitas
+        f_stat = var_new / var_ref
+        p_var = 2 * np.minimum(stats.f.sf(f_stat, n_new - 1, n_ref - 1), stats.f.cdf(f_stat, n_new - 1, n_ref - 1))
+
+    tested = n_new >= min_new_obs
+    break_p = np.where(tested, np.fmin(p_mean, p_var), np.nan)
+    return pd.DataFrame({
+        'new_obs': new_obs.sum(axis=0),
+        'break_p': break_p,
+        'break': tested & (break_p < alpha)
+    }, index=fingerprints.index)
+
+
+def residual_drift(series, entry, min_new_obs=4, data=None):
+    """
+    Drift residual model lama pada data baru (filter Kalman dengan parameter tersimpan,
+    tanpa fit ulang)
+
+    Regresor kalender dihitung ulang dari tanggal; regresor eksternal (mis. harga BBM)
+    diambil dari kolom data. ValueError jika kolom regresor tidak ada (lihat make_exog).
+
+    Args:
+        series: pd.Series data baru (observasi)
+        entry: Parameter komoditas dari best_params.json (dengan fingerprint model_params)
+        min_new_obs: Jumlah observasi baru minimum agar diuji
+        data: DataFrame sumber kolom regresor eksternal (dataset baru)
+
+    Returns:
+        dict: {'bias_z', 'scale_p', 'n'} atau None jika tidak bisa diuji
+    """
+    fingerprint = entry.get('fingerprint') or {}
+    if SARIMAX is None or not fingerprint.get('model_params') or not fingerprint.get('resid_std'):
+        return None
+    observed = series.dropna().astype(float)
+    new = observed.index > pd.Timestamp(fingerprint['end'])
+    if new.sum() < min_new_obs:
+        return None
+
+    # Regresor sama dengan saat tuning (frekuensi dari series sebelum dropna)
+    exog = make_exog(observed.index, entry.get('exog') or None, get_dataset_frequency(series), data=data)
+    exog = exog.to_numpy() if exog is not None else None
+
+    model = SARIMAX(observed.to_numpy(), exog=exog, order=tuple(entry['order']),
+                    seasonal_order=tuple(entry['seasonal_order']), trend=fingerprint.get('trend'))
+    params = np.asarray(fingerprint['model_params'])
+    if len(params) != len(model.start_params):
+        return None
+    resid = model.filter(params).resid[new]
+
+    sigma = fingerprint['resid_std']
+    n = len(resid)
+    return {
+        # Bias: rata-rata error prediksi baru menjauh dari 0
+        'bias_z': float(resid.mean() / (sigma / np.sqrt(n))),
+        # Skala: sum(e^2)/sigma^2 ~ chi2(n) jika model masih sesuai
+        'scale_p': float(stats.chi2.sf(np.sum(resid ** 2) / sigma ** 2, n)),
+        'n': int(n)
+    }
+
+
+def plan_retuning(df, params, alpha=0.01, min_new_obs=4, revision_tolerance=0.05):
+    """
+    Tentukan komoditas yang perlu tuning ulang untuk dataset baru
+
+    Args:
+        df: DataFrame dataset baru (sama dengan yang dipakai untuk tuning, mis. hasil clean_dataset)
+        params: Dictionary parameter (dengan 'fingerprint' per komoditas)
+        alpha: Significance level uji break dan drift
+        min_new_obs: Observasi baru minimum sebelum uji break/drift dijalankan
+        revision_tolerance: Perubahan relatif mean/std data lama yang masih dianggap revisi kecil
+
+    Returns:
+        pd.DataFrame: Index komoditas; action ('keep' / 'retune' / 'skip'), reason,
+                      new_obs, history_revised, break_p, drift_bias_z, drift_scale_p, checked_hash
+    """
+    commodities = [k for k in params if k in df.columns]
+    plan = pd.DataFrame(index=pd.Index(list(params), name='komoditas'), columns=PLAN_COLUMNS)
+    plan['action'] = 'skip'
+    plan['reason'] = 'Komoditas tidak ada di dataset'
+    plan['history_revised'] = False
+    if not commodities:
+        return plan
+
+    with timed_stage('retune_plan', commodities=len(commodities)):
+        fingerprints = _fingerprint_table(params, commodities)
+        hashes = pd.Series({k: series_hash(df[k]) for k in commodities})
+        plan.loc[commodities, 'checked_hash'] = hashes
+
+        tuned = pd.Series({k: bool(params[k].get('is_tuned', False)) for k in commodities})
+        has_fingerprint = fingerprints['hash'].notna() & fingerprints['end'].notna()
+        unchanged = hashes.eq(fingerprints['hash']) | hashes.eq(fingerprints['checked_hash'])
+
+        plan.loc[commodities, 'action'] = 'keep'
+        plan.loc[commodities, 'reason'] = 'Data sama dengan saat tuning / pemeriksaan terakhir'
+        no_baseline = tuned[~tuned].index.union(has_fingerprint[~has_fingerprint].index)
+        plan.loc[no_baseline, ['action', 'reason']] = ['retune', 'Belum di-tune atau tanpa fingerprint']
+
+        # Sisanya: data berubah sejak tuning
+        pending = [k for k in commodities if k not in no_baseline and not unchanged[k]]
+        if not pending:
+            return plan
+        fp = fingerprints.loc[pending]
+
+        # Revisi data historis: hash periode tuning berbeda, cek besarnya lewat mean/std
+        prefix = {k: df[k].loc[:fp.at[k, 'end']] for k in pending}
+        revised = pd.Series({k: series_hash(prefix[k]) != fp.at[k, 'hash'] for k in pending})
+        prefix_stats = pd.DataFrame({k: [prefix[k].mean(), prefix[k].std()] for k in pending},
+                                    index=['mean', 'std']).T
+        scale = fp['std'].where(fp['std'] > 0)
+        major = revised & (
+            ((prefix_stats['mean'] - fp['mean']).abs() / scale > revision_tolerance)
+            | ((prefix_stats['std'] / scale - 1).abs() > revision_tolerance)
+        )
+        plan.loc[pending, 'history_revised'] = revised
+        plan.loc[major[major].index, ['action', 'reason']] = ['retune', 'Data historis direvisi signifikan']
+
+        breaks = detect_breaks(df, fp, alpha, min_new_obs)
+        plan.loc[pending, 'new_obs'] = breaks['new_obs']
+        plan.loc[pending, 'break_p'] = breaks['break_p']
+        broken = breaks.index[breaks['break'] & ~major]
+        plan.loc[broken, ['action', 'reason']] = ['retune', 'Structural break setelah tuning']
+
+        for komoditas in [k for k in pending if k not in broken and not major[k]]:
+            try:
+                drift = residual_drift(df[komoditas], params[komoditas], min_new_obs, data=df)
+            except ValueError as e:
+                plan.loc[komoditas, 'reason'] = f'Uji drift dilewati ({e}), parameter dipertahankan'
+                continue
+            if drift is None:
+                if breaks.at[komoditas, 'new_obs'] < min_new_obs:
+                    plan.loc[komoditas, 'reason'] = 'Data baru belum cukup untuk diuji, parameter dipertahankan'
+                else:
+                    plan.loc[komoditas, 'reason'] = 'Model tersimpan tidak bisa diuji ulang, parameter dipertahankan'
+                continue
+            plan.loc[komoditas, ['drift_bias_z', 'drift_scale_p']] = [drift['bias_z'], drift['scale_p']]
+            z = stats.norm.ppf(1 - alpha / 2)
+            if abs(drift['bias_z']) > z or drift['scale_p'] < alpha:
+                plan.loc[komoditas, ['action', 'reason']] = ['retune', 'Drift residual model lama']
+            else:
+                plan.loc[komoditas, 'reason'] = 'Model lama masih sesuai data baru'
+
+    return plan
+
+
+def apply_retuning_plan(plan, params_file='models/best_params.json', params=None):
+    """
+    Terapkan plan ke file parameter dalam satu kali tulis: reset status tuning komoditas
+    'retune', catat hash yang sudah diperiksa untuk komoditas 'keep'
+
+    Args:
+        plan: DataFrame hasil plan_retuning
+        params_file: Path best_params.json
+        params: Dictionary parameter saat plan dibuat (default: dibaca dari params_file)
+
+    Returns:
+        dict: Hasil merge_params + 'retune' (list komoditas) dan 'keep'
+    """
+    if params is None:
+        params = SARIMAParamsLoader(params_file).params or {}
+
+    retune = plan.index[plan['action'] == 'retune'].tolist()
+    keep = plan.index[plan['action'] == 'keep'].tolist()
+    updates = {komoditas: dict(RESET_FIELDS) for komoditas in retune}
+    for komoditas in keep:
+        fingerprint = params.get(komoditas, {}).get('fingerprint')
+        if fingerprint and fingerprint.get('checked_hash') != plan.at[komoditas, 'checked_hash']:
+            updates[komoditas] = {'fingerprint': {**fingerprint, 'checked_hash': plan.at[komoditas, 'checked_hash']}}
+
+    result = merge_params(updates, params_file) if updates else {'success': True, 'updated': [], 'added': []}
+    result['retune'] = retune
+    result['keep'] = keep
+    return result
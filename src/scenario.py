@@ -0,0 +1,251 @@
+"""
+============================================
+SCENARIO ENGINE
+Simulasi jalur harga masa depan dari state SARIMAX untuk analisis risiko
+============================================
+
+Ribuan jalur disimulasikan sekaligus (vektor) dari state Kalman terakhir model
+yang sudah di-fit (CompactForecastModel). Shock buatan pengguna bisa ditambahkan,
+mis. kenaikan level Rp 5.000 mulai minggu ke-4:
+
+    shocks = [{'type': 'level_shift', 'start': 4, 'size': 5000}]
+    result = simulate_scenarios(model, steps=12, shocks=shocks, thresholds=[60000])
+    result['exceedance']        # P(harga > 60000) per minggu
+    result['exceedance_any']    # P(harga > 60000 minimal sekali dalam horizon)
+
+Jalur diproses per chunk; tanpa return_paths=True hanya ringkasan yang disimpan
+(jumlah, histogram per periode, statistik per jalur), bukan matriks n_paths x steps.
+
+Jenis shock:
+    level_shift : + size mulai minggu start (sampai end jika diberikan)
+    pulse       : + size hanya pada minggu start
+    ramp        : naik linear dari 0 sampai size antara start dan end, lalu tetap
+    pct_shift   : x (1 + size) mulai minggu start (sampai end jika diberikan)
+Opsional 'size_std' untuk ukuran shock yang acak per jalur.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.compact_model import CompactForecastModel
+from src.instrumentation import timed_stage
+
+SHOCK_TYPES = ('level_shift', 'pulse', 'ramp', 'pct_shift')
+
+
+def _psd_factor(matrix):
+    """
+    Faktor L dengan L @ L.T = matrix untuk matriks semi-definit positif
+    (bisa singular, jadi tidak memakai Cholesky)
+    """
+    matrix = np.atleast_2d(matrix)
+    eigval, eigvec = np.linalg.eigh((matrix + matrix.T) / 2)
+    return eigvec * np.sqrt(np.clip(eigval, 0, None))
+
+
+def _validate_shocks(shocks, steps):
+    shocks = list(shocks or [])
+    for shock in shocks:
+        if shock.get('type') not in SHOCK_TYPES:
+            raise ValueError(f"Jenis shock '{shock.get('type')}' tidak dikenal. Pilihan: {', '.join(SHOCK_TYPES)}")
+        start = int(shock.get('start', 1))
+        end = shock.get('end')
+        if not 1 <= start <= steps:
+            raise ValueError(f"Minggu awal shock harus di antara 1 dan {steps}, bukan {start}")
+        if shock['type'] == 'ramp' and end is None:
+            raise ValueError("Shock 'ramp' membutuhkan 'end'")
+        if end is not None and int(end) < start:
+            raise ValueError("Minggu akhir shock harus >= minggu awal")
+    return shocks
+
+
+def _shock_profile(shock, steps):
+    """
+    Bobot shock per periode (0-1), shape (steps,)
+    """
+    h = np.arange(1, steps + 1)
+    start = int(shock.get('start', 1))
+    end = int(shock['end']) if shock.get('end') is not None else steps
+
+    if shock['type'] == 'pulse':
+        return (h == start).astype(float)
+    if shock['type'] == 'ramp':
+        width = max(end - start, 1)
+        return np.clip((h - start + 1) / (width + 1), 0, 1) * (h >= start)
+    return ((h >= start) & (h <= end)).astype(float)
+
+
+def _apply_shocks(paths, shocks, rng):
+    """
+    Terapkan shock ke jalur (in-place), paths shape (n, steps)
+    """
+    n, steps = paths.shape
+    for shock in shocks:
+        weights = _shock_profile(shock, steps)[None, :]
+        size = float(shock.get('size', 0.0))
+        size_std = float(shock.get('size_std', 0.0))
+        sizes = size + size_std * rng.standard_normal((n, 1)) if size_std > 0 else size
+        if shock['type'] == 'pct_shift':
+            paths *= 1 + sizes * weights
+        else:
+            paths += sizes * weights
+    return paths
+
+
+def _simulate_chunk(model, steps, n, rng, exog=None):
+    """
+    Simulasi n jalur dari state terakhir model, shape (n, steps)
+    """
+    m = model.matrices
+    obs_intercept = model._exog_intercept(steps, exog)
+    design, transition = m['design'], m['transition']
+    state_factor = _psd_factor(model.state_cov)
+    noise_factor = _psd_factor(model.scale * m['state_cov'])
+    obs_factor = _psd_factor(model.scale * m['obs_cov'])
+    selection = m['selection']
+    has_obs_noise = np.any(obs_factor != 0)
+
+    k_states = len(model.state)
+    states = model.state[None, :] + rng.standard_normal((n, k_states)) @ state_factor.T
+    paths = np.empty((n, steps))
+    for h in range(steps):
+        paths[:, h] = (states @ design.T)[:, 0] + obs_intercept[h]
+        if has_obs_noise:
+            paths[:, h] += (rng.standard_normal((n, obs_factor.shape[1])) @ obs_factor.T)[:, 0]
+        eta = rng.standard_normal((n, noise_factor.shape[1])) @ noise_factor.T
+        states = states @ transition.T + m['state_intercept'][None, :] + eta @ selection.T
+    return paths
+
+
+def _histogram_quantiles(counts, lower, width, quantiles):
+    """
+    Quantile per periode dari histogram (interpolasi linear di dalam bin)
+    """
+    cum = np.cumsum(counts, axis=1)
+    total = cum[:, -1:]
+    result = np.empty((counts.shape[0], len(quantiles)))
+    for j, q in enumerate(quantiles):
+        target = q * total[:, 0]
+        idx = np.argmax(cum >= target[:, None], axis=1)
+        rows = np.arange(counts.shape[0])
+        prev = np.where(idx > 0, cum[rows, idx - 1], 0)
+        in_bin = counts[rows, idx]
+        frac = np.where(in_bin > 0, (target - prev) / np.maximum(in_bin, 1), 0.5)
+        result[:, j] = lower + (idx + frac) * width
+    return result
+
+
+def simulate_scenarios(model, steps=12, n_paths=5000, shocks=None, thresholds=None,
+                       quantiles=(0.05, 0.5, 0.95), chunk_size=1000, bins=2000,
+                       seed=None, index=None, return_paths=False, exog=None):
+    """
+    Simulasi Monte Carlo jalur harga dari state model yang sudah di-fit
+
+    Args:
+        model: CompactForecastModel (result['model'] dari forecast_future) atau hasil fit statsmodels
+        steps: Jumlah periode ke depan
+        n_paths: Jumlah jalur simulasi
+        shocks: List dict shock ({'type', 'start', 'size', 'end'?, 'size_std'?}), start 1-based
+        thresholds: List ambang harga untuk probabilitas exceedance
+        quantiles: Quantile per periode (0-1)
+        chunk_size: Jumlah jalur per chunk (batas memori)
+        bins: Jumlah bin histogram per periode untuk quantile
+        seed: Seed random generator
+        index: Index periode forecast (default: dari model)
+        return_paths: Jika True, kembalikan juga semua jalur (n_paths x steps)
+        exog: Regresor periode forecast jika model memakai exog (result['future_exog'])
+
+    Returns:
+        dict: summary, exceedance, exceedance_any, path_stats (dan paths) + 'success'
+    """
+    try:
+        if not isinstance(model, CompactForecastModel):
+            model = CompactForecastModel.from_results(model)
+        shocks = _validate_shocks(shocks, steps)
+        thresholds = [float(t) for t in np.atleast_1d(thresholds)] if thresholds is not None else []
+        quantiles = [float(q) for q in np.atleast_1d(quantiles)]
+        if index is None:
+            index = model._forecast_index(steps)
+
+        rng = np.random.default_rng(seed)
+        total = np.zeros(steps)
+        total_sq = np.zeros(steps)
+        exceed = np.zeros((len(thresholds), steps))
+        exceed_any = np.zeros(len(thresholds))
+        counts = np.zeros((steps, bins))
+        path_max, path_min, path_final, path_mean = [], [], [], []
+        all_paths = [] if return_paths else None
+        lower = width = None
+
+        with timed_stage('scenario_simulation', n_paths=n_paths, steps=steps, shocks=len(shocks)):
+            done = 0
+            while done < n_paths:
+                n = min(chunk_size, n_paths - done)
+                paths = _apply_shocks(_simulate_chunk(model, steps, n, rng, exog), shocks, rng)
+
+                if lower is None:
+                    # Rentang histogram dari chunk pertama, diperlebar 50% ke tiap sisi;
+                    # nilai di luar rentang masuk ke bin paling pinggir
+                    lo, hi = paths.min(axis=0), paths.max(axis=0)
+                    spread = np.maximum(hi - lo, 1e-9)
+                    lower = lo - 0.5 * spread
+                    width = 2 * spread / bins
+
+                bin_idx = np.clip(((paths - lower) / width).astype(int), 0, bins - 1)
+                flat = bin_idx + np.arange(steps)[None, :] * bins
+                counts += np.bincount(flat.ravel(), minlength=steps * bins).reshape(steps, bins)
+
+                total += paths.sum(axis=0)
+                total_sq += (paths ** 2).sum(axis=0)
+                for i, threshold in enumerate(thresholds):
+                    above = paths > threshold
+                    exceed[i] += above.sum(axis=0)
+                    exceed_any[i] += above.any(axis=1).sum()
+
+                path_max.append(paths.max(axis=1))
+                path_min.append(paths.min(axis=1))
+                path_final.append(paths[:, -1])
+                path_mean.append(paths.mean(axis=1))
+                if return_paths:
+                    all_paths.append(paths)
+                done += n
+
+        mean = total / n_paths
+        std = np.sqrt(np.maximum(total_sq / n_paths - mean ** 2, 0))
+        summary = pd.DataFrame({'mean': mean, 'std': std}, index=index)
+        q_values = _histogram_quantiles(counts, lower, width, quantiles)
+        for j, q in enumerate(quantiles):
+            summary[f"q{q * 100:g}"] = q_values[:, j]
+
+        exceedance = pd.DataFrame(
+            {threshold: exceed[i] / n_paths for i, threshold in enumerate(thresholds)}, index=index
+        )
+
+        per_path = pd.DataFrame({
+            'max': np.concatenate(path_max),
+            'min': np.concatenate(path_min),
+            'final': np.concatenate(path_final),
+            'average': np.concatenate(path_mean)
+        })
+        path_stats = per_path.quantile(quantiles)
+        path_stats.index = [f"q{q * 100:g}" for q in quantiles]
+        path_stats.loc['mean'] = per_path.mean()
+
+        result = {
+            'summary': summary,
+            'exceedance': exceedance,
+            'exceedance_any': {threshold: exceed_any[i] / n_paths for i, threshold in enumerate(thresholds)},
+            'path_stats': path_stats,
+            'n_paths': n_paths,
+            'shocks': shocks,
+            'success': True
+        }
+        if return_paths:
+            result['paths'] = np.vstack(all_paths)
+        return result
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
@@ -0,0 +1,196 @@
+"""
+============================================
+SEASONALITY DETECTION
+Deteksi musiman (ACF + spektral) untuk semua komoditas sekaligus
+============================================
+
+Sebelum tuning, periode musiman m dipilih dari data, bukan ditebak:
+
+    detection = detect_seasonality(df)
+    detection.loc['Beras Premium', 'm']     # mis. 52, atau None jika tidak musiman
+
+Untuk setiap kandidat m (mengikuti frekuensi dataset, mis. 4/13/26/52 untuk data
+mingguan) semua kolom di-detrend dengan moving average sepanjang m, lalu ACF
+pada lag m dihitung sekaligus lewat FFT (satu matriks, tanpa loop per komoditas).
+Kandidat dianggap signifikan jika ACF melebihi batas white noise (z / sqrt(n))
+dan juga min_strength, atau periode dominan periodogram berada dalam 10% dari m
+(konfirmasi spektral untuk musiman yang lemah tapi konsisten). Hasil di-cache
+per hash dataset.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from scipy.stats import norm
+
+from src.utils import get_dataset_frequency, dataset_cached
+from src.instrumentation import timed_stage
+
+# Kandidat periode musiman per frekuensi dasar (dalam jumlah periode)
+SEASONAL_CANDIDATES = {
+    'D': (7, 30, 365),
+    'B': (5, 21, 261),
+    'W': (4, 13, 26, 52),
+    'M': (3, 6, 12),
+    'Q': (4,),
+}
+
+DETECTION_COLUMNS = ['seasonal', 'm', 'strength', 'threshold', 'spectral_period', 'n_obs']
+
+
+def seasonal_candidates(freq):
+    """
+    Kandidat periode musiman untuk frekuensi data
+
+    Args:
+        freq: Frequency string pandas (mis. 'W-SUN', '2W-SUN', 'MS', 'D')
+
+    Returns:
+        tuple: Kandidat m (bisa kosong jika frekuensi tidak dikenal)
+    """
+    try:
+        offset = to_offset(freq)
+    except (TypeError, ValueError):
+        return ()
+    base = offset.name.split('-')[0].rstrip('SE') or offset.name[0]
+    candidates = SEASONAL_CANDIDATES.get(base, ())
+    if offset.n > 1:
+        # mis. data 2 mingguan: 52 minggu -> m=26
+        candidates = tuple(sorted({round(c / offset.n) for c in candidates if c / offset.n >= 2}))
+    return candidates
+
+
+def _acf_at_lags(values, lags):
+    """
+    ACF pada lag tertentu untuk setiap kolom (FFT, vektorisasi antar kolom)
+
+    Args:
+        values: Array (n, k) tanpa NaN
+        lags: List lag
+
+    Returns:
+        np.ndarray: (len(lags), k)
+    """
+    n = values.shape[0]
+    x = values - values.mean(axis=0)
+    size = 1 << int(np.ceil(np.log2(2 * n - 1)))
+    spectrum = np.fft.rfft(x, n=size, axis=0)
+    acov = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=0)
+    variance = acov[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        acf = acov[list(lags)] / variance
+    return np.where(variance > 0, acf, np.nan)
+
+
+def _spectral_period(values):
+    """
+    Periode dengan power terbesar pada periodogram (setelah detrend linear)
+
+    Args:
+        values: Array (n, k) tanpa NaN
+
+    Returns:
+        np.ndarray: Periode dominan per kolom
+    """
+    n = values.shape[0]
+    t = np.arange(n)
+    # Detrend linear semua kolom sekaligus (least squares)
+    design = np.column_stack([np.ones(n), t])
+    coef, *_ = np.linalg.lstsq(design, values, rcond=None)
+    detrended = values - design @ coef
+    power = np.abs(np.fft.rfft(detrended, axis=0)) ** 2
+    freqs = np.fft.rfftfreq(n)
+    # Abaikan frekuensi 0 dan periode yang lebih panjang dari setengah data
+    valid = (freqs > 0) & (freqs >= 2 / n)
+    power[~valid] = -np.inf
+    return 1 / freqs[np.argmax(power, axis=0)]
+
+
+@dataset_cached(maxsize=32)
+def detect_seasonality(df, candidates=None, alpha=0.05, min_strength=0.4, freq=None):
+    """
+    Deteksi musiman untuk semua kolom DataFrame sekaligus
+
+    Args:
+        df: DataFrame (index datetime, satu kolom per komoditas) atau Series
+        candidates: List kandidat m (default: dari frekuensi dataset)
+        alpha: Significance level batas ACF white noise
+        min_strength: ACF minimum pada lag m agar dianggap musiman tanpa konfirmasi spektral
+        freq: Frekuensi data (default: get_dataset_frequency(df))
+
+    Returns:
+        pd.DataFrame: Per komoditas: seasonal, m (None jika tidak musiman),
+                      strength (ACF lag m), threshold, spectral_period, n_obs
+    """
+    if isinstance(df, pd.Series):
+        df = df.to_frame(name=df.name if df.name is not None else 'y')
+    if candidates is None:
+        candidates = seasonal_candidates(freq or get_dataset_frequency(df))
+    candidates = sorted({int(m) for m in candidates if int(m) >= 2})
+
+    # Gap diisi interpolasi linear agar FFT bisa dipakai; kolom kosong diabaikan
+    data = df.astype(float).interpolate(limit_direction='both')
+    n_obs = df.notna().sum()
+    result = pd.DataFrame(index=df.columns, columns=DETECTION_COLUMNS)
+    result['seasonal'] = False
+    result['m'] = None
+    result['n_obs'] = n_obs.values
+
+    filled = data.columns[data.notna().all()]
+    if len(filled) == 0 or len(data) < 4:
+        return result
+
+    z = norm.ppf(1 - alpha / 2)
+    n = len(data)
+    best_strength = np.full(len(filled), -np.inf)
+    best_m = np.full(len(filled), np.nan)
+    best_threshold = np.full(len(filled), np.nan)
+
+    with timed_stage('seasonality_detection', commodities=len(filled), candidates=len(candidates)):
+        values = data[filled]
+        spectral = _spectral_period(values.to_numpy())
+        for m in candidates:
+            # Butuh minimal 2 siklus setelah detrend (moving average memakan m-1 titik)
+            if n - m + 1 < 2 * m:
+                continue
+            trend = values.rolling(m, center=True).mean()
+            if m % 2 == 0:
+                # Moving average 2 x m agar trend terpusat untuk m genap
+                trend = trend.rolling(2).mean().shift(-1)
+            detrended = (values - trend).dropna().to_numpy()
+            if len(detrended) <= m:
+                continue
+            strength = _acf_at_lags(detrended, [m])[0]
+            spectral_match = np.abs(spectral / m - 1) <= 0.1
+            threshold = np.where(spectral_match, z / np.sqrt(len(detrended)),
+                                 max(z / np.sqrt(len(detrended)), min_strength))
+            better = (strength > threshold) & (strength > best_strength)
+            best_strength = np.where(better, strength, best_strength)
+            best_m = np.where(better, m, best_m)
+            best_threshold = np.where(better, threshold, best_threshold)
+
+    found = ~np.isnan(best_m)
+    result.loc[filled, 'seasonal'] = found
+    result.loc[filled, 'm'] = [int(m) if ok else None for m, ok in zip(best_m, found)]
+    result.loc[filled, 'strength'] = np.where(found, best_strength, np.nan)
+    result.loc[filled, 'threshold'] = best_threshold
+    result.loc[filled, 'spectral_period'] = np.round(spectral, 1)
+    result['seasonal'] = result['seasonal'].astype(bool)
+    return result
+
+
+def suggest_seasonal_period(series, candidates=None, alpha=0.05, min_strength=0.4):
+    """
+    Periode musiman yang disarankan untuk satu series
+
+    Args:
+        series: pd.Series dengan index datetime
+        candidates: List kandidat m (default: dari frekuensi dataset)
+        alpha: Significance level batas ACF white noise
+        min_strength: ACF minimum pada lag m agar dianggap musiman
+
+    Returns:
+        int atau None: m terbaik, None jika tidak ada musiman signifikan
+    """
+    detection = detect_seasonality(series, candidates, alpha, min_strength)
+    return detection['m'].iloc[0]
@@ -0,0 +1,475 @@
+"""
+============================================
+FORECAST SERVICE
+HTTP/JSON service lokal untuk forecast dari model yang sudah di-fit
+============================================
+
+Cara pakai:
+    python -m src.service --data data_pangan.csv --port 8765
+
+Endpoint:
+    GET  /health                      -> status service
+    GET  /commodities                 -> daftar komoditas + status pool
+    GET  /metrics                     -> durasi stage (fit, get_forecast, ...) format Prometheus
+    GET  /forecast?komoditas=..&periods=12&alpha=0.05
+    POST /forecast                    -> body JSON {"komoditas", "periods", "alpha"}
+                                         atau {"requests": [{...}, {...}]}
+    POST /reload                      -> baca ulang best_params.json dan kosongkan pool
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from src.utils import preprocess_dataset, create_forecast_dates, get_dataset_frequency
+from src.load_model import SARIMAParamsLoader
+from src.forecasting import forecast_future
+from src.calendar_features import make_exog, extend_exog, exog_names
+from src.instrumentation import timed_stage, export_prometheus
+
+
+class _PoolEntry:
+    """
+    Model yang sudah di-fit untuk satu komoditas beserta forecast yang di-cache
+    """
+
+    def __init__(self, komoditas, signature):
+        self.komoditas = komoditas
+        self.signature = signature
+        self.ready = threading.Event()
+        self.model = None
+        self.exog = None
+        self.last_date = None
+        self.freq = None
+        self.forecast = None
+        self.horizon = 0
+        self.error = None
+        self.fitted_at = None
+        self.fit_seconds = None
+        self.requests_served = 0
+
+        # State untuk batching request yang datang bersamaan
+        self.batch_lock = threading.Lock()
+        self.pending = []
+        self.leader_active = False
+
+
+class ModelPool:
+    """
+    Pool model SARIMAX yang tetap "hangat" per komoditas.
+
+    Setiap komoditas di-fit sekali (lewat forecast_future) lalu forecast-nya
+    disajikan dari state Kalman yang sudah ada tanpa fit ulang. Request yang
+    datang bersamaan untuk komoditas yang sama digabung menjadi satu panggilan
+    get_forecast dengan horizon terpanjang.
+    """
+
+    def __init__(self, df, params_file='models/best_params.json',
+                 horizon=52, batch_window=0.002):
+        """
+        Args:
+            df: DataFrame hasil preprocess_dataset (index datetime)
+            params_file: Path ke file parameters JSON
+            horizon: Horizon forecast yang di-cache saat model di-fit
+            batch_window: Lama (detik) leader menunggu request lain sebelum eksekusi
+        """
+        self.df = df
+        self.params_file = params_file
+        self.horizon = horizon
+        self.batch_window = batch_window
+        self.params_loader = SARIMAParamsLoader(params_file)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _signature(self, komoditas):
+        params = self.params_loader.get_params_for_komoditas(komoditas)
+        if params is None:
+            return None
+        return (
+            tuple(params['order']),
+            tuple(params['seasonal_order']),
+            params.get('model_type', 'SARIMA'),
+            params.get('fit_profile'),
+            tuple(exog_names(params.get('exog')))
+        )
+
+    def reload(self):
+        """
+        Baca ulang parameter dan kosongkan pool
+        """
+        with self._lock:
+            self.params_loader.load_params()
+            self._entries = {}
+
+    def commodities(self):
+        """
+        Daftar komoditas yang ada di dataset dan file parameter
+
+        Returns:
+            list: List dict berisi nama komoditas dan status pool
+        """
+        available = [c for c in self.params_loader.get_komoditas_list() if c in self.df.columns]
+        info = []
+        for komoditas in available:
+            entry = self._entries.get(komoditas)
+            info.append({
+                'komoditas': komoditas,
+                'warm': bool(entry and entry.ready.is_set() and entry.error is None),
+                'fit_seconds': entry.fit_seconds if entry else None,
+                'requests_served': entry.requests_served if entry else 0
+            })
+        return info
+
+    def get(self, komoditas):
+        """
+        Ambil entry pool untuk komoditas, fit model jika belum ada.
+        Hanya satu thread yang melakukan fit; thread lain menunggu hasilnya.
+
+        Args:
+            komoditas: Nama komoditas
+
+        Returns:
+            _PoolEntry: Entry yang sudah siap (cek atribut error)
+        """
+        signature = self._signature(komoditas)
+        if signature is None or komoditas not in self.df.columns:
+            raise KeyError(komoditas)
+
+        with self._lock:
+            entry = self._entries.get(komoditas)
+            is_owner = entry is None or entry.signature != signature
+            if is_owner:
+                entry = _PoolEntry(komoditas, signature)
+                self._entries[komoditas] = entry
+
+        if is_owner:
+            self._fit(entry)
+        else:
+            entry.ready.wait()
+
+        return entry
+
+    def warm_up(self, commodities=None):
+        """
+        Fit semua (atau sebagian) komoditas di awal agar request pertama cepat
+
+        Args:
+            commodities: List komoditas; None berarti semua yang tersedia
+        """
+        if commodities is None:
+            commodities = [c['komoditas'] for c in self.commodities()]
+        for komoditas in commodities:
+            self.get(komoditas)
+
+    def _fit(self, entry):
+        start = time.perf_counter()
+        try:
+            order, seasonal_order, model_type, fit_profile, exog = entry.signature
+            series = self.df[entry.komoditas].dropna()
+            freq = get_dataset_frequency(self.df)
+            # Regresor hasil tuning: kalender dihitung, kolom lain diambil dari dataset
+            exog = make_exog(series.index, list(exog), freq, data=self.df)
+            result = forecast_future(
+                series, order, seasonal_order,
+                model_type=model_type, periods=self.horizon, full_data=True,
+                fit_profile=fit_profile, exog=exog
+            )
+            if result.get('success'):
+                entry.model = result['model']
+                entry.exog = exog
+                entry.last_date = series.index[-1]
+                entry.freq = get_dataset_frequency(series)
+                entry.forecast = entry.model.get_forecast(steps=self.horizon, exog=result['future_exog'])
+                entry.horizon = self.horizon
+                entry.fitted_at = time.time()
+            else:
+                entry.error = result.get('error', 'Unknown error')
+        except Exception as e:
+            entry.error = str(e)
+        finally:
+            entry.fit_seconds = time.perf_counter() - start
+            entry.ready.set()
+
+    def forecast(self, komoditas, periods=12, alpha=0.05):
+        """
+        Forecast dari model di pool (tanpa fit ulang)
+
+        Args:
+            komoditas: Nama komoditas
+            periods: Jumlah periode forecast
+            alpha: Significance level untuk confidence interval
+
+        Returns:
+            dict: Dictionary dengan forecast dan info model
+        """
+        entry = self.get(komoditas)
+        if entry.error is not None:
+            return {'success': False, 'komoditas': komoditas, 'error': entry.error}
+
+        if periods > entry.horizon:
+            prediction = self._batched_forecast(entry, periods)
+        else:
+            prediction = entry.forecast
+
+        forecast_df = prediction.conf_int(alpha=alpha).iloc[:periods]
+        forecast_df.columns = ['lower', 'upper']
+        forecast_df['forecast'] = np.asarray(prediction.predicted_mean)[:periods]
+        forecast_df.index = create_forecast_dates(entry.last_date, periods, entry.freq)
+        # Request untuk komoditas yang sama dilayani beberapa thread sekaligus
+        with entry.batch_lock:
+            entry.requests_served += 1
+
+        order, seasonal_order, model_type, _, exog = entry.signature
+        return {
+            'komoditas': komoditas,
+            'model_type': model_type,
+            'order': list(order),
+            'seasonal_order': list(seasonal_order),
+            'exog': list(exog),
+            'periods': periods,
+            'alpha': alpha,
+            'forecast': forecast_df,
+            'success': True
+        }
+
+    def _batched_forecast(self, entry, periods):
+        """
+        Gabungkan request bersamaan untuk satu komoditas: thread pertama menjadi
+        leader, menunggu batch_window, lalu menjalankan satu get_forecast dengan
+        horizon terpanjang untuk semua request yang terkumpul.
+        """
+        slot = {'periods': periods, 'done': threading.Event(), 'result': None, 'error': None}
+        with entry.batch_lock:
+            entry.pending.append(slot)
+            is_leader = not entry.leader_active
+            if is_leader:
+                entry.leader_active = True
+
+        if not is_leader:
+            slot['done'].wait()
+            if slot['error'] is not None:
+                raise slot['error']
+            return slot['result']
+
+        time.sleep(self.batch_window)
+        with entry.batch_lock:
+            batch = entry.pending
+            entry.pending = []
+            entry.leader_active = False
+
+        try:
+            steps = max(s['periods'] for s in batch)
+            # Regresor untuk horizon lebih panjang dari yang di-cache (nilai non-kalender ditahan)
+            future_exog = extend_exog(entry.exog, create_forecast_dates(entry.last_date, steps, entry.freq),
+                                      freq=entry.freq)
+            prediction = entry.model.get_forecast(steps=steps, exog=future_exog)
+            for s in batch:
+                s['result'] = prediction
+        except Exception as e:
+            for s in batch:
+                s['error'] = e
+        finally:
+            for s in batch:
+                s['done'].set()
+
+        if slot['error'] is not None:
+            raise slot['error']
+        return slot['result']
+
+
+def _finite_or_none(values):
+    # NaN / inf (mis. model degenerate) bukan JSON valid: kirim sebagai null
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+
+def forecast_to_json(result):
+    """
+    Convert hasil ModelPool.forecast ke dict yang bisa di-serialize JSON
+    (nilai forecast / interval yang tidak finite menjadi null)
+
+    Args:
+        result: Dictionary hasil ModelPool.forecast
+
+    Returns:
+        dict: Payload JSON
+    """
+    if not result.get('success'):
+        return result
+
+    forecast_df = result['forecast']
+    payload = {k: v for k, v in result.items() if k != 'forecast'}
+    payload['forecast'] = [
+        {'date': d.strftime('%Y-%m-%d'), 'forecast': f, 'lower': lo, 'upper': up}
+        for d, f, lo, up in zip(
+            forecast_df.index,
+            _finite_or_none(forecast_df['forecast']),
+            _finite_or_none(forecast_df['lower']),
+            _finite_or_none(forecast_df['upper'])
+        )
+    ]
+    return payload
+
+
+class ForecastRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler HTTP untuk ModelPool (pool di-set lewat atribut class `pool`)
+    """
+
+    pool = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Jangan spam stderr untuk setiap request
+        pass
+
+    def _send_json(self, status, payload):
+        try:
+            body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        except ValueError:
+            # Jangan kirim NaN / Infinity mentah ke klien (bukan JSON valid)
+            status = 500
+            body = json.dumps({'success': False, 'error': 'Hasil berisi nilai tidak finite'}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status, text):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle_forecast(self, req):
+        try:
+            komoditas = req['komoditas']
+            periods = int(req.get('periods', 12))
+            alpha = float(req.get('alpha', 0.05))
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {'success': False, 'error': f"Request tidak valid: {e}"}
+
+        if periods < 1 or not 0 < alpha < 1:
+            return 400, {'success': False, 'error': "periods harus >= 1 dan 0 < alpha < 1"}
+
+        try:
+            with timed_stage('service_request', komoditas=komoditas, periods=periods):
+                result = self.pool.forecast(komoditas, periods=periods, alpha=alpha)
+        except KeyError:
+            return 404, {'success': False, 'error': f"Komoditas '{komoditas}' tidak ditemukan"}
+
+        return (200 if result.get('success') else 500), forecast_to_json(result)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        if url.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif url.path == '/commodities':
+            self._send_json(200, {'commodities': self.pool.commodities()})
+        elif url.path == '/metrics':
+            self._send_text(200, export_prometheus())
+        elif url.path == '/forecast':
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            self._send_json(*self._handle_forecast(query))
+        else:
+            self._send_json(404, {'success': False, 'error': 'Endpoint tidak ditemukan'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'success': False, 'error': 'Body bukan JSON yang valid'})
+            return
+
+        if url.path == '/forecast':
+            if 'requests' in body:
+                results = [self._handle_forecast(req)[1] for req in body['requests']]
+                self._send_json(200, {'results': results})
+            else:
+                self._send_json(*self._handle_forecast(body))
+        elif url.path == '/reload':
+            self.pool.reload()
+            self._send_json(200, {'status': 'reloaded'})
+        else:
+            self._send_json(404, {'success': False, 'error': 'Endpoint tidak ditemukan'})
+
+
+def create_server(pool, host='127.0.0.1', port=8765):
+    """
+    Buat HTTP server untuk ModelPool
+
+    Args:
+        pool: Instance ModelPool
+        host: Host untuk bind
+        port: Port (0 untuk port acak)
+
+    Returns:
+        ThreadingHTTPServer: Server yang siap di-serve_forever()
+    """
+    handler = type('BoundForecastRequestHandler', (ForecastRequestHandler,), {'pool': pool})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def load_dataset_from_path(path, target_freq=None):
+    """
+    Load dan preprocess dataset dari path file CSV/Excel
+
+    Args:
+        path: Path file
+        target_freq: Frekuensi target untuk resample (mis. 'W'), None = frekuensi data
+
+    Returns:
+        pd.DataFrame: Dataset yang sudah diproses atau None
+    """
+    if path.lower().endswith('.csv'):
+        df_raw = pd.read_csv(path)
+    else:
+        df_raw = pd.read_excel(path)
+    return preprocess_dataset(df_raw, target_freq=target_freq)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Service forecast harga pangan (HTTP/JSON)')
+    parser.add_argument('--data', required=True, help='Path dataset CSV/Excel')
+    parser.add_argument('--params', default='models/best_params.json', help='Path best_params.json')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--horizon', type=int, default=52, help='Horizon forecast yang di-cache')
+    parser.add_argument('--no-warm-up', action='store_true', help='Fit model saat request pertama saja')
+    parser.add_argument('--freq', help="Resample dataset ke frekuensi ini (mis. 'W'), default: frekuensi data")
+    args = parser.parse_args()
+
+    df = load_dataset_from_path(args.data, target_freq=args.freq)
+    if df is None:
+        raise SystemExit(f"Dataset '{args.data}' tidak dapat diproses")
+
+    pool = ModelPool(df, params_file=args.params, horizon=args.horizon)
+    if not args.no_warm_up:
+        print("Warm up model pool...")
+        pool.warm_up()
+
+    server = create_server(pool, host=args.host, port=args.port)
+    print(f"Service berjalan di http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+============================================
+TUNING PROFILER
+Mode profiling opt-in untuk auto_arima (kandidat order, waktu fit, konvergensi)
+============================================
+
+Artefak disimpan di folder yang sama dengan best_params.json:
+    - tuning_profile.csv              : satu baris per kandidat (append antar run, mudah di-sort)
+    - tuning_profiles/<run_id>.prof   : statistik cProfile (buka dengan pstats / snakeviz)
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import record_event
+
+PROFILE_CSV = 'tuning_profile.csv'
+PROFILE_DIR = 'tuning_profiles'
+
+PROFILE_COLUMNS = [
+    'run_id', 'tuning_date', 'komoditas', 'search', 'n_obs',
+    'order', 'seasonal_order', 'intercept', 'ic_name', 'ic',
+    'fit_time_s', 'converged', 'iterations', 'failed', 'selected'
+]
+
+# Kandidat dikumpulkan dari fit pmdarima itu sendiri (bukan dari trace stdout):
+# _fit_candidate_model dibungkus sekali, dan hanya bekerja di thread yang sedang
+# berada di dalam candidate_scope (mencatat kandidat untuk profiled_auto_arima,
+# melewati kandidat setelah deadline tuning). Sesi Streamlit lain di proses yang
+# sama tidak terpengaruh dan stdout tidak pernah dialihkan.
+_collector = threading.local()
+_hook_lock = threading.Lock()
+_hook_installed = False
+
+
+def _candidate_from_fit(fit, ic, fit_time, information_criterion):
+    retvals = getattr(getattr(fit, 'arima_res_', None), 'mle_retvals', None) or {}
+    failed = not np.isfinite(ic)
+    return {
+        'order': tuple(fit.order),
+        'seasonal_order': tuple(fit.seasonal_order) if fit.seasonal_order is not None else (0, 0, 0, 0),
+        'intercept': bool(fit.with_intercept),
+        'ic_name': str(information_criterion).upper(),
+        'ic': float(ic),
+        'fit_time_s': fit_time,
+        'failed': failed,
+        'converged': False if failed else retvals.get('converged'),
+        'iterations': retvals.get('iterations')
+    }
+
+
+def _install_candidate_hook():
+    """
+    Bungkus pmdarima _fit_candidate_model (sekali per proses) agar setiap kandidat
+    tercatat ke collector thread pemanggil
+    """
+    global _hook_installed
+    # pmdarima opsional untuk modul ini (diimpor hanya saat tuning dijalankan)
+    from pmdarima.arima import _auto_solvers
+
+    with _hook_lock:
+        if _hook_installed:
+            return
+        original = _auto_solvers._fit_candidate_model
+
+        @functools.wraps(original)
+        def _fit_candidate_model(*args, **kwargs):
+            candidates = getattr(_collector, 'candidates', None)
+            deadline = getattr(_collector, 'deadline', None)
+            start = time.perf_counter()
+            # Waktu tuning habis: kandidat tidak di-fit (dianggap gagal oleh pencarian stepwise)
+            if deadline is not None and start >= deadline:
+                return None, np.nan, np.inf
+            if candidates is None:
+                return original(*args, **kwargs)
+            fit, fit_time, ic = original(*args, **kwargs)
+            candidates.append(_candidate_from_fit(
+                fit, ic, time.perf_counter() - start, kwargs.get('information_criterion', 'aic')
+            ))
+            return fit, fit_time, ic
+
+        _auto_solvers._fit_candidate_model = _fit_candidate_model
+        _hook_installed = True
+
+
+@contextmanager
+def candidate_scope(candidates=None, deadline=None):
+    """
+    Aktifkan hook kandidat auto_arima untuk thread saat ini
+
+    Args:
+        candidates: List penampung kandidat (None = tidak dicatat)
+        deadline: time.perf_counter() batas tuning; kandidat yang baru akan dimulai
+                  setelahnya dilewati (None = tanpa batas)
+    """
+    _install_candidate_hook()
+    previous = (getattr(_collector, 'candidates', None), getattr(_collector, 'deadline', None))
+    _collector.candidates, _collector.deadline = candidates, deadline
+    try:
+        yield
+    finally:
+        _collector.candidates, _collector.deadline = previous
+
+
+def _fit_key(order, seasonal_order, intercept):
+    return (tuple(order), tuple(seasonal_order), bool(intercept))
+
+
+def profiled_auto_arima(auto_arima_func, series, search, deadline=None, **kwargs):
+    """
+    Jalankan auto_arima dengan cProfile dan catat setiap kandidat yang dicoba
+    (order, waktu fit, IC, konvergensi) langsung dari fit kandidat
+
+    Args:
+        auto_arima_func: Fungsi pmdarima.auto_arima
+        series: Time series data
+        search: Label pencarian ('sarima', 'arima', ...)
+        deadline: Batas waktu tuning (time.perf_counter(), lihat candidate_scope)
+        **kwargs: Argumen auto_arima (stepwise: kandidat di-fit di thread pemanggil)
+
+    Returns:
+        tuple: (best_model, candidates, profiler)
+    """
+    profiler = cProfile.Profile()
+    candidates = []
+
+    with candidate_scope(candidates, deadline):
+        profiler.enable()
+        try:
+            best_model = auto_arima_func(series, **kwargs)
+        finally:
+            profiler.disable()
+
+    best_key = _fit_key(best_model.order, best_model.seasonal_order, best_model.with_intercept)
+    for cand in candidates:
+        cand['search'] = search
+        cand['selected'] = _fit_key(cand['order'], cand['seasonal_order'], cand['intercept']) == best_key
+        record_event(
+            'tuning_candidate', cand['fit_time_s'],
+            search=search, order=cand['order'], seasonal_order=cand['seasonal_order'],
+            converged=cand['converged'], iterations=cand['iterations']
+        )
+
+    return best_model, candidates, profiler
+
+
+def save_tuning_profile(komoditas, candidates, profilers, output_dir='models', n_obs=None,
+                        selected_search=None):
+    """
+    Simpan hasil profiling tuning sebagai artefak di samping best_params.json
+
+    Args:
+        komoditas: Nama komoditas (atau label run)
+        candidates: List dict kandidat dari profiled_auto_arima
+        profilers: List cProfile.Profile yang akan digabung
+        output_dir: Folder output (folder best_params.json)
+        n_obs: Panjang series
+        selected_search: Label pencarian yang menghasilkan model final
+
+    Returns:
+        dict: Path artefak dan ringkasan run
+    """
+    now = datetime.now()
+    slug = re.sub(r'[^0-9A-Za-z]+', '_', str(komoditas)).strip('_') or 'series'
+    run_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{slug}"
+
+    rows = pd.DataFrame(candidates)
+    if rows.empty:
+        rows = pd.DataFrame(columns=PROFILE_COLUMNS)
+    rows['run_id'] = run_id
+    rows['tuning_date'] = now.strftime('%Y-%m-%d %H:%M:%S')
+    rows['komoditas'] = komoditas
+    rows['n_obs'] = n_obs
+    rows['order'] = rows['order'].map(lambda o: str(tuple(o)))
+    rows['seasonal_order'] = rows['seasonal_order'].map(lambda o: str(tuple(o)))
+    if selected_search is not None and 'search' in rows:
+        # Model final hanya berasal dari satu pencarian
+        rows['selected'] = rows['selected'] & rows['search'].eq(selected_search)
+    rows = rows.reindex(columns=PROFILE_COLUMNS)
+
+    os.makedirs(os.path.join(output_dir, PROFILE_DIR), exist_ok=True)
+    csv_path = os.path.join(output_dir, PROFILE_CSV)
+    rows.to_csv(csv_path, mode='a', header=not os.path.exists(csv_path), index=False)
+
+    prof_path = os.path.join(output_dir, PROFILE_DIR, f"{run_id}.prof")
+    stats = None
+    for profiler in profilers:
+        if stats is None:
+            stats = pstats.Stats(profiler)
+        else:
+            stats.add(profiler)
+    if stats is not None:
+        stats.dump_stats(prof_path)
+
+    fit_times = pd.to_numeric(rows['fit_time_s'], errors='coerce')
+    return {
+        'run_id': run_id,
+        'candidates_file': csv_path,
+        'profile_file': prof_path if stats is not None else None,
+        'n_candidates': int(len(rows)),
+        'n_failed': int(rows['failed'].astype(bool).sum()),
+        'n_not_converged': int(rows['converged'].eq(False).sum()),
+        'total_fit_time_s': float(fit_times.sum()),
+        'slowest': rows.loc[fit_times.nlargest(5).index, ['search', 'order', 'seasonal_order', 'fit_time_s']]
+                       .to_dict('records')
+    }
+
+
+def load_tuning_profile(output_dir='models'):
+    """
+    Load semua kandidat yang pernah di-profile
+
+    Args:
+        output_dir: Folder artefak profiling
+
+    Returns:
+        pd.DataFrame: Tabel kandidat, atau None jika belum ada
+    """
+    csv_path = os.path.join(output_dir, PROFILE_CSV)
+    if not os.path.exists(csv_path):
+        return None
+    return pd.read_csv(csv_path)
+
+
+def top_functions(profile_file, n=20, sort='cumulative'):
+    """
+    Ringkas file .prof menjadi tabel fungsi terberat
+
+    Args:
+        profile_file: Path file .prof
+        n: Jumlah baris
+        sort: Kolom sort pstats ('cumulative', 'tottime', ...)
+
+    Returns:
+        str: Output pstats
+    """
+    buffer = io.StringIO()
+    stats = pstats.Stats(profile_file, stream=buffer)
+    stats.sort_stats(sort).print_stats(n)
+    return buffer.getvalue()
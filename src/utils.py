@@ -5,12 +5,19 @@ Fungsi-fungsi helper untuk preprocessing dan evaluasi
 ============================================
 """
 
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import streamlit as st
 from sklearn.metrics import mean_absolute_error, mean_squared_error, mean_absolute_percentage_error
 
+from src.instrumentation import instrumented, record_event
+
 
 def validate_file_type(uploaded_file):
     """
@@ -27,6 +34,7 @@ def validate_file_type(uploaded_file):
     return file_extension in allowed_types
 
 
+@instrumented('load_dataset')
 def load_dataset(uploaded_file):
     """
     Load dataset dari file CSV atau Excel
@@ -54,15 +62,188 @@ def load_dataset(uploaded_file):
         return None
 
 
-def preprocess_dataset(df):
+DEFAULT_FREQUENCY = 'W'
+
+_WEEKDAYS = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+
+# Agregasi yang diizinkan saat resample (mis. harian -> mingguan)
+RESAMPLE_AGGREGATIONS = ('mean', 'median', 'last', 'first', 'max', 'min')
+
+
+def infer_frequency(index):
+    """
+    Deteksi frekuensi index tanggal (harian, mingguan per hari tertentu, bulanan, ...)
+    
+    Args:
+        index: pd.DatetimeIndex
+    
+    Returns:
+        str: Alias frekuensi pandas (mis. 'D', 'W-WED', 'MS') atau None jika tidak terdeteksi
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 3:
+        return None
+    
+    try:
+        freq = pd.infer_freq(index)
+    except (TypeError, ValueError):
+        freq = None
+    if freq:
+        return freq
+    
+    # Index tidak teratur (ada gap / duplikat): pakai jarak median antar tanggal
+    step_days = index.to_series().diff().dropna().dt.days
+    step_days = step_days[step_days > 0]
+    if step_days.empty:
+        return None
+    median_days = step_days.median()
+    
+    if median_days <= 1:
+        return 'D'
+    if 6 <= median_days <= 8:
+        weekday = int(pd.Series(index.dayofweek).mode().iloc[0])
+        return f"W-{_WEEKDAYS[weekday]}"
+    if 13 <= median_days <= 16:
+        weekday = int(pd.Series(index.dayofweek).mode().iloc[0])
+        return f"2W-{_WEEKDAYS[weekday]}"
+    if 27 <= median_days <= 32:
+        return 'MS' if (index.day == 1).mean() > 0.5 else 'M'
+    if 88 <= median_days <= 93:
+        return 'QS' if (index.day == 1).mean() > 0.5 else 'Q'
+    return None
+
+
+def get_dataset_frequency(data, default=DEFAULT_FREQUENCY):
+    """
+    Frekuensi dataset / series: dari attrs (disimpan preprocess_dataset), index.freq,
+    atau hasil deteksi dari index
+    
+    Args:
+        data: DataFrame atau Series dengan index datetime
+        default: Frekuensi jika tidak terdeteksi
+    
+    Returns:
+        str: Alias frekuensi pandas
+    """
+    freq = getattr(data, 'attrs', {}).get('freq')
+    if freq:
+        return freq
+    index = data.index
+    if getattr(index, 'freqstr', None):
+        return index.freqstr
+    return infer_frequency(index) or default
+
+
+def dataset_hash(data):
+    """
+    Hash isi dataset (nilai, index, kolom, frekuensi) untuk kunci cache
+    
+    Args:
+        data: DataFrame atau Series
+    
+    Returns:
+        str: Hex digest SHA-1
+    """
+    digest = hashlib.sha1()
+    digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    columns = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+    digest.update(repr((list(columns), getattr(data, 'attrs', {}).get('freq'))).encode())
+    return digest.hexdigest()
+
+
+def _cache_key_part(value):
+    # DataFrame/Series di-hash isinya; repr() pandas terpotong sehingga tidak aman sebagai kunci
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return dataset_hash(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_cache_key_part(v) for v in value)
+    return repr(value)
+
+
+def dataset_cached(maxsize=16):
+    """
+    Decorator cache LRU untuk fungsi yang argumen pertamanya DataFrame/Series.
+    Kunci cache = dataset_hash(data) + argumen lain (DataFrame/Series lain juga
+    di-hash), sehingga dataset yang sama (mis. setiap rerun Streamlit) tidak
+    diproses ulang.
+    
+    Hasil cache dipakai bersama: jangan dimodifikasi in-place.
+    Fungsi hasil dekorasi punya cache_clear() dan cache_info().
+    
+    Args:
+        maxsize: Jumlah entri maksimum
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        stats = {'hits': 0, 'misses': 0}
+        
+        @functools.wraps(func)
+        def wrapper(data, *args, **kwargs):
+            key = (
+                dataset_hash(data), _cache_key_part(args),
+                tuple((name, _cache_key_part(value)) for name, value in sorted(kwargs.items()))
+            )
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    stats['hits'] += 1
+                    record_event('dataset_cache', 0.0, function=func.__name__, hit=True)
+                    return cache[key]
+            result = func(data, *args, **kwargs)
+            with lock:
+                stats['misses'] += 1
+                cache[key] = result
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+        
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats.update(hits=0, misses=0)
+        
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_info = lambda: dict(stats, size=len(cache), maxsize=maxsize)
+        return wrapper
+    return decorator
+
+
+def resample_dataset(df, freq, agg='mean'):
+    """
+    Resample / align dataset ke frekuensi tertentu (vektor, semua kolom sekaligus),
+    mis. data harian pasar -> mingguan
+    
+    Args:
+        df: DataFrame dengan index datetime
+        freq: Frekuensi target (alias pandas, mis. 'W', 'W-MON', 'MS')
+        agg: Agregasi per periode (lihat RESAMPLE_AGGREGATIONS)
+    
+    Returns:
+        pd.DataFrame: DataFrame dengan index teratur pada frekuensi target
+    """
+    if agg not in RESAMPLE_AGGREGATIONS:
+        raise ValueError(f"Agregasi '{agg}' tidak didukung. Pilihan: {', '.join(RESAMPLE_AGGREGATIONS)}")
+    resampled = getattr(df.resample(freq), agg)()
+    # Periode tanpa data sama sekali di awal/akhir tidak berguna untuk model
+    resampled = resampled.loc[resampled.first_valid_index():resampled.last_valid_index()]
+    resampled.attrs = dict(df.attrs)
+    resampled.attrs['freq'] = resampled.index.freqstr or freq
+    return resampled
+
+
+@instrumented('preprocess_dataset')
+def preprocess_dataset(df, target_freq=None, agg='mean'):
     """
     Preprocessing dataset dengan validasi robust
     
     Args:
         df: DataFrame raw
+        target_freq: Frekuensi target untuk resample (mis. 'W'); None = pakai frekuensi data
+        agg: Agregasi saat resample (lihat RESAMPLE_AGGREGATIONS)
     
     Returns:
-        pd.DataFrame: DataFrame yang sudah diproses, atau None jika gagal/kosong
+        pd.DataFrame: DataFrame yang sudah diproses (frekuensi di df.attrs['freq']),
+                      atau None jika gagal/kosong
     """
     try:
         # Validasi input
@@ -139,6 +320,13 @@ def preprocess_dataset(df):
             st.error("❌ Semua data menjadi NaN setelah preprocessing. Cek format angka di dataset!")
             return None
         
+        # Deteksi frekuensi dan simpan bersama dataset
+        source_freq = infer_frequency(df_processed.index)
+        if target_freq and target_freq != source_freq:
+            df_processed = resample_dataset(df_processed, target_freq, agg=agg)
+        df_processed.attrs['source_freq'] = source_freq
+        df_processed.attrs['freq'] = df_processed.attrs.get('freq') or source_freq or DEFAULT_FREQUENCY
+        
         return df_processed
     
     except Exception as e:
@@ -156,19 +344,15 @@ def check_missing_values(df):
     Returns:
         dict: Info missing values
     """
-    missing_info = {}
-    
-    for col in df.columns:
-        missing_count = df[col].isna().sum()
-        missing_pct = (missing_count / len(df)) * 100
-        
-        if missing_count > 0:
-            missing_info[col] = {
-                'count': missing_count,
-                'percentage': missing_pct
-            }
+    # Satu isna().sum() untuk semua kolom, hanya kolom yang punya missing yang dilaporkan
+    counts = df.isna().sum()
+    counts = counts[counts > 0]
+    percentages = counts / max(len(df), 1) * 100
     
-    return missing_info
+    return {
+        col: {'count': int(count), 'percentage': float(pct)}
+        for col, count, pct in zip(counts.index, counts.values, percentages.values)
+    }
 
 
 def train_test_split(df, test_size=0.2):
@@ -262,6 +446,7 @@ def calculate_mape(y_true, y_pred):
         return None
 
 
+@instrumented('metrics')
 def calculate_metrics_summary(y_true, y_pred):
     """
     Hitung semua metrik dan return dalam dictionary
@@ -387,19 +572,18 @@ def fill_missing_values(df, method='ffill'):
     Returns:
         pd.DataFrame: DataFrame dengan missing values terisi
     """
-    df_filled = df.copy()
-    
+    # ffill/bfill/interpolate sudah mengembalikan objek baru, tidak perlu copy()
     if method == 'ffill':
-        df_filled = df_filled.fillna(method='ffill')
+        df_filled = df.ffill()
     elif method == 'bfill':
-        df_filled = df_filled.fillna(method='bfill')
+        df_filled = df.bfill()
     elif method == 'interpolate':
-        df_filled = df_filled.interpolate(method='linear')
+        df_filled = df.interpolate(method='linear')
+    else:
+        df_filled = df
     
     # Fill sisa NaN dengan backward fill jika masih ada
-    df_filled = df_filled.fillna(method='bfill')
-    
-    return df_filled
+    return df_filled.bfill()
 
 
 def convert_df_to_excel(df, filename='export.xlsx'):
@@ -413,31 +597,34 @@ def convert_df_to_excel(df, filename='export.xlsx'):
     Returns:
         bytes: Excel file data atau None
     """
+    # Engine xlsx sama dengan subsistem export (xlsxwriter jika terpasang)
+    from src.export import _XLSX_ENGINE, _XLSX_ENGINE_KWARGS
+    import io
+    
     try:
-        # Gunakan ExcelWriter untuk save ke bytes
-        import io
         output = io.BytesIO()
-        
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        with pd.ExcelWriter(output, engine=_XLSX_ENGINE, engine_kwargs=_XLSX_ENGINE_KWARGS) as writer:
             df.to_excel(writer, sheet_name='Data', index=True)
-        
-        output.seek(0)
         return output.getvalue()
-    except:
+    except Exception as e:
+        st.error(f"❌ Error membuat file Excel {filename}: {str(e)}")
         return None
 
 
-def create_forecast_dates(last_date, periods, frequency='W'):
+def create_forecast_dates(last_date, periods, frequency=DEFAULT_FREQUENCY):
     """
     Create forecast dates
     
     Args:
         last_date: Tanggal terakhir dari data
         periods: Jumlah periode forecast
-        frequency: Frekuensi ('D', 'W', 'M', dll)
+        frequency: Frekuensi ('D', 'W', 'W-WED', 'MS', dll) - lihat get_dataset_frequency
     
     Returns:
         pd.DatetimeIndex: Index tanggal untuk forecast
     """
-    forecast_dates = pd.date_range(start=last_date, periods=periods+1, freq=frequency)[1:]
+    # last_date + offset selalu maju tepat satu periode (juga untuk offset ber-anchor
+    # seperti W-SUN / MS ketika last_date tidak jatuh di anchor)
+    offset = pd.tseries.frequencies.to_offset(frequency)
+    forecast_dates = pd.date_range(start=pd.Timestamp(last_date) + offset, periods=periods, freq=offset)
     return forecast_dates